@@ -0,0 +1,35 @@
+"""
+API Pagination - Cursor (Keyset) statt PageNumberPagination für zeitgeordnete Listen
+"""
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from birdy_config.pagination import count_rows
+
+
+class TimestampCursorPagination(CursorPagination):
+    """
+    Keyset-Pagination über (timestamp, id), neueste zuerst.
+
+    Keine Gesamtzahl per Default (COUNT(*) über das ganze Archiv);
+    ?total=estimate liefert die Planner-Schätzung, ?total=exact zählt.
+    """
+    ordering = ('-timestamp', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    total_query_param = 'total'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.total_query_param)
+        self.total = count_rows(queryset, estimate=mode == 'estimate') if mode in ('estimate', 'exact') else None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.total is not None:
+            payload['count'] = self.total
+        return Response(payload)
@@ -34,7 +34,7 @@ class VideoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Video
         fields = ['id', 'timestamp', 'filename', 'filesize_bytes', 'filesize_display',
-                  'duration_seconds', 'width', 'height', 'file_url']
+                  'duration_seconds', 'width', 'height', 'file_url', 'hls_url', 'poster_url']
 
 
 class BirdDetectionSerializer(serializers.ModelSerializer):
@@ -47,7 +47,8 @@ class BirdDetectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = BirdDetection
         fields = ['id', 'timestamp', 'species', 'confidence', 'confidence_percent',
-                  'top_predictions', 'photo', 'video', 'processed', 'processing_time_ms']
+                  'top_predictions', 'photo', 'video', 'processed', 'processing_time_ms',
+                  'scoring_metadata', 'estimated_mass_grams']
 
     def get_confidence_percent(self, obj):
         return f"{obj.confidence * 100:.1f}%"
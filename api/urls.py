@@ -27,6 +27,9 @@ urlpatterns = [
 """
 API Endpoints:
 
+Zeitgeordnete Listen (detections, photos, videos, weight) sind cursor-paginiert:
+?cursor=... aus next/previous, ?page_size=N (max 200), ?total=estimate|exact für count
+
 GET /api/species/ - Liste aller Vogel-Spezies
 GET /api/species/{id}/ - Details einer Spezies
 
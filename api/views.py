@@ -13,6 +13,7 @@ from media_manager.models import Photo, Video
 from sensors.models import SensorStatus, WeightMeasurement
 from species.models import BirdDetection, BirdSpecies, DailyStatistics
 
+from .pagination import TimestampCursorPagination
 from .serializers import (
     BirdDetectionListSerializer,
     BirdDetectionSerializer,
@@ -43,7 +44,8 @@ class BirdDetectionViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['species', 'timestamp']
     ordering_fields = ['timestamp', 'confidence']
-    ordering = ['-timestamp']
+    ordering = ['-timestamp', '-id']
+    pagination_class = TimestampCursorPagination
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -60,8 +62,8 @@ class BirdDetectionViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def today(self, request):
         """Heutige Detektionen"""
-        today = timezone.now().date()
-        detections = self.get_queryset().filter(timestamp__date=today)
+        today = timezone.localdate()
+        detections = self.get_queryset().filter(local_date=today)
         serializer = self.get_serializer(detections, many=True)
         return Response(serializer.data)
 
@@ -72,7 +74,8 @@ class PhotoViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = PhotoSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['timestamp']
-    ordering = ['-timestamp']
+    ordering = ['-timestamp', '-id']
+    pagination_class = TimestampCursorPagination
 
 
 class VideoViewSet(viewsets.ReadOnlyModelViewSet):
@@ -81,7 +84,8 @@ class VideoViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = VideoSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['timestamp']
-    ordering = ['-timestamp']
+    ordering = ['-timestamp', '-id']
+    pagination_class = TimestampCursorPagination
 
 
 class WeightViewSet(viewsets.ReadOnlyModelViewSet):
@@ -89,6 +93,7 @@ class WeightViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = WeightMeasurement.objects.all()
     serializer_class = WeightMeasurementSerializer
     ordering = ['-timestamp']
+    pagination_class = TimestampCursorPagination
 
     @action(detail=False, methods=['get'])
     def current(self, request):
@@ -166,10 +171,10 @@ class StatisticsViewSet(viewsets.ViewSet):
         ).count()
         unique_species = BirdSpecies.objects.filter(birddetection__isnull=False).distinct().count()
 
-        # Heute
-        today = timezone.now().date()
+        # Heute (local_date: partieller Index statt timestamp__date Umrechnung pro Zeile)
+        today = timezone.localdate()
         today_detections = BirdDetection.objects.filter(
-            timestamp__date=today,
+            local_date=today,
             processed=True,
             species__isnull=False
         ).count()
@@ -177,7 +182,7 @@ class StatisticsViewSet(viewsets.ViewSet):
         # Diese Woche
         week_ago = today - timedelta(days=7)
         week_detections = BirdDetection.objects.filter(
-            timestamp__date__gte=week_ago,
+            local_date__gte=week_ago,
             processed=True,
             species__isnull=False
         ).count()
@@ -188,3 +193,20 @@ class StatisticsViewSet(viewsets.ViewSet):
             'today_detections': today_detections,
             'week_detections': week_detections,
         })
+
+    @action(detail=False, methods=['get'])
+    def hourly(self, request):
+        """Aktivität nach lokaler Tageszeit (neue Besuche pro Stunde, letzte N Tage)"""
+        days = int(request.query_params.get('days', 30))
+        since = timezone.localdate() - timedelta(days=days)
+
+        from django.db.models import Count
+        rows = BirdDetection.objects.filter(
+            local_date__gte=since,
+            processed=True,
+            species__isnull=False,
+            is_new_visit=True,
+        ).values('local_hour').annotate(visits=Count('id')).order_by('local_hour')
+
+        counts = {row['local_hour']: row['visits'] for row in rows}
+        return Response([{'hour': hour, 'visits': counts.get(hour, 0)} for hour in range(24)])
@@ -40,10 +40,6 @@ if ENABLE_PERIODIC_TASKS:
             'task': 'species.tasks.update_statistics_task',
             'schedule': crontab(hour=0, minute=1),
         },
-        'publish-ha-status': {
-            'task': 'homeassistant.tasks.publish_status_task',
-            'schedule': 300.0,
-        },
         'measure-weight-backup': {
             'task': 'sensors.tasks.measure_weight_task',
             'schedule': 300.0,  # 5 Minuten - Backup Task (liest nur aus DB)
@@ -0,0 +1,75 @@
+"""
+Keyset Pagination - Seiten über (timestamp, id) statt COUNT(*) + OFFSET
+Seite N kostet gleich viel wie Seite 1: der Cursor ist die Position des letzten
+Eintrags, die Query startet per Index-Range-Scan direkt dort.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db import connections
+
+
+def encode_cursor(obj):
+    """Cursor für die Position nach obj (timestamp + id als Tie-Breaker)"""
+    raw = f"{obj.timestamp.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Args:
+        cursor: Wert von encode_cursor()
+
+    Returns:
+        tuple (timestamp, id) oder None bei fehlendem/ungültigem Cursor
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(queryset, cursor, page_size):
+    """
+    Eine Seite neueste-zuerst ab cursor.
+
+    Args:
+        queryset: Gefiltertes QuerySet eines Models mit timestamp
+        cursor: Cursor aus dem vorherigen Aufruf (None = erste Seite)
+        page_size: Einträge pro Seite
+
+    Returns:
+        tuple (items, next_cursor) – next_cursor None auf der letzten Seite
+    """
+    queryset = queryset.order_by('-timestamp', '-id')
+    position = decode_cursor(cursor)
+    if position is not None:
+        timestamp, pk = position
+        # (timestamp, id) < (ts, pk) – als Range auf timestamp, damit der -timestamp Index greift
+        queryset = queryset.filter(timestamp__lte=timestamp).exclude(timestamp=timestamp, id__gte=pk)
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = encode_cursor(items[page_size - 1]) if len(items) > page_size else None
+    return items[:page_size], next_cursor
+
+
+def count_rows(queryset, estimate=False):
+    """
+    Gesamtzahl für ein QuerySet – exakt oder (PostgreSQL) als Planner-Schätzung ohne Scan.
+
+    Args:
+        estimate: Zeilen-Schätzung aus EXPLAIN statt COUNT(*)
+
+    Returns:
+        int
+    """
+    if estimate and connections[queryset.db].vendor == 'postgresql':
+        plan = json.loads(queryset.order_by().explain(format='json'))[0]['Plan']
+        return int(plan['Plan Rows'])
+    return queryset.count()
@@ -139,10 +139,7 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'sensors.tasks.update_sensor_status_task',
         'schedule': 60.0,  # Alle 60 Sekunden
     },
-    'publish-mqtt-status-every-60-seconds': {
-        'task': 'homeassistant.tasks.publish_status_task',
-        'schedule': 60.0,  # Alle 60 Sekunden
-    },
+    # MQTT Status publiziert start_birdy event-getrieben (persistente Verbindung, nur Änderungen)
     'update-statistics-at-midnight': {
         'task': 'species.tasks.update_statistics_task',
         'schedule': crontab(hour=0, minute=5),  # Täglich um 00:05 Uhr
@@ -185,10 +182,51 @@ LOGGING = {
 BIRDY_SETTINGS = {
     'WEIGHT_SENSOR_DT_PIN': 5,
     'WEIGHT_SENSOR_SCK_PIN': 6,
+    # HX711 Sampler-Thread: Ring Buffer der letzten Einzelmessungen (getrimmter Mittelwert/Median)
+    'WEIGHT_RING_SIZE': 50,
+    'WEIGHT_HISTORY_INTERVAL_SECONDS': 30,   # Takt für Glättung + Drift-Kompensation
+    'WEIGHT_MAX_SNAPSHOT_AGE_SECONDS': 10,   # Älterer Snapshot → read_weight_grams() liefert None
+    # Landung/Abflug als Gewichtssprung (braucht den Sampler; Masse → BirdDetection.estimated_mass_grams)
+    'WEIGHT_LANDING_ENABLED': False,
+    'WEIGHT_LANDING_TRIGGER': False,          # Landung startet eine Aufnahme (zusätzlich zum PIR)
+    'WEIGHT_LANDING_THRESHOLD_GRAMS': 5.0,    # Mindest-Sprung über der Baseline
+    'WEIGHT_LANDING_CONFIRM_BATCHES': 2,      # Sprung muss so viele HX711 Batches anhalten
+    'WEIGHT_LANDING_MAX_VISIT_SECONDS': 120,  # Länger erhöht → neue Baseline (Futter nachgefüllt)
+    # Weight Gate: PIR-Aufnahme abbrechen und verwerfen, wenn nichts gelandet ist
+    'WEIGHT_GATE_ENABLED': False,
+    'WEIGHT_GATE_TIMEOUT_SECONDS': 3,         # Wartezeit auf eine Landung nach Aufnahmestart
+    'WEIGHT_GATE_LOOKBACK_SECONDS': 5,        # Landungen kurz vor dem Trigger zählen mit
+    # Zusätzlich HLS VOD-Playlist (fMP4-Segmente, Stream-Copy) neben jedem Video erzeugen
+    'HLS_ENABLED': False,
+    'HLS_SEGMENT_SECONDS': 2,
+    # Live Events (SSE) über Redis Pub/Sub – ausgeliefert vom ASGI-Prozess (birdy-events.service)
+    # Nur aktivieren, wenn birdy-events läuft und nginx /events/ dorthin routet
+    'LIVE_EVENTS_ENABLED': False,
+    'LIVE_EVENTS_URL': '/events/',           # nginx routet /events/ auf uvicorn (Port 8001)
+    'LIVE_EVENTS_REDIS_URL': None,           # None = CELERY_BROKER_URL
+    'LIVE_EVENTS_CHANNEL': 'birdy:events',
+    'LIVE_EVENTS_HEARTBEAT_SECONDS': 15,
+    # Media-Auslieferung (/media/): 'django' = Range/ETag im View, Bytes per sendfile über gunicorn
+    # 'x-accel' = nginx liefert aus (internal location), 'x-sendfile' = Apache/lighttpd
+    'MEDIA_SERVE_MODE': 'django',
+    'MEDIA_ACCEL_PREFIX': '/protected-media/',  # nginx internal location für X-Accel-Redirect
+    # Foto-Thumbnails beim Speichern (Galerie/Admin/MQTT laden diese statt des Originals)
+    'THUMBNAIL_WIDTHS': (320, 640),
+    'THUMBNAIL_FORMATS': ('avif', 'webp', 'jpeg'),  # avif nur wenn Pillow es schreiben kann
+    'THUMBNAIL_QUALITY': 75,
+    # Statistiken werden pro Detection inkrementell gezählt; nächtlich Tag/Monat/Jahr von gestern nachrechnen
+    'STATISTICS_CONSISTENCY_CHECK': True,
     'PIR_SENSOR_PIN': 17,
+    'PIR_EDGE_DETECTION': True,  # lgpio Edge Alerts statt 20 Hz Polling (Fallback auf Polling wenn nicht verfügbar)
+    'PIR_DEBOUNCE_MS': 20,       # Flanke zählt erst, wenn der Pegel so lange stabil ist (Kernel-Debounce)
+    'PIR_WARMUP_SECONDS': 30,    # Sensor-Warmup nach dem Initialisieren
     'CAMERA_RESOLUTION': (1280, 720),
     'CAMERA_FRAMERATE': 15,
-    'PRE_TRIGGER_SECONDS': 3,
+    'PRE_TRIGGER_SECONDS': 3,               # Nur im Modus 'ringbuffer': Sekunden vor dem PIR-Trigger im Video
+    # Aufnahme-Modus des Camera Workers:
+    # 'rpicam'     = Worker stoppen, rpicam-vid starten, danach Worker neu starten (~3-4s Totzeit)
+    # 'ringbuffer' = Encoder läuft dauerhaft in In-Memory Ring Buffer, Kamera bleibt offen
+    'CAMERA_RECORDING_MODE': 'rpicam',
     'RECORDING_DURATION_SECONDS': 4,  # Fallback für statische Aufnahmen
     'MAX_RECORDING_DURATION_SECONDS': 30,   # Max-Länge dynamische PIR-basierte Aufnahme
     'MIN_RECORDING_DURATION_SECONDS': 5,    # Mindest-Aufnahmedauer vor PIR-Absence-Check (rpicam-vid braucht Zeit für valide MP4)
@@ -199,6 +237,9 @@ BIRDY_SETTINGS = {
     'BIRD_DETECTOR_MODEL_PATH': BASE_DIR / 'ml_models' / 'bird_detector.tflite',
     'BIRD_DETECTOR_ENABLED': True,
     'BIRD_DETECTOR_MIN_SCORE': 0.3,   # Minimale Detection Confidence
+    # Kaskade: Classifier läuft auf dem Bbox-Crop (+ Rand) statt auf dem vollen Frame
+    'CLASSIFIER_CASCADE_ENABLED': False,
+    'CASCADE_CROP_MARGIN': 0.25,      # Rand um die Bbox (Anteil der längeren Bbox-Seite)
     'MIN_BIRD_COVERAGE': 0.05,        # Minimale Bbox-Fläche (5% des Frames)
     # ROI: Bereich des Futterplatzes im Bild (normalisiert 0.0–1.0)
     # Anpassen sobald bekannt wo der Futterbereich im Bild liegt
@@ -211,7 +252,34 @@ BIRDY_SETTINGS = {
     'MIN_CONFIDENCE_SPECIES': 0.5,  # Minimale Confidence für gültigen Besuch (50%)
     # Arten die wie Background behandelt werden (Modell verwechselt sie mit Hintergrund)
     'IGNORED_SPECIES': {'Felsentaube'},
+    # Early Exit: Scoring stoppen, sobald K Frames in Folge dieselbe Art >= T zeigen (0 = aus)
+    'EARLY_EXIT_CONSECUTIVE_FRAMES': 0,  # Opt-in: erst Genauigkeit mit benchmark_cascade prüfen (z.B. 3)
+    'EARLY_EXIT_CONFIDENCE': 0.9,
+    'CLASSIFICATION_BUDGET_MS': None,  # Max. Scoring-Zeit pro Besuch in ms (None = unbegrenzt)
+    # Streaming Pipeline: Live-Frames schon während der Aufnahme detektieren/klassifizieren
+    # (braucht CAMERA_RECORDING_MODE='ringbuffer'; vorläufige Art → MQTT bird/provisional)
+    'DETECTION_PIPELINE_ENABLED': False,
+    'DETECTION_PIPELINE_QUEUE_SIZE': 8,       # Max. Frames pro Stufen-Queue (voll → ältestes verwerfen)
+    'DETECTION_PIPELINE_FINISH_TIMEOUT': 5,   # Max. Wartezeit nach Aufnahme-Ende in Sekunden
+    # Gültige Besuche werden asynchron gespeichert (Foto, DB, Statistiken, MQTT);
+    # volle Queue → Capture-Pfad wartet (Backpressure)
+    'PERSISTENCE_QUEUE_SIZE': 16,
+    # PIR-Trigger während der Klassifikation warten auf die nächste Aufnahme –
+    # nach so vielen Sekunden Wartezeit wird der Trigger verworfen (Vogel vermutlich weg)
+    'TRIGGER_MAX_AGE_SECONDS': 20,
+    # PIREvents werden gebatcht im Hintergrund gespeichert (bulk_create nach Anzahl oder Zeit);
+    # der Ring ist begrenzt – bei DB-Ausfall werden die ältesten Events verworfen
+    'PIR_EVENT_BUFFER_SIZE': 1000,
+    'PIR_EVENT_BATCH_SIZE': 50,
+    'PIR_EVENT_FLUSH_SECONDS': 1.0,
     'ML_MODEL_PATH': BASE_DIR / 'ml_models' / 'bird_classifier.tflite',
+    'CLASSIFIER_BATCH_SIZE': 8,  # Frames pro invoke() in classify_batch (1 = ein invoke pro Frame)
+    # Interpreter-Layout (Classifier + Detector): POOL_SIZE Interpreter × NUM_THREADS Threads
+    # Pi 5 (4 Kerne): z.B. 2×2 oder 4×1 – mit benchmark_interpreter_pool ermitteln
+    'ML_INTERPRETER_POOL_SIZE': 1,
+    'ML_INTERPRETER_NUM_THREADS': None,  # None = TFLite Default
+    'ML_USE_XNNPACK': True,  # XNNPACK Delegate (Standard-Resolver); False = nur Builtin-Kernels
+    'ML_FAST_RESIZE': False,  # True = BILINEAR statt LANCZOS/BICUBIC beim Skalieren der Model-Inputs
 
     # MQTT Home Assistant Integration
     'MQTT_BROKER': os.environ.get('MQTT_BROKER', '192.168.178.150'),
@@ -219,6 +287,9 @@ BIRDY_SETTINGS = {
     'MQTT_USERNAME': os.environ.get('MQTT_USERNAME', 'mqtt-user'),
     'MQTT_PASSWORD': os.environ.get('MQTT_PASSWORD', ''),
     'MQTT_TOPIC_PREFIX': 'birdy',
+    # Persistente Verbindung in start_birdy; publiziert nur geänderte Werte (Hash pro Topic)
+    'MQTT_FULL_REFRESH_SECONDS': 900,    # Abgleich mit der DB als Sicherheitsnetz für verpasste Events
+    'MQTT_WEIGHT_DEADBAND_GRAMS': 1.0,   # Gewichtsänderungen darunter (Sensorrauschen) nicht publizieren
 
     # Base URL für Media-Links (z.B. in Home Assistant)
     'BIRDY_BASE_URL': os.environ.get('BIRDY_BASE_URL', 'http://192.168.178.132:8000'),
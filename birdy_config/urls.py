@@ -16,10 +16,10 @@ Including another URLconf
 """
 
 # --- birdy_config/urls.py ---
-from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path, re_path
-from django.views.static import serve
+
+from media_manager.views import serve_media
 
 from . import views
 
@@ -27,12 +27,13 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('detections/', views.detections, name='detections'),
     path('statistics/', views.statistics, name='statistics'),
+    path('events/', views.live_events, name='live_events'),
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
 ]
 
-# Media files (Videos, Photos) - direkt über Django ausliefern (kein Nginx)
+# Media files (Videos, Photos) - Range/ETag/sendfile, optional via nginx X-Accel-Redirect (MEDIA_SERVE_MODE)
 urlpatterns += [
-    re_path(r'^media/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
+    re_path(r'^media/(?P<path>.*)$', serve_media, name='media'),
 ]
 
@@ -3,32 +3,35 @@ Birdy Web Views - Frontend Website
 """
 import json
 
-from django.core.paginator import Paginator
+from django.conf import settings
 from django.db.models import Count, Sum
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
 from django.utils import timezone
 
-from species.models import BirdDetection, BirdSpecies, MonthlyStatistics
+from species.models import BirdDetection, BirdSpecies, DailyStatistics, MonthlyStatistics
+
+from .pagination import count_rows, keyset_page
 
 
 def home(request):
     """Dashboard Homepage"""
-    from django.db.models import Count
+    from django.db.models import F
 
     from sensors.models import SensorStatus
 
-    today = timezone.now().date()
+    today = timezone.localdate()
+
+    # Tageszähler (inkrementell gepflegt, siehe species.statistics) statt Aggregation über BirdDetection
+    today_stats = DailyStatistics.objects.filter(date=today, visit_count__gt=0)
 
     # Sensor Status
     sensor_status = SensorStatus.get_current()
 
     # Statistiken
     stats = {
-        'today_detections': BirdDetection.objects.filter(
-            timestamp__date=today,
-            processed=True,
-            species__isnull=False  # Nur gültige Besuche (>=50% confidence, kein background)
-        ).count(),
+        'today_detections': today_stats.aggregate(total=Sum('visit_count'))['total'] or 0,
         'weight_grams': sensor_status.current_weight_grams or 0,
         'sensors_online': {
             'weight': sensor_status.weight_sensor_online,
@@ -38,13 +41,9 @@ def home(request):
     }
 
     # Anzahl pro Art heute
-    today_species = BirdDetection.objects.filter(
-        timestamp__date=today,
-        processed=True,
-        species__isnull=False
-    ).values('species__common_name_de').annotate(
-        count=Count('id')
-    ).order_by('-count')
+    today_species = today_stats.annotate(
+        count=F('visit_count')
+    ).values('species__common_name_de', 'count').order_by('-count')
 
     # Letzte 12 Detections als Galerie (nur gültige Besuche)
     recent_detections = BirdDetection.objects.filter(
@@ -56,6 +55,10 @@ def home(request):
         'stats': stats,
         'today_species': today_species,
         'recent_detections': recent_detections,
+        'live_events_url': (
+            settings.BIRDY_SETTINGS.get('LIVE_EVENTS_URL', '/events/')
+            if settings.BIRDY_SETTINGS.get('LIVE_EVENTS_ENABLED', False) else None
+        ),
     }
 
     return render(request, 'home.html', context)
@@ -92,16 +95,29 @@ def detections(request):
         # Verstecke Detections ohne Spezies (Background / niedrige Confidence)
         detections_list = detections_list.filter(species__isnull=False)
 
-    # Pagination
-    paginator = Paginator(detections_list, 24)  # 24 pro Seite
-    page_number = request.GET.get('page', 1)
-    detections_page = paginator.get_page(page_number)
+    # Keyset-Pagination über (timestamp, id): kein COUNT(*)/OFFSET, Seite N so schnell wie Seite 1
+    detections_page, next_cursor = keyset_page(detections_list, request.GET.get('cursor'), 24)  # 24 pro Seite
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_url = f"?{params.urlencode()}"
+
+    # Infinite Scroll: Folgeseiten als JSON (gerenderte Einträge + nächste URL)
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({
+            'html': render_to_string('detection_items.html', {'detections': detections_page}, request=request),
+            'next': next_url,
+        })
 
     # Alle Arten für Filter (inkl. "Keine Spezies" Option)
     species_list = BirdSpecies.objects.all().order_by('common_name_de')
 
     context = {
         'detections': detections_page,
+        'next_url': next_url,
+        # Gesamtzahl nur als Planner-Schätzung und nur auf der ersten Seite
+        'total_estimate': None if request.GET.get('cursor') else count_rows(detections_list, estimate=True),
         'species_list': species_list,
         'selected_species': selected_species,
         'min_confidence': min_confidence,
@@ -284,3 +300,41 @@ def statistics(request):
         'table_mode': table_mode,
     }
     return render(request, 'statistics.html', context)
+
+
+async def live_events(request):
+    """
+    Server-Sent Events: neue Detections, vorläufige Arten, Gewicht und Sensor-Status.
+    Nur unter ASGI (birdy-events.service / uvicorn) – unter WSGI (gunicorn, runserver) antwortet der View mit 204.
+    """
+    import asyncio
+
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import HttpResponse, StreamingHttpResponse
+
+    from services.live_events import get_event_hub
+
+    if not isinstance(request, ASGIRequest) or not settings.BIRDY_SETTINGS.get('LIVE_EVENTS_ENABLED', False):
+        # Unter WSGI würde der endlose Stream einen Worker blockieren; 204 beendet EventSource-Reconnects
+        return HttpResponse(status=204)
+
+    hub = get_event_hub()
+    queue = hub.subscribe()
+    heartbeat = settings.BIRDY_SETTINGS.get('LIVE_EVENTS_HEARTBEAT_SECONDS', 15)
+
+    async def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # Kommentarzeile hält Proxies/Browser-Verbindung offen
+                    yield ': ping\n\n'
+        finally:
+            hub.unsubscribe(queue)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: nicht puffern
+    return response
@@ -11,6 +11,8 @@ from django.conf import settings
 from picamera2 import Picamera2
 from PIL import Image
 
+from hardware.recording import wait_for_bird_gone
+
 logger = logging.getLogger('birdy')
 
 # Camera Worker Modus - Nutzt isolierten Prozess für bessere Stabilität
@@ -135,7 +137,8 @@ class CameraController:
                 logger.error(f"Failed to reinitialize camera: {reinit_error}")
             return None
 
-    def record_video_dynamic(self, output_path, pir_sensor, max_duration=None, absence_threshold=None):
+    def record_video_dynamic(self, output_path, pir_sensor, max_duration=None, absence_threshold=None,
+                             on_frame=None, tap_fps=None, last_trigger_at=None, abort=None):
         """
         Nehme Video auf solange der Vogel da ist (PIR-basiert).
 
@@ -148,12 +151,20 @@ class CameraController:
             pir_sensor: PIRSensorController-Instanz (für is_motion_detected())
             max_duration: Maximale Aufnahmedauer in Sekunden (aus Settings wenn None)
             absence_threshold: Sekunden PIR LOW bis Stopp (aus Settings wenn None)
+            on_frame: Live-Frames werden hier nicht unterstützt (nur CameraWorkerProcess 'ringbuffer')
+            tap_fps: Ignoriert (siehe on_frame)
+            last_trigger_at: Optionales Callable → time.time() des letzten PIR-Triggers;
+                             ein neuer Trigger während PIR LOW setzt die Abwesenheit zurück
+            abort: Optionales Callable – Aufnahme sofort beenden sobald es True liefert
 
         Returns:
             tuple: (mp4_path, actual_duration_seconds) oder (None, 0) bei Fehler
         """
         from django.conf import settings as django_settings
 
+        if on_frame is not None:
+            logger.warning("Frame tap requires the camera worker in 'ringbuffer' mode – recording without live frames")
+
         if not self.is_initialized:
             logger.warning("Camera not initialized")
             return None, 0
@@ -201,33 +212,10 @@ class CameraController:
             logger.debug(f"rpicam-vid started (PID={proc.pid})")
 
             # Überwache PIR-State und stoppe wenn Vogel weg
-            start_time = time.time()
-            pir_low_since = None
-
-            while proc.poll() is None:
-                elapsed = time.time() - start_time
-
-                if elapsed >= max_duration:
-                    logger.info(f"Dynamic recording: max_duration {max_duration}s reached")
-                    break
-
-                if pir_sensor is not None and elapsed >= min_recording_duration:
-                    pir_active = pir_sensor.is_motion_detected()
-                    if pir_active:
-                        pir_low_since = None  # PIR wieder HIGH → Vogel da
-                    else:
-                        if pir_low_since is None:
-                            pir_low_since = time.time()
-                        elif (time.time() - pir_low_since) >= absence_threshold:
-                            logger.info(
-                                f"Dynamic recording: PIR LOW for {absence_threshold}s "
-                                f"→ bird gone, stopping after {elapsed:.1f}s"
-                            )
-                            break
-
-                time.sleep(0.2)
-
-            actual_duration = time.time() - start_time
+            actual_duration = wait_for_bird_gone(
+                pir_sensor, max_duration, min_recording_duration, absence_threshold,
+                is_active=lambda: proc.poll() is None, last_trigger_at=last_trigger_at, abort=abort,
+            )
 
             # rpicam-vid stoppen (falls noch läuft)
             if proc.poll() is None:
@@ -247,6 +235,7 @@ class CameraController:
                 '-r', str(self.framerate),
                 '-i', str(h264_path),
                 '-c:v', 'copy',
+                '-movflags', '+faststart',  # moov vorne: Browser/HA starten sofort statt erst nach dem Download
                 str(mp4_path)
             ], capture_output=True, text=True)
             h264_path.unlink(missing_ok=True)
@@ -379,19 +368,16 @@ class CameraController:
                         oder [] bei Fehler
         """
         import tempfile
+
+        from hardware.frame_stream import candidate_frame_rate
+
         try:
             video_path = Path(video_path)
             temp_dir = Path(tempfile.mkdtemp(prefix='birdy_frames_'))
 
             if actual_duration is None:
                 actual_duration = self.recording_duration
-            actual_duration = max(actual_duration, 1.0)  # Mindestens 1s
-
-            if n_frames is None:
-                # 2 Frames pro Sekunde, mindestens 8
-                n_frames = max(8, int(actual_duration * 2.0))
-
-            fps = n_frames / actual_duration
+            n_frames, fps, actual_duration = candidate_frame_rate(actual_duration, n_frames)
 
             result = subprocess.run([
                 'ffmpeg', '-y',
@@ -418,6 +404,35 @@ class CameraController:
             logger.error(f"Failed to extract candidate frames: {e}")
             return []
 
+    def iter_candidate_frames(self, video_path, n_frames=None, actual_duration=None):
+        """
+        Streame Kandidaten-Frames als RGB-Arrays – ohne Temp-Dateien.
+
+        Wie extract_candidate_frames(), aber ffmpeg dekodiert in eine rawvideo
+        Pipe statt JPEGs zu schreiben. Nur das gewählte Frame muss danach noch
+        als JPEG gespeichert werden.
+
+        Args:
+            video_path: Pfad zum MP4-Video
+            n_frames: Anzahl Frames (None → automatisch aus actual_duration berechnen)
+            actual_duration: Tatsächliche Videodauer in Sekunden (None → aus Settings)
+
+        Returns:
+            Generator von np.ndarray [H, W, 3] uint8 (Buffer werden wiederverwendet,
+            zum Behalten .copy() aufrufen)
+        """
+        from hardware.frame_stream import candidate_frame_rate, iter_video_frames
+
+        if actual_duration is None:
+            actual_duration = self.recording_duration
+        n_frames, fps, actual_duration = candidate_frame_rate(actual_duration, n_frames)
+
+        logger.info(
+            f"Streaming ~{n_frames} candidate frames from {Path(video_path).name} "
+            f"({actual_duration:.1f}s, {fps:.1f}fps)"
+        )
+        return iter_video_frames(video_path, fps, self.resolution)
+
     def get_stream_frame(self):
         """Live-Stream Frame"""
         if not self.is_initialized:
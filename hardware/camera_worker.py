@@ -3,13 +3,17 @@ Camera Worker Process - Isolierter Kamera-Prozess
 Läuft unabhängig vom Hauptprozess und kann bei Fehlern neu gestartet werden
 """
 import logging
+import queue
 import subprocess
+import threading
 import time
 from multiprocessing import Process, Queue
 from pathlib import Path
 
 from django.conf import settings
 
+from hardware.recording import wait_for_bird_gone
+
 logger = logging.getLogger('birdy')
 
 
@@ -20,6 +24,8 @@ class CameraWorkerProcess:
         self.process = None
         self.command_queue = Queue()
         self.result_queue = Queue()
+        # Frame-Tap während Ringbuffer-Aufnahmen (Detection Pipeline): (index, timestamp, RGB-Array)
+        self.frame_queue = Queue(maxsize=settings.BIRDY_SETTINGS.get('DETECTION_PIPELINE_QUEUE_SIZE', 8))
         self.is_running = False
         self.is_initialized = False  # Kompatibilität mit CameraController
 
@@ -27,6 +33,16 @@ class CameraWorkerProcess:
         self.framerate = settings.BIRDY_SETTINGS['CAMERA_FRAMERATE']
         self.recording_duration = settings.BIRDY_SETTINGS['RECORDING_DURATION_SECONDS']
 
+        # 'rpicam': Worker stoppen + rpicam-vid (Standard)
+        # 'ringbuffer': Encoder läuft dauerhaft im Worker, Pre-Trigger aus H264RingBuffer
+        self.recording_mode = settings.BIRDY_SETTINGS.get('CAMERA_RECORDING_MODE', 'rpicam')
+        self.pre_trigger_seconds = settings.BIRDY_SETTINGS.get('PRE_TRIGGER_SECONDS', 3)
+
+    @property
+    def supports_frame_tap(self):
+        """Live-Frames während der Aufnahme (on_frame) gibt es nur im Ringbuffer-Modus"""
+        return self.recording_mode == 'ringbuffer'
+
     def start(self):
         """Starte Camera Worker Prozess"""
         if self.process and self.process.is_alive():
@@ -66,16 +82,27 @@ class CameraWorkerProcess:
         time.sleep(2)
         return self.start()
 
-    def record_video_dynamic(self, output_path, pir_sensor, max_duration=None, absence_threshold=None):
+    def record_video_dynamic(self, output_path, pir_sensor, max_duration=None, absence_threshold=None,
+                             on_frame=None, tap_fps=None, last_trigger_at=None, abort=None):
         """
         Nimmt Video auf solange PIR HIGH ist, max max_duration Sekunden.
-        Stoppt den Worker-Prozess für rpicam-vid, startet danach neu.
+
+        Modus 'rpicam': Stoppt den Worker-Prozess für rpicam-vid, startet danach neu.
+        Modus 'ringbuffer': Kamera bleibt offen, Worker schreibt Pre-Trigger Puffer
+        plus Live-Stream (siehe _record_video_dynamic_ringbuffer).
 
         Args:
             output_path: Ziel-Pfad für die MP4-Datei
             pir_sensor: PIRSensorController-Instanz (für is_motion_detected())
             max_duration: Maximale Aufnahmedauer in Sekunden (aus Settings wenn None)
             absence_threshold: Sekunden PIR LOW bis Stopp (aus Settings wenn None)
+            on_frame: Optionaler Callback on_frame(index, timestamp, frame) für Live-Frames
+                      während der Aufnahme (nur 'ringbuffer', siehe supports_frame_tap)
+            tap_fps: Rate der Live-Frames (default: 2fps wie die Kandidaten-Frames)
+            last_trigger_at: Optionales Callable → time.time() des letzten PIR-Triggers;
+                             ein neuer Trigger während PIR LOW setzt die Abwesenheit zurück
+            abort: Optionales Callable – Aufnahme sofort beenden sobald es True liefert
+                   (z.B. Weight Gate: nichts gelandet)
 
         Returns:
             tuple: (mp4_path, actual_duration_seconds) oder (None, 0) bei Fehler
@@ -88,6 +115,15 @@ class CameraWorkerProcess:
             absence_threshold = django_settings.BIRDY_SETTINGS.get('PIR_ABSENCE_THRESHOLD_SECONDS', 3)
         min_recording_duration = django_settings.BIRDY_SETTINGS.get('MIN_RECORDING_DURATION_SECONDS', 5)
 
+        if self.recording_mode == 'ringbuffer':
+            return self._record_video_dynamic_ringbuffer(
+                output_path, pir_sensor, max_duration, absence_threshold, min_recording_duration,
+                on_frame=on_frame, tap_fps=tap_fps or 2.0, last_trigger_at=last_trigger_at,
+                abort=abort,
+            )
+        if on_frame is not None:
+            logger.warning("Frame tap requires CAMERA_RECORDING_MODE='ringbuffer' – recording without live frames")
+
         try:
             output_path = Path(output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -118,33 +154,10 @@ class CameraWorkerProcess:
             logger.debug(f"rpicam-vid started (PID={proc.pid})")
 
             # Überwache PIR und stoppe wenn Vogel weg
-            start_time = time.time()
-            pir_low_since = None
-
-            while proc.poll() is None:
-                elapsed = time.time() - start_time
-
-                if elapsed >= max_duration:
-                    logger.info(f"Dynamic recording: max_duration {max_duration}s reached")
-                    break
-
-                if pir_sensor is not None and elapsed >= min_recording_duration:
-                    pir_active = pir_sensor.is_motion_detected()
-                    if pir_active:
-                        pir_low_since = None
-                    else:
-                        if pir_low_since is None:
-                            pir_low_since = time.time()
-                        elif (time.time() - pir_low_since) >= absence_threshold:
-                            logger.info(
-                                f"Dynamic recording: PIR LOW for {absence_threshold}s "
-                                f"→ bird gone, stopping after {elapsed:.1f}s"
-                            )
-                            break
-
-                time.sleep(0.2)
-
-            actual_duration = time.time() - start_time
+            actual_duration = wait_for_bird_gone(
+                pir_sensor, max_duration, min_recording_duration, absence_threshold,
+                is_active=lambda: proc.poll() is None, last_trigger_at=last_trigger_at, abort=abort,
+            )
 
             # rpicam-vid stoppen falls noch läuft
             if proc.poll() is None:
@@ -156,20 +169,7 @@ class CameraWorkerProcess:
                     proc.wait()
                 logger.debug("rpicam-vid terminated")
 
-            # H.264 → MP4 umwandeln
-            # -f h264 + -r: korrekte Timestamps (ohne: Duration N/A, 1200k fps)
-            mux_result = subprocess.run([
-                'ffmpeg', '-y',
-                '-f', 'h264',
-                '-r', str(self.framerate),
-                '-i', str(h264_path),
-                '-c:v', 'copy',
-                str(mp4_path)
-            ], capture_output=True, text=True)
-            h264_path.unlink(missing_ok=True)
-
-            if mux_result.returncode != 0:
-                logger.error(f"ffmpeg mux failed: {mux_result.stderr[-300:]}")
+            self._mux_h264(h264_path, mp4_path)
 
             # Worker neu starten (Kamera reinitialisieren)
             self.start()
@@ -192,6 +192,136 @@ class CameraWorkerProcess:
                 logger.error(f"Failed to restart camera worker: {reinit_error}")
             return None, 0
 
+    def _record_video_dynamic_ringbuffer(self, output_path, pir_sensor, max_duration,
+                                         absence_threshold, min_recording_duration,
+                                         on_frame=None, tap_fps=2.0, last_trigger_at=None, abort=None):
+        """
+        Dynamische Aufnahme aus dem In-Process Ring Buffer des Workers.
+
+        Kein Kamera-Neustart: der Worker schreibt die letzten PRE_TRIGGER_SECONDS
+        aus dem Puffer und danach den Live-Stream, bis RECORD_STOP kommt.
+        Mit on_frame liefert der Worker zusätzlich tap_fps Live-Frames über
+        frame_queue; ein Reader-Thread ruft on_frame() während der Aufnahme auf.
+
+        Returns:
+            tuple: (mp4_path, actual_duration_seconds) oder (None, 0) bei Fehler
+        """
+        if not self.is_running or not self.process or not self.process.is_alive():
+            logger.error("Camera worker not running, attempting restart...")
+            if not self.restart():
+                return None, 0
+
+        try:
+            output_path = Path(output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            mp4_path = output_path.with_suffix('.mp4')
+            h264_path = mp4_path.with_suffix('.h264')
+
+            logger.info(
+                f"Dynamic recording (ringbuffer): pre={self.pre_trigger_seconds}s, max={max_duration}s, "
+                f"min={min_recording_duration}s, absence_threshold={absence_threshold}s"
+            )
+
+            self._drain_results()
+            self._drain_frames()
+            self.command_queue.put(('RECORD_START', (str(h264_path), tap_fps if on_frame else 0)))
+            result = self.result_queue.get(timeout=5)
+            if not result['success']:
+                logger.error(f"Ring buffer recording start failed: {result['error']}")
+                return None, 0
+
+            pre_trigger_seconds = result['pre_trigger_seconds']
+
+            reader = None
+            if on_frame is not None:
+                reader = threading.Thread(
+                    target=self._read_tapped_frames, args=(on_frame,), daemon=True, name="CameraFrameTap"
+                )
+                reader.start()
+
+            wait_for_bird_gone(
+                pir_sensor, max_duration, min_recording_duration, absence_threshold,
+                last_trigger_at=last_trigger_at, abort=abort,
+            )
+
+            self.command_queue.put(('RECORD_STOP', None))
+            result = self.result_queue.get(timeout=10)
+            if reader is not None:
+                reader.join(timeout=5)
+            if not result['success']:
+                logger.error(f"Ring buffer recording stop failed: {result['error']}")
+                h264_path.unlink(missing_ok=True)
+                return None, 0
+
+            actual_duration = result['duration_seconds']
+            self._mux_h264(h264_path, mp4_path)
+
+            if mp4_path.exists() and mp4_path.stat().st_size > 0:
+                logger.info(
+                    f"Dynamic video recorded: {mp4_path} ({actual_duration:.1f}s, "
+                    f"incl. {pre_trigger_seconds:.1f}s pre-trigger)"
+                )
+                return mp4_path, actual_duration
+            else:
+                logger.error(f"Dynamic recording: output file missing or empty ({mp4_path})")
+                return None, 0
+
+        except Exception as e:
+            logger.error(f"Failed to record dynamic video (ringbuffer): {e}")
+            import traceback
+            traceback.print_exc()
+            self.restart()
+            return None, 0
+
+    def _mux_h264(self, h264_path, mp4_path):
+        """H.264 → MP4 umwandeln, rohe Datei danach löschen"""
+        # -f h264 + -r: korrekte Timestamps (ohne: Duration N/A, 1200k fps)
+        mux_result = subprocess.run([
+            'ffmpeg', '-y',
+            '-f', 'h264',
+            '-r', str(self.framerate),
+            '-i', str(h264_path),
+            '-c:v', 'copy',
+            '-movflags', '+faststart',  # moov vorne: Browser/HA starten sofort statt erst nach dem Download
+            str(mp4_path)
+        ], capture_output=True, text=True)
+        Path(h264_path).unlink(missing_ok=True)
+
+        if mux_result.returncode != 0:
+            logger.error(f"ffmpeg mux failed: {mux_result.stderr[-300:]}")
+        return mux_result.returncode == 0
+
+    def _drain_results(self):
+        """Leere alte Results"""
+        while not self.result_queue.empty():
+            self.result_queue.get_nowait()
+
+    def _drain_frames(self):
+        """Verwerfe übrig gebliebene Live-Frames einer abgebrochenen Aufnahme"""
+        try:
+            while True:
+                self.frame_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _read_tapped_frames(self, on_frame):
+        """Reader-Thread: Live-Frames aus dem Worker an on_frame() weiterreichen bis Sentinel (None)"""
+        while True:
+            try:
+                item = self.frame_queue.get(timeout=15)
+            except queue.Empty:
+                logger.warning("Frame tap: no frames from worker for 15s – stopping reader")
+                return
+
+            if item is None:
+                return
+
+            index, timestamp, frame = item
+            try:
+                on_frame(index, timestamp, frame)
+            except Exception as e:
+                logger.error(f"Frame tap callback failed: {e}")
+
     def record_video_with_pretrigger(self, output_path):
         """
         Nimmt Video auf - Blockierend, wartet auf Ergebnis
@@ -269,6 +399,7 @@ class CameraWorkerProcess:
         from picamera2 import Picamera2
 
         camera = None
+        ring = None
 
         try:
             # Initialisiere Kamera
@@ -283,24 +414,57 @@ class CameraWorkerProcess:
             time.sleep(2)
             logger.info("[Worker] Camera initialized successfully")
 
+            # Ringbuffer-Modus: Encoder läuft dauerhaft in den Pre-Trigger Puffer
+            if self.recording_mode == 'ringbuffer':
+                ring = self._start_ring_buffer(camera)
+
+            # Frame-Tap (nur während RECORD_START … RECORD_STOP mit tap_fps > 0)
+            tap_fps = 0
+            tap_index = 0
+            next_tap = 0.0
+
             # Hauptloop
             while True:
                 try:
-                    # Warte auf Kommando (mit Timeout für Health Check)
-                    if not self.command_queue.empty():
-                        cmd, data = self.command_queue.get(timeout=1)
-
-                        if cmd == 'STOP':
-                            logger.info("[Worker] Received STOP command")
-                            break
-
-                        elif cmd == 'RECORD':
+                    # Warte auf Kommando (blockierend, Timeout für Health Check bzw. nächsten Tap)
+                    timeout = max(0.0, next_tap - time.time()) if tap_fps else 1
+                    try:
+                        cmd, data = self.command_queue.get(timeout=timeout)
+                    except queue.Empty:
+                        cmd, data = None, None
+
+                    if tap_fps and time.time() >= next_tap:
+                        self._tap_frame_worker(camera, tap_index)
+                        tap_index += 1
+                        next_tap = max(next_tap + 1.0 / tap_fps, time.time())
+
+                    if cmd is None:
+                        continue
+
+                    if cmd == 'STOP':
+                        logger.info("[Worker] Received STOP command")
+                        break
+
+                    elif cmd == 'RECORD':
+                        if ring is not None:
+                            self._record_video_ring_worker(ring, data)
+                        else:
                             self._record_video_worker(camera, data)
 
-                        elif cmd == 'PHOTO':
-                            self._capture_photo_worker(camera, data)
+                    elif cmd == 'RECORD_START':
+                        h264_path, tap_fps = data
+                        self._ring_start_worker(ring, h264_path)
+                        tap_index = 0
+                        next_tap = time.time()
 
-                    time.sleep(0.1)
+                    elif cmd == 'RECORD_STOP':
+                        if tap_fps:
+                            tap_fps = 0
+                            self.frame_queue.put(None)  # Sentinel für den Reader-Thread
+                        self._ring_stop_worker(ring)
+
+                    elif cmd == 'PHOTO':
+                        self._capture_photo_worker(camera, data)
 
                 except Exception as e:
                     logger.error(f"[Worker] Error in main loop: {e}")
@@ -314,12 +478,115 @@ class CameraWorkerProcess:
         finally:
             if camera:
                 try:
+                    if ring is not None:
+                        ring.end_recording()
+                        camera.stop_encoder()
                     camera.stop()
                     camera.close()
                     logger.info("[Worker] Camera cleaned up")
                 except Exception:
                     pass
 
+    def _tap_frame_worker(self, camera, index):
+        """Live-Frame für die Detection Pipeline abgreifen - läuft im Worker-Prozess"""
+        try:
+            frame = camera.capture_array('main')
+            self.frame_queue.put_nowait((index, time.time(), frame))
+        except queue.Full:
+            logger.debug(f"[Worker] Frame tap queue full – frame {index} dropped")
+        except Exception as e:
+            logger.error(f"[Worker] Frame tap failed: {e}")
+
+    def _start_ring_buffer(self, camera):
+        """Starte H.264 Encoder in den Pre-Trigger Ring Buffer - läuft im Worker-Prozess"""
+        from picamera2.encoders import H264Encoder
+
+        from hardware.ring_buffer import H264RingBuffer
+
+        ring = H264RingBuffer(self.pre_trigger_seconds, self.framerate)
+        # repeat=True: SPS/PPS vor jedem I-Frame → Datei ab beliebigem Keyframe decodierbar
+        # iperiod=framerate: Keyframe jede Sekunde → Pre-Trigger auf max. 1s genau
+        encoder = H264Encoder(repeat=True, iperiod=int(self.framerate))
+        camera.start_encoder(encoder, ring)
+        logger.info(
+            f"[Worker] Ring buffer encoder started ({self.pre_trigger_seconds}s pre-trigger, "
+            f"{ring.max_frames} frames)"
+        )
+        return ring
+
+    def _ring_start_worker(self, ring, h264_path):
+        """Flushe Pre-Trigger Puffer und schreibe Live-Stream - läuft im Worker-Prozess"""
+        try:
+            if ring is None:
+                raise RuntimeError("Ring buffer mode not active")
+            Path(h264_path).parent.mkdir(parents=True, exist_ok=True)
+            pre_trigger_seconds = ring.begin_recording(h264_path)
+            logger.info(f"[Worker] Ring buffer recording started ({pre_trigger_seconds:.1f}s pre-trigger)")
+            self.result_queue.put({
+                'success': True,
+                'pre_trigger_seconds': pre_trigger_seconds,
+            })
+        except Exception as e:
+            logger.error(f"[Worker] Ring buffer start error: {e}")
+            self.result_queue.put({
+                'success': False,
+                'error': str(e)
+            })
+
+    def _ring_stop_worker(self, ring):
+        """Beende Ring Buffer Aufnahme - läuft im Worker-Prozess"""
+        try:
+            stats = ring.end_recording() if ring is not None else None
+            if stats is None:
+                raise RuntimeError("No ring buffer recording active")
+            logger.info(
+                f"[Worker] Ring buffer recording stopped: {stats['pre_frames']}+{stats['live_frames']} frames, "
+                f"{stats['bytes'] / 1024:.0f} KB"
+            )
+            self.result_queue.put({
+                'success': True,
+                'h264_path': stats['path'],
+                'duration_seconds': stats['duration_seconds'],
+                'pre_trigger_seconds': stats['pre_trigger_seconds'],
+            })
+        except Exception as e:
+            logger.error(f"[Worker] Ring buffer stop error: {e}")
+            self.result_queue.put({
+                'success': False,
+                'error': str(e)
+            })
+
+    def _record_video_ring_worker(self, ring, output_path):
+        """Statische Aufnahme (RECORDING_DURATION_SECONDS) aus dem Ring Buffer - läuft im Worker-Prozess"""
+        try:
+            mp4_path = Path(output_path).with_suffix('.mp4')
+            h264_path = mp4_path.with_suffix('.h264')
+            mp4_path.parent.mkdir(parents=True, exist_ok=True)
+
+            ring.begin_recording(h264_path)
+            time.sleep(self.recording_duration)
+            ring.end_recording()
+
+            if self._mux_h264(h264_path, mp4_path) and mp4_path.exists():
+                logger.info(f"[Worker] Video recorded successfully: {mp4_path}")
+                self.result_queue.put({
+                    'success': True,
+                    'video_path': str(mp4_path),
+                })
+            else:
+                self.result_queue.put({
+                    'success': False,
+                    'error': 'ffmpeg mux failed'
+                })
+
+        except Exception as e:
+            logger.error(f"[Worker] Recording error: {e}")
+            ring.end_recording()
+            self.result_queue.put({
+                'success': False,
+                'error': str(e)
+            })
+
     def _record_video_worker(self, camera, output_path):
         """Nimmt Video auf - läuft im Worker-Prozess"""
         try:
@@ -448,19 +715,16 @@ class CameraWorkerProcess:
                         oder [] bei Fehler
         """
         import tempfile
+
+        from hardware.frame_stream import candidate_frame_rate
+
         try:
             video_path = Path(video_path)
             temp_dir = Path(tempfile.mkdtemp(prefix='birdy_frames_'))
 
             if actual_duration is None:
                 actual_duration = self.recording_duration
-            actual_duration = max(actual_duration, 1.0)  # Mindestens 1s
-
-            if n_frames is None:
-                # 2 Frames pro Sekunde, mindestens 8
-                n_frames = max(8, int(actual_duration * 2.0))
-
-            fps = n_frames / actual_duration
+            n_frames, fps, actual_duration = candidate_frame_rate(actual_duration, n_frames)
 
             result = subprocess.run([
                 'ffmpeg', '-y',
@@ -487,6 +751,35 @@ class CameraWorkerProcess:
             logger.error(f"[Worker] Failed to extract candidate frames: {e}")
             return []
 
+    def iter_candidate_frames(self, video_path, n_frames=None, actual_duration=None):
+        """
+        Streame Kandidaten-Frames als RGB-Arrays – ohne Temp-Dateien.
+
+        Wie extract_candidate_frames(), aber ffmpeg dekodiert in eine rawvideo
+        Pipe statt JPEGs zu schreiben. Nur das gewählte Frame muss danach noch
+        als JPEG gespeichert werden.
+
+        Args:
+            video_path: Pfad zum MP4-Video
+            n_frames: Anzahl Frames (None → automatisch aus actual_duration berechnen)
+            actual_duration: Tatsächliche Videodauer in Sekunden (None → aus Settings)
+
+        Returns:
+            Generator von np.ndarray [H, W, 3] uint8 (Buffer werden wiederverwendet,
+            zum Behalten .copy() aufrufen)
+        """
+        from hardware.frame_stream import candidate_frame_rate, iter_video_frames
+
+        if actual_duration is None:
+            actual_duration = self.recording_duration
+        n_frames, fps, actual_duration = candidate_frame_rate(actual_duration, n_frames)
+
+        logger.info(
+            f"[Worker] Streaming ~{n_frames} candidate frames from {Path(video_path).name} "
+            f"({actual_duration:.1f}s, {fps:.1f}fps)"
+        )
+        return iter_video_frames(video_path, fps, self.resolution)
+
     def get_stream_frame(self):
         """
         Live-Stream Frame - Nicht unterstützt im Worker-Modus
@@ -0,0 +1,92 @@
+"""
+Frame Stream - Kandidaten-Frames direkt aus einer ffmpeg rawvideo Pipe
+Keine Temp-JPEGs: ffmpeg dekodiert das Video und schreibt RGB24 in stdout,
+die Frames landen per readinto() in vorab allozierten NumPy-Buffern.
+"""
+import logging
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger('birdy')
+
+
+def candidate_frame_rate(actual_duration, n_frames=None):
+    """
+    Berechne Extraktions-Framerate für Best-Frame-Selektion.
+
+    Bei dynamischen Aufnahmen proportional mehr Frames (2 fps), mindestens 8.
+
+    Returns:
+        tuple: (n_frames, fps, actual_duration)
+    """
+    actual_duration = max(actual_duration, 1.0)  # Mindestens 1s
+
+    if n_frames is None:
+        # 2 Frames pro Sekunde, mindestens 8
+        n_frames = max(8, int(actual_duration * 2.0))
+
+    return n_frames, n_frames / actual_duration, actual_duration
+
+
+def iter_video_frames(video_path, fps, size, pool_size=2):
+    """
+    Dekodiere Frames aus einem Video als RGB-Arrays (Generator).
+
+    Die gelieferten Arrays sind Views in einen Buffer-Pool und werden nach
+    pool_size weiteren Frames überschrieben – wer ein Frame behalten will
+    (z.B. das beste), muss .copy() aufrufen.
+
+    Args:
+        video_path: Pfad zum Video
+        fps: Extraktions-Framerate (ffmpeg fps-Filter)
+        size: (width, height) – ffmpeg skaliert auf diese Grösse
+        pool_size: Anzahl vorallozierter Frame-Buffer
+
+    Yields:
+        np.ndarray: uint8 [height, width, 3]
+    """
+    width, height = int(size[0]), int(size[1])
+    frame_bytes = width * height * 3
+    pool = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(max(1, pool_size))]
+
+    proc = subprocess.Popen([
+        'ffmpeg', '-v', 'error',
+        '-i', str(video_path),
+        '-vf', f'fps={fps:.4f},scale={width}:{height}',
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgb24',
+        'pipe:1'
+    ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+
+    count = 0
+    try:
+        while True:
+            buffer = pool[count % len(pool)]
+            view = memoryview(buffer.reshape(-1))
+            received = 0
+            while received < frame_bytes:
+                n = proc.stdout.readinto(view[received:])
+                if not n:
+                    break
+                received += n
+
+            if received < frame_bytes:
+                break  # EOF (unvollständiges letztes Frame verwerfen)
+
+            count += 1
+            yield buffer
+
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        stderr = proc.stderr.read().decode(errors='replace')
+        proc.stderr.close()
+        returncode = proc.wait()
+
+        if returncode not in (0, -9) and count == 0:
+            logger.error(f"ffmpeg rawvideo extraction failed: {stderr[-300:]}")
+        else:
+            logger.info(f"Streamed {count} candidate frames from {Path(video_path).name} ({fps:.1f}fps)")
@@ -0,0 +1,137 @@
+"""
+GPIO Backends für den PIR Sensor
+LgpioBackend: echter GPIO Zugriff über lgpio (Polling oder Edge Alerts)
+FakeGPIOBackend: simulierter Pin für Benchmarks ohne Hardware
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger('birdy')
+
+
+class LgpioBackend:
+    """
+    lgpio auf gpiochip0 (Raspberry Pi 5).
+
+    Edge Alerts: gpio_claim_alert() + callback(); lgpio liefert pro Flanke
+    (level, tick) aus seinem eigenen Thread, tick ist der Kernel-Zeitstempel
+    der Flanke in Nanosekunden (CLOCK_MONOTONIC).
+    """
+
+    supports_alerts = True
+
+    def __init__(self, chip=0):
+        try:
+            import lgpio
+        except ImportError:
+            raise ImportError("lgpio library not found. Install with: pip install lgpio")
+
+        self.lgpio = lgpio
+        self.chip = chip
+        self.handle = None
+        self._callback = None
+
+    def open(self):
+        self.handle = self.lgpio.gpiochip_open(self.chip)
+        logger.info(f"GPIO chip opened successfully (handle={self.handle})")
+
+    def claim_input(self, pin):
+        # Flags: LGPIO_SET_PULL_DOWN = 4
+        self.lgpio.gpio_claim_input(self.handle, pin, self.lgpio.SET_PULL_DOWN)
+
+    def claim_alert(self, pin, debounce_us=0):
+        self.lgpio.gpio_claim_alert(self.handle, pin, self.lgpio.BOTH_EDGES, self.lgpio.SET_PULL_DOWN)
+        if debounce_us:
+            # Flanke wird erst gemeldet, wenn der Pegel debounce_us stabil war
+            self.lgpio.gpio_set_debounce_micros(self.handle, pin, int(debounce_us))
+
+    def read(self, pin):
+        return self.lgpio.gpio_read(self.handle, pin)
+
+    def add_edge_callback(self, pin, func):
+        """
+        Args:
+            func: func(level, tick_ns) – level 0/1 (2 = Watchdog, wird ignoriert)
+        """
+        self._callback = self.lgpio.callback(
+            self.handle, pin, self.lgpio.BOTH_EDGES,
+            lambda chip, gpio, level, tick: func(level, tick),
+        )
+
+    def cancel_callbacks(self):
+        if self._callback is not None:
+            self._callback.cancel()
+            self._callback = None
+
+    def free(self, pin):
+        self.lgpio.gpio_free(self.handle, pin)
+
+    def close(self):
+        if self.handle is not None:
+            self.lgpio.gpiochip_close(self.handle)
+            self.handle = None
+
+
+class FakeGPIOBackend:
+    """
+    Simulierter GPIO Pin für Benchmarks ohne Hardware.
+
+    set_level() setzt den Pegel und meldet die Flanke – wie lgpio – mit
+    Zeitstempel (time.monotonic_ns()) an registrierte Edge Callbacks. Mit
+    supports_alerts=False verhält sich das Backend wie ein Chip ohne Alerts
+    (Controller fällt auf Polling zurück).
+    """
+
+    def __init__(self, supports_alerts=True, debounce_us=0):
+        self.supports_alerts = supports_alerts
+        self.handle = None
+        self.level = 0
+        self.debounce_us = debounce_us
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def open(self):
+        self.handle = 0
+
+    def claim_input(self, pin):
+        pass
+
+    def claim_alert(self, pin, debounce_us=0):
+        if not self.supports_alerts:
+            raise RuntimeError("Edge alerts not supported by FakeGPIOBackend(supports_alerts=False)")
+        self.debounce_us = debounce_us
+
+    def read(self, pin):
+        return self.level
+
+    def add_edge_callback(self, pin, func):
+        with self._lock:
+            self._callbacks.append(func)
+
+    def cancel_callbacks(self):
+        with self._lock:
+            self._callbacks = []
+
+    def set_level(self, level):
+        """
+        Pegel setzen (simulierter PIR Ausgang).
+
+        Returns:
+            int: time.monotonic_ns() der Flanke (für Latenz-Messungen)
+        """
+        tick = time.monotonic_ns()
+        if level == self.level:
+            return tick
+        self.level = level
+        with self._lock:
+            callbacks = list(self._callbacks)
+        for func in callbacks:
+            func(level, tick)
+        return tick
+
+    def free(self, pin):
+        pass
+
+    def close(self):
+        self.handle = None
@@ -0,0 +1,198 @@
+"""
+Landing Detector - Landung/Abflug eines Vogels als Gewichtssprung auf der Futterplatte
+Wertet die schnellen Batch-Werte des HX711 Samplers aus (siehe WeightSensor.register_batch_callback)
+und meldet Events mit geschätzter Vogelmasse.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger('birdy')
+
+
+class LandingDetector:
+    """
+    Stufen-Detektor auf dem Gewichtsstrom.
+
+    Solange die Platte frei ist, folgt die Baseline langsam dem Gewicht (Futter
+    wird gefressen, Temperaturdrift). Ein Sprung um >= threshold_grams über die
+    Baseline, der confirm_batches Batches anhält, ist eine Landung; fällt das
+    Gewicht wieder unter threshold_grams / 2 über der Baseline, ist der Vogel weg.
+    Bleibt das Gewicht länger als max_visit_seconds erhöht (Futter nachgefüllt),
+    wird es als neue Baseline übernommen.
+
+    Events sind dicts:
+        {'type': 'landing'|'departure', 'mass_grams', 'timestamp', 'monotonic',
+         'duration_seconds' (nur departure)}
+    """
+
+    def __init__(self, weight_sensor=None, threshold_grams=None, confirm_batches=None,
+                 max_visit_seconds=None, baseline_alpha=0.05):
+        s = settings.BIRDY_SETTINGS
+        self.weight_sensor = weight_sensor
+        self.threshold_grams = s.get('WEIGHT_LANDING_THRESHOLD_GRAMS', 5.0) if threshold_grams is None else threshold_grams
+        self.confirm_batches = s.get('WEIGHT_LANDING_CONFIRM_BATCHES', 2) if confirm_batches is None else confirm_batches
+        self.max_visit_seconds = (
+            s.get('WEIGHT_LANDING_MAX_VISIT_SECONDS', 120) if max_visit_seconds is None else max_visit_seconds
+        )
+        self.baseline_alpha = baseline_alpha  # EMA-Faktor der Baseline bei freier Platte
+
+        self.baseline = None
+        self.bird_on_plate = False
+        self.current_mass_grams = None
+        self._candidate = []           # Batch-Werte über der Schwelle, noch nicht bestätigt
+        self._visit_values = []        # Batch-Werte während der Vogel auf der Platte ist
+        self._landed_at = None         # time.monotonic() der Landung
+        self.events = deque(maxlen=50)  # Letzte Events (für Gate und Massen-Schätzung)
+        self._lock = threading.Lock()
+
+        self.on_landing_callbacks = []
+        self.on_departure_callbacks = []
+
+        if weight_sensor is not None:
+            weight_sensor.register_batch_callback(self.observe)
+
+    def register_landing_callback(self, callback):
+        """
+        Args:
+            callback: Funktion die bei einer Landung aufgerufen wird (erhält Event dict)
+        """
+        if callback not in self.on_landing_callbacks:
+            self.on_landing_callbacks.append(callback)
+
+    def register_departure_callback(self, callback):
+        """
+        Args:
+            callback: Funktion die beim Abflug aufgerufen wird (erhält Event dict)
+        """
+        if callback not in self.on_departure_callbacks:
+            self.on_departure_callbacks.append(callback)
+
+    def observe(self, grams, now=None):
+        """
+        Neuer Gewichtswert (Batch-Callback des Samplers)
+
+        Args:
+            grams: Schneller Gewichtswert in Gramm
+            now: time.monotonic() des Werts
+        """
+        if now is None:
+            now = time.monotonic()
+
+        event = None
+        with self._lock:
+            if self.baseline is None:
+                self.baseline = grams
+                return
+
+            delta = grams - self.baseline
+
+            if not self.bird_on_plate:
+                if delta >= self.threshold_grams:
+                    self._candidate.append(delta)
+                    if len(self._candidate) >= self.confirm_batches:
+                        event = self._landing(now)
+                else:
+                    self._candidate = []
+                    self.baseline += self.baseline_alpha * (grams - self.baseline)
+            else:
+                self._visit_values.append(delta)
+                if delta < self.threshold_grams / 2:
+                    event = self._departure(now)
+                elif now - self._landed_at > self.max_visit_seconds:
+                    logger.info(
+                        f"Weight step held for > {self.max_visit_seconds}s – "
+                        f"treating {delta:.1f}g as new baseline (refill?)"
+                    )
+                    self.baseline = grams
+                    self._reset_visit()
+                else:
+                    self.current_mass_grams = self._mass(self._visit_values)
+
+        if event is not None:
+            self._notify(event)
+
+    def _landing(self, now):
+        self.bird_on_plate = True
+        self._landed_at = now
+        self._visit_values = list(self._candidate)
+        self._candidate = []
+        self.current_mass_grams = self._mass(self._visit_values)
+        event = {
+            'type': 'landing',
+            'mass_grams': self.current_mass_grams,
+            'timestamp': timezone.now(),
+            'monotonic': now,
+        }
+        self.events.append(event)
+        return event
+
+    def _departure(self, now):
+        event = {
+            'type': 'departure',
+            'mass_grams': self._mass(self._visit_values[:-1] or self._visit_values),
+            'timestamp': timezone.now(),
+            'monotonic': now,
+            'duration_seconds': now - self._landed_at,
+        }
+        self.events.append(event)
+        self._reset_visit()
+        return event
+
+    def _reset_visit(self):
+        self.bird_on_plate = False
+        self.current_mass_grams = None
+        self._visit_values = []
+        self._candidate = []
+        self._landed_at = None
+
+    @staticmethod
+    def _mass(values):
+        """Median der Sprunghöhen – robust gegen Schwingen beim Landen/Abheben"""
+        ordered = sorted(values)
+        return round(ordered[len(ordered) // 2], 1)
+
+    def _notify(self, event):
+        if event['type'] == 'landing':
+            logger.info(f"Weight: landing detected (~{event['mass_grams']:.1f}g)")
+            callbacks = self.on_landing_callbacks
+        else:
+            logger.info(
+                f"Weight: departure detected (~{event['mass_grams']:.1f}g, {event['duration_seconds']:.1f}s)"
+            )
+            callbacks = self.on_departure_callbacks
+
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Error in {event['type']} callback: {e}")
+
+    def landed_since(self, since):
+        """
+        Ist seit since (time.monotonic()) ein Vogel gelandet oder sitzt gerade einer auf der Platte?
+        """
+        with self._lock:
+            if self.bird_on_plate:
+                return True
+            return any(e['type'] == 'landing' and e['monotonic'] >= since for e in self.events)
+
+    def estimated_mass(self, since):
+        """
+        Geschätzte Vogelmasse für ein Zeitfenster (z.B. eine Aufnahme)
+
+        Args:
+            since: time.monotonic() Fensterbeginn
+
+        Returns:
+            float oder None: Grösste Masse aus Landungen/Abflügen seit since bzw. aktuelle Masse
+        """
+        with self._lock:
+            masses = [e['mass_grams'] for e in self.events if e['monotonic'] >= since]
+            if self.bird_on_plate and self.current_mass_grams is not None:
+                masses.append(self.current_mass_grams)
+        return max(masses) if masses else None
@@ -1,18 +1,18 @@
 """
 PIR Motion Sensor Interface - Native lgpio Implementation
 Raspberry Pi 5 optimiert - verwendet lgpio direkt ohne gpiozero
+Flanken kommen per lgpio Edge Alert (Interrupt), Polling bleibt als Fallback.
 """
 import logging
+import queue
 import threading
 import time
+from datetime import timedelta
 
 from django.conf import settings
 from django.utils import timezone
 
-try:
-    import lgpio
-except ImportError:
-    raise ImportError("lgpio library not found. Install with: pip install lgpio")
+from hardware.gpio_backend import LgpioBackend
 
 logger = logging.getLogger('birdy')
 
@@ -20,8 +20,15 @@ logger = logging.getLogger('birdy')
 class PIRSensorController:
     """Controller für PIR Bewegungssensor - Native lgpio Implementation"""
 
-    def __init__(self):
-        self.pin = settings.BIRDY_SETTINGS['PIR_SENSOR_PIN']
+    def __init__(self, backend=None, warmup_seconds=None):
+        """
+        Args:
+            backend: GPIO Backend (default: LgpioBackend, FakeGPIOBackend für Benchmarks)
+            warmup_seconds: Sensor-Warmup nach initialize() (default: PIR_WARMUP_SECONDS)
+        """
+        s = settings.BIRDY_SETTINGS
+        self.pin = s['PIR_SENSOR_PIN']
+        self.backend = backend
         self.chip_handle = None
         self.is_initialized = False
         self.last_motion_time = None
@@ -35,87 +42,140 @@ class PIRSensorController:
         self.on_motion_callbacks = []
         self.on_no_motion_callbacks = []
 
-        # Polling Thread für GPIO Monitoring
+        # Edge Alerts (Interrupt) statt 20 Hz Polling; Polling bleibt Fallback
+        self.edge_detection = s.get('PIR_EDGE_DETECTION', True)
+        self.debounce_ms = s.get('PIR_DEBOUNCE_MS', 20)
+        self.warmup_seconds = s.get('PIR_WARMUP_SECONDS', 30) if warmup_seconds is None else warmup_seconds
+        self.mode = None  # 'edge' oder 'poll' (nach initialize())
+
+        # Monitoring Thread: wartet auf Flanken (edge) bzw. pollt den Pin (poll)
         self._monitor_thread = None
         self._monitor_running = False
         self._last_gpio_state = 0
+        self._motion_start_ns = None
+        self._edge_queue = queue.SimpleQueue()  # (level, tick_ns) aus dem lgpio Callback-Thread
+
+        # PIREvents werden gebatcht im Hintergrund gespeichert (nicht im GPIO-Thread)
+        self._event_writer = None
 
     def initialize(self):
         """Initialisiere PIR Sensor mit lgpio"""
         try:
+            if self.backend is None:
+                self.backend = LgpioBackend()
+
             # Öffne GPIO Chip (gpiochip0 auf Raspberry Pi 5)
-            self.chip_handle = lgpio.gpiochip_open(0)
-            logger.info(f"GPIO chip opened successfully (handle={self.chip_handle})")
+            self.backend.open()
+            self.chip_handle = self.backend.handle
 
-            # Konfiguriere GPIO Pin als Input mit Pull-Down
-            # Flags: LGPIO_SET_PULL_DOWN = 4
-            lgpio.gpio_claim_input(self.chip_handle, self.pin, lgpio.SET_PULL_DOWN)
-            logger.info(f"PIR sensor GPIO{self.pin} claimed as input with pull-down")
+            # Konfiguriere GPIO Pin als Input mit Pull-Down – mit Edge Alerts wenn möglich
+            self.mode = 'poll'
+            if self.edge_detection and self.backend.supports_alerts:
+                try:
+                    self.backend.claim_alert(self.pin, debounce_us=self.debounce_ms * 1000)
+                    self.mode = 'edge'
+                    logger.info(
+                        f"PIR sensor GPIO{self.pin} claimed for edge alerts with pull-down "
+                        f"(debounce {self.debounce_ms}ms)"
+                    )
+                except Exception as e:
+                    logger.warning(f"PIR edge alerts unavailable ({e}) – falling back to polling")
+            if self.mode == 'poll':
+                self.backend.claim_input(self.pin)
+                logger.info(f"PIR sensor GPIO{self.pin} claimed as input with pull-down")
 
             # Lese initialen Zustand
-            self._last_gpio_state = lgpio.gpio_read(self.chip_handle, self.pin)
+            self._last_gpio_state = self.backend.read(self.pin)
             logger.info(f"Initial GPIO state: {self._last_gpio_state}")
 
             self.is_initialized = True
 
             # Warte auf Sensor Warmup (ca. 30-60 Sekunden)
-            logger.info("PIR sensor warming up (30s)...")
-            time.sleep(30)
+            if self.warmup_seconds:
+                logger.info(f"PIR sensor warming up ({self.warmup_seconds}s)...")
+                time.sleep(self.warmup_seconds)
 
             # Starte Monitoring Thread
             self._monitor_running = True
-            self._monitor_thread = threading.Thread(target=self._monitor_gpio, daemon=True)
+            if self.mode == 'edge':
+                self._last_gpio_state = self.backend.read(self.pin)
+                self.backend.add_edge_callback(self.pin, self._on_edge)
+                target = self._dispatch_edges
+            else:
+                target = self._monitor_gpio
+            self._monitor_thread = threading.Thread(target=target, daemon=True, name="PIR-Monitor")
             self._monitor_thread.start()
 
-            logger.info("PIR sensor ready (monitoring thread started)")
+            logger.info(f"PIR sensor ready (monitoring thread started, mode={self.mode})")
 
             return True
 
         except Exception as e:
             logger.error(f"Failed to initialize PIR sensor: {e}")
             self.is_initialized = False
-            if self.chip_handle is not None:
+            if self.backend is not None and self.backend.handle is not None:
                 try:
-                    lgpio.gpiochip_close(self.chip_handle)
+                    self.backend.close()
                 except Exception:
                     pass
-                self.chip_handle = None
+            self.chip_handle = None
             return False
 
+    @property
+    def event_writer(self):
+        if self._event_writer is None:
+            from services.pir_event_writer import get_pir_event_writer
+            self._event_writer = get_pir_event_writer()
+        return self._event_writer
+
+    def _on_edge(self, level, tick_ns):
+        """
+        lgpio Edge Callback (lgpio Thread) – nur einreihen, damit DB-Zugriffe und
+        Detection-Callbacks die Auslieferung weiterer Flanken nicht blockieren.
+        """
+        if level in (0, 1):  # 2 = Watchdog Timeout
+            self._edge_queue.put((level, tick_ns))
+
+    def _dispatch_edges(self):
+        """
+        Background Thread im Edge-Modus: schläft bis eine Flanke kommt (kein Polling).
+        Zeitstempel und Bewegungsdauer basieren auf dem Kernel-Zeitstempel der Flanke.
+        """
+        logger.debug("PIR edge dispatch thread started")
+
+        while self._monitor_running:
+            item = self._edge_queue.get()
+            if item is None:
+                break
+
+            level, tick_ns = item
+            # Doppelte Flanke mit gleichem Pegel (Prellen, verpasste Gegenflanke) ignorieren
+            if level == self._last_gpio_state:
+                continue
+
+            try:
+                delay = timedelta(microseconds=max(0, time.monotonic_ns() - tick_ns) / 1000)
+                self._process_state_change(level, timezone.now() - delay, tick_ns)
+            except Exception as e:
+                logger.error(f"Error in PIR edge dispatch thread: {e}")
+
+        logger.debug("PIR edge dispatch thread stopped")
+
     def _monitor_gpio(self):
         """
-        Background Thread der kontinuierlich GPIO Pin überwacht
+        Background Thread der kontinuierlich GPIO Pin überwacht (Polling-Fallback)
         Erkennt Zustandsänderungen (LOW->HIGH, HIGH->LOW)
         """
         logger.debug("PIR GPIO monitoring thread started")
 
-        motion_start_time = None
-
         while self._monitor_running:
             try:
                 # Lese aktuellen GPIO Zustand
-                current_state = lgpio.gpio_read(self.chip_handle, self.pin)
+                current_state = self.backend.read(self.pin)
 
                 # Zustandsänderung erkannt
                 if current_state != self._last_gpio_state:
-                    timestamp = timezone.now()
-
-                    if current_state == 1:
-                        # LOW -> HIGH (Bewegung erkannt)
-                        logger.debug(f"PIR: GPIO {self.pin} went HIGH (motion)")
-                        motion_start_time = time.time()
-                        self._handle_motion_detected(timestamp, current_state)
-
-                    else:
-                        # HIGH -> LOW (Bewegung beendet)
-                        logger.debug(f"PIR: GPIO {self.pin} went LOW (no motion)")
-                        duration = None
-                        if motion_start_time:
-                            duration = time.time() - motion_start_time
-                        self._handle_no_motion(timestamp, current_state, duration)
-                        motion_start_time = None
-
-                    self._last_gpio_state = current_state
+                    self._process_state_change(current_state, timezone.now(), time.monotonic_ns())
 
                 # Poll alle 50ms (20 Hz)
                 time.sleep(0.05)
@@ -126,6 +186,32 @@ class PIRSensorController:
 
         logger.debug("PIR GPIO monitoring thread stopped")
 
+    def _process_state_change(self, current_state, timestamp, tick_ns):
+        """
+        Gemeinsame Flanken-Logik für Edge- und Polling-Modus
+
+        Args:
+            current_state: Neuer GPIO Pegel (0/1)
+            timestamp: Zeitpunkt der Flanke (timezone-aware)
+            tick_ns: Monotoner Zeitstempel der Flanke in Nanosekunden
+        """
+        if current_state == 1:
+            # LOW -> HIGH (Bewegung erkannt)
+            logger.debug(f"PIR: GPIO {self.pin} went HIGH (motion)")
+            self._motion_start_ns = tick_ns
+            self._handle_motion_detected(timestamp, current_state)
+
+        else:
+            # HIGH -> LOW (Bewegung beendet)
+            logger.debug(f"PIR: GPIO {self.pin} went LOW (no motion)")
+            duration = None
+            if self._motion_start_ns:
+                duration = (tick_ns - self._motion_start_ns) / 1e9
+            self._handle_no_motion(timestamp, current_state, duration)
+            self._motion_start_ns = None
+
+        self._last_gpio_state = current_state
+
     def _handle_motion_detected(self, timestamp, gpio_state):
         """Interner Handler für Bewegungserkennung"""
         logger.debug(f"PIR: _handle_motion_detected called, GPIO state={gpio_state}")
@@ -142,9 +228,8 @@ class PIRSensorController:
 
         logger.info(f"PIR: Motion detected! (gpio={gpio_state})")
 
-        # Speichere Event in DB
-        from sensors.models import PIREvent
-        event = PIREvent.objects.create(event_type='triggered')
+        # Event nur einreihen – der Writer speichert es im Hintergrund (id folgt asynchron)
+        event = self.event_writer.submit('triggered', timestamp)
 
         # Rufe alle registrierten Callbacks auf
         for callback in self.on_motion_callbacks:
@@ -164,12 +249,8 @@ class PIRSensorController:
 
         logger.info(f"PIR: No motion (duration: {duration:.2f}s, gpio={gpio_state})")
 
-        # Speichere Event in DB
-        from sensors.models import PIREvent
-        event = PIREvent.objects.create(
-            event_type='cleared',
-            duration_seconds=duration
-        )
+        # Event nur einreihen – der Writer speichert es im Hintergrund (id folgt asynchron)
+        event = self.event_writer.submit('cleared', timestamp, duration_seconds=duration)
 
         # Rufe alle registrierten Callbacks auf
         for callback in self.on_no_motion_callbacks:
@@ -183,7 +264,7 @@ class PIRSensorController:
         Registriere Callback für Bewegungserkennung
 
         Args:
-            callback: Funktion die aufgerufen wird (erhält PIREvent als Parameter)
+            callback: Funktion die aufgerufen wird (erhält PendingPIREvent als Parameter)
         """
         if callback not in self.on_motion_callbacks:
             self.on_motion_callbacks.append(callback)
@@ -194,7 +275,7 @@ class PIRSensorController:
         Registriere Callback für Ende der Bewegung
 
         Args:
-            callback: Funktion die aufgerufen wird (erhält PIREvent als Parameter)
+            callback: Funktion die aufgerufen wird (erhält PendingPIREvent als Parameter)
         """
         if callback not in self.on_no_motion_callbacks:
             self.on_no_motion_callbacks.append(callback)
@@ -205,7 +286,7 @@ class PIRSensorController:
         if not self.is_initialized or self.chip_handle is None:
             return False
         try:
-            return lgpio.gpio_read(self.chip_handle, self.pin) == 1
+            return self.backend.read(self.pin) == 1
         except Exception:
             return False
 
@@ -225,7 +306,7 @@ class PIRSensorController:
 
         start_time = time.time()
         while True:
-            if lgpio.gpio_read(self.chip_handle, self.pin) == 1:
+            if self.backend.read(self.pin) == 1:
                 return True
 
             if timeout is not None and (time.time() - start_time) >= timeout:
@@ -249,7 +330,7 @@ class PIRSensorController:
 
         start_time = time.time()
         while True:
-            if lgpio.gpio_read(self.chip_handle, self.pin) == 0:
+            if self.backend.read(self.pin) == 0:
                 return True
 
             if timeout is not None and (time.time() - start_time) >= timeout:
@@ -262,19 +343,26 @@ class PIRSensorController:
         try:
             # Stoppe Monitoring Thread
             self._monitor_running = False
+            if self.mode == 'edge':
+                self.backend.cancel_callbacks()
+                self._edge_queue.put(None)
             if self._monitor_thread and self._monitor_thread.is_alive():
                 self._monitor_thread.join(timeout=2)
                 logger.debug("Monitoring thread stopped")
 
+            # Ausstehende PIREvents noch schreiben
+            if self._event_writer is not None:
+                self._event_writer.stop()
+
             # Freigebe GPIO und schließe Chip
             if self.chip_handle is not None:
                 try:
-                    lgpio.gpio_free(self.chip_handle, self.pin)
+                    self.backend.free(self.pin)
                     logger.debug(f"GPIO{self.pin} freed")
                 except Exception:
                     pass
 
-                lgpio.gpiochip_close(self.chip_handle)
+                self.backend.close()
                 logger.info("PIR sensor closed")
                 self.chip_handle = None
 
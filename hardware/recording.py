@@ -0,0 +1,59 @@
+"""
+Dynamische Aufnahme - gemeinsame Stopp-Logik für CameraController und CameraWorkerProcess
+"""
+import logging
+import time
+
+logger = logging.getLogger('birdy')
+
+
+def wait_for_bird_gone(pir_sensor, max_duration, min_recording_duration, absence_threshold,
+                       is_active=None, last_trigger_at=None, abort=None):
+    """
+    Blockiert bis der Vogel weg ist (PIR LOW für absence_threshold) oder max_duration erreicht.
+
+    Args:
+        pir_sensor: PIRSensorController-Instanz (für is_motion_detected()) oder None
+        max_duration: Maximale Aufnahmedauer in Sekunden
+        min_recording_duration: Mindestdauer, bevor PIR LOW die Aufnahme beenden darf
+        absence_threshold: Sekunden PIR LOW bis Stopp
+        is_active: Optionales Callable – Abbruch sobald es False liefert (z.B. rpicam-vid beendet)
+        last_trigger_at: Optionales Callable – PIR-Trigger nach Beginn der LOW-Phase zählen als Anwesenheit
+        abort: Optionales Callable – sofortiger Abbruch sobald es True liefert
+
+    Returns:
+        float: Verstrichene Aufnahmezeit in Sekunden
+    """
+    start_time = time.time()
+    pir_low_since = None
+
+    while is_active is None or is_active():
+        elapsed = time.time() - start_time
+
+        if elapsed >= max_duration:
+            logger.info(f"Dynamic recording: max_duration {max_duration}s reached")
+            break
+
+        if abort is not None and abort():
+            logger.info(f"Dynamic recording: aborted after {elapsed:.1f}s")
+            break
+
+        if pir_sensor is not None and elapsed >= min_recording_duration:
+            pir_active = pir_sensor.is_motion_detected()
+            if not pir_active and pir_low_since is not None and last_trigger_at is not None:
+                pir_active = last_trigger_at() >= pir_low_since
+            if pir_active:
+                pir_low_since = None
+            else:
+                if pir_low_since is None:
+                    pir_low_since = time.time()
+                elif (time.time() - pir_low_since) >= absence_threshold:
+                    logger.info(
+                        f"Dynamic recording: PIR LOW for {absence_threshold}s "
+                        f"→ bird gone, stopping after {elapsed:.1f}s"
+                    )
+                    break
+
+        time.sleep(0.2)
+
+    return time.time() - start_time
@@ -0,0 +1,201 @@
+"""
+Pre-Trigger Ring Buffer - H.264 Frames im Speicher puffern
+Hält die letzten N Sekunden des laufenden Encoders vor, damit bei einem
+PIR-Trigger die Landung des Vogels bereits im Video enthalten ist.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger('birdy')
+
+try:
+    from picamera2.outputs import Output as _OutputBase
+except ImportError:
+    # Ohne picamera2 (z.B. Benchmark mit FakeFrameSource) reicht ein minimales Output-Interface
+    class _OutputBase:
+        def __init__(self, pts=None):
+            self.recording = False
+
+        def start(self):
+            self.recording = True
+
+        def stop(self):
+            self.recording = False
+
+
+class H264RingBuffer(_OutputBase):
+    """
+    Zirkulärer Puffer für encodierte H.264 Frames (picamera2 Output).
+
+    Der Encoder läuft dauerhaft und ruft outputframe() für jeden Frame auf.
+    Ohne aktive Aufnahme werden die Frames in einer deque mit fester Länge
+    gehalten (PRE_TRIGGER_SECONDS × Framerate). begin_recording() schreibt den
+    Puffer ab dem ersten Keyframe in die Zieldatei und hängt danach alle Live-
+    Frames direkt an, bis end_recording() aufgerufen wird. Die Kamera wird
+    dabei nie freigegeben.
+    """
+
+    def __init__(self, seconds, framerate):
+        super().__init__()
+        self.framerate = framerate
+        self.max_frames = max(1, int(round(seconds * framerate)))
+        self._frames = deque(maxlen=self.max_frames)
+        self._lock = threading.Lock()
+
+        # Aktive Aufnahme
+        self._file = None
+        self._file_path = None
+        self._waiting_for_keyframe = False
+        self._pre_frames = 0
+        self._live_frames = 0
+        self._bytes_written = 0
+        self._record_start = None
+
+    def outputframe(self, frame, keyframe=True, timestamp=None, *args, **kwargs):
+        """Callback des Encoders (läuft im Encoder-Thread)"""
+        # Encoder kann den Buffer wiederverwenden → Kopie nötig
+        data = bytes(frame)
+
+        with self._lock:
+            if self._file is None:
+                self._frames.append((data, keyframe))
+                return
+
+            if self._waiting_for_keyframe:
+                if not keyframe:
+                    return
+                self._waiting_for_keyframe = False
+
+            self._file.write(data)
+            self._live_frames += 1
+            self._bytes_written += len(data)
+
+    @property
+    def is_recording(self):
+        return self._file is not None
+
+    @property
+    def buffered_seconds(self):
+        """Aktuell gepufferte Pre-Trigger Dauer in Sekunden"""
+        return len(self._frames) / self.framerate if self.framerate else 0.0
+
+    def begin_recording(self, path):
+        """
+        Starte Aufnahme: Pre-Trigger Puffer + Live-Stream nach path schreiben.
+
+        Args:
+            path: Ziel-Pfad für die rohe H.264-Datei
+
+        Returns:
+            float: Tatsächlich enthaltene Pre-Trigger Sekunden
+        """
+        with self._lock:
+            if self._file is not None:
+                raise RuntimeError(f"Ring buffer already recording to {self._file_path}")
+
+            frames = list(self._frames)
+            self._frames.clear()
+
+            # Decodierbar erst ab Keyframe (SPS/PPS werden mit repeat=True pro I-Frame mitgesendet)
+            start = next((i for i, (_, keyframe) in enumerate(frames) if keyframe), None)
+
+            self._file = open(path, 'wb')
+            self._file_path = path
+            self._pre_frames = 0
+            self._live_frames = 0
+            self._bytes_written = 0
+            self._record_start = time.time()
+
+            if start is None:
+                self._waiting_for_keyframe = True
+            else:
+                self._waiting_for_keyframe = False
+                for data, _ in frames[start:]:
+                    self._file.write(data)
+                    self._bytes_written += len(data)
+                self._pre_frames = len(frames) - start
+
+            pre_frames = self._pre_frames
+            pre_trigger_seconds = pre_frames / self.framerate
+
+        logger.debug(
+            f"Ring buffer flush: {pre_frames} pre-trigger frames "
+            f"({pre_trigger_seconds:.1f}s) → {path}"
+        )
+        return pre_trigger_seconds
+
+    def end_recording(self):
+        """
+        Beende Aufnahme und schliesse Datei. Puffer füllt sich danach neu.
+
+        Returns:
+            dict mit 'pre_frames', 'live_frames', 'pre_trigger_seconds',
+            'duration_seconds', 'bytes' oder None wenn keine Aufnahme aktiv
+        """
+        with self._lock:
+            if self._file is None:
+                return None
+            f = self._file
+            self._file = None
+            stats = {
+                'path': self._file_path,
+                'pre_frames': self._pre_frames,
+                'live_frames': self._live_frames,
+                'pre_trigger_seconds': self._pre_frames / self.framerate,
+                'duration_seconds': (self._pre_frames + self._live_frames) / self.framerate,
+                'bytes': self._bytes_written,
+            }
+            self._file_path = None
+
+        f.close()
+        return stats
+
+
+class FakeFrameSource:
+    """
+    Synthetischer H.264 Encoder für Benchmarks ohne Kamera.
+
+    Ruft output.outputframe() mit fester Framerate auf; jeder gop-te Frame ist
+    ein (grösserer) Keyframe – wie H264Encoder(iperiod=gop).
+    """
+
+    def __init__(self, output, framerate=15, frame_bytes=12000, gop=15):
+        self.output = output
+        self.framerate = framerate
+        self.frame_bytes = frame_bytes
+        self.gop = gop
+        self.frames_emitted = 0
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="FakeFrameSource")
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        p_frame = bytes(self.frame_bytes)
+        i_frame = bytes(self.frame_bytes * 5)
+        interval = 1.0 / self.framerate
+        next_time = time.monotonic()
+
+        while self._running:
+            keyframe = self.frames_emitted % self.gop == 0
+            self.output.outputframe(
+                i_frame if keyframe else p_frame,
+                keyframe=keyframe,
+                timestamp=int(self.frames_emitted * interval * 1_000_000),
+            )
+            self.frames_emitted += 1
+
+            next_time += interval
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
@@ -1,10 +1,15 @@
 """
 Weight Sensor Interface - HX711 Wägezelle
 Verwendet die HX711 Library von tatobari
+Ein Sampler-Thread liest kontinuierlich in einen NumPy Ring Buffer;
+read_weight_grams() liefert nur noch den aktuellen Snapshot.
 """
 import logging
+import threading
 import time
+from collections import deque
 
+import numpy as np
 from django.conf import settings
 
 logger = logging.getLogger('birdy')
@@ -21,22 +26,40 @@ class WeightSensor:
     """Interface für HX711 Wägezelle"""
 
     def __init__(self):
-        self.dt_pin = settings.BIRDY_SETTINGS['WEIGHT_SENSOR_DT_PIN']
-        self.sck_pin = settings.BIRDY_SETTINGS['WEIGHT_SENSOR_SCK_PIN']
+        s = settings.BIRDY_SETTINGS
+        self.dt_pin = s['WEIGHT_SENSOR_DT_PIN']
+        self.sck_pin = s['WEIGHT_SENSOR_SCK_PIN']
         self.hx711 = None
+        self._hx711_lock = threading.Lock()  # Sampler-Thread vs. tare()/calibrate()
         self.calibration_factor = 1.0
         self.tare_offset = 0
         self.is_initialized = False
         # Gleitender Durchschnitt zur Glättung
-        self.weight_history = []
         self.history_size = 5  # Letzte 5 Messungen speichern
+        self.weight_history = deque(maxlen=self.history_size)
         # Automatische Drift-Kompensation
-        self.zero_readings = []  # Messungen wenn Waage leer ist
-        self.stable_readings = []  # Stabile Messungen (unabhängig vom Gewicht)
+        self.zero_readings = deque(maxlen=20)  # Messungen wenn Waage leer ist
+        self.stable_readings = deque(maxlen=30)  # Stabile Messungen (unabhängig vom Gewicht): (raw, weight)
         self.last_weight_stable = None  # Letztes stabiles Gewicht
         self.last_drift_compensation = time.time()
         self.drift_compensation_interval = 3600  # Alle 60 Minuten prüfen
 
+        # Ring Buffer der Rohwerte (letzte WEIGHT_RING_SIZE Einzelmessungen)
+        self._ring = np.zeros(s.get('WEIGHT_RING_SIZE', 50), dtype=np.float64)
+        self._ring_pos = 0
+        self._ring_count = 0
+        self.trim_fraction = 0.1  # Obere und untere 10% verwerfen (Vibrationen beim Landen/Abheben)
+
+        # Snapshot des gefilterten Gewichts – wird vom Sampler nach jedem Batch ersetzt
+        self._snapshot = None
+        # Glättung + Drift-Buchhaltung im festen Takt (wie früher die 30s Messung in start_birdy)
+        self.history_interval = s.get('WEIGHT_HISTORY_INTERVAL_SECONDS', 30)
+        self.max_snapshot_age = s.get('WEIGHT_MAX_SNAPSHOT_AGE_SECONDS', 10)
+        self._sampler_thread = None
+        self._sampling = False
+        # Callbacks pro HX711 Batch: callback(fast_grams, timestamp) – z.B. LandingDetector
+        self.on_batch_callbacks = []
+
     def initialize(self):
         """Initialisiere HX711 Sensor"""
         if HX711 is None:
@@ -79,7 +102,8 @@ class WeightSensor:
             readings = []
             for i in range(samples):
                 try:
-                    val = self.hx711.get_raw_data(NUMBER_HW_MEASUREMENTS)
+                    with self._hx711_lock:
+                        val = self.hx711.get_raw_data(NUMBER_HW_MEASUREMENTS)
                     if val is not False:  # HX711 gibt False bei Fehler zurück
                         for j in range (NUMBER_HW_MEASUREMENTS):
                             readings.append(val[j])
@@ -135,7 +159,8 @@ class WeightSensor:
             readings = []
             for i in range(samples):
                 try:
-                    val = self.hx711.get_raw_data(NUMBER_HW_MEASUREMENTS)
+                    with self._hx711_lock:
+                        val = self.hx711.get_raw_data(NUMBER_HW_MEASUREMENTS)
                     if val is not False:
                         for j in range (NUMBER_HW_MEASUREMENTS):
                             readings.append(val[j] - self.tare_offset)
@@ -169,88 +194,208 @@ class WeightSensor:
             print(f"✗ Kalibrierung fehlgeschlagen: {e}")
             return False
 
-    def read_weight_grams(self, samples=10):
+    def start_sampler(self):
+        """Starte den Sampler-Thread (liest HX711 kontinuierlich in den Ring Buffer)"""
+        if not self.is_initialized or self._sampling:
+            return
+        self._sampling = True
+        self._sampler_thread = threading.Thread(target=self._sample_loop, daemon=True, name="HX711-Sampler")
+        self._sampler_thread.start()
+        logger.info(f"Weight sampler started (ring={len(self._ring)} readings)")
+
+    def stop_sampler(self):
+        """Stoppe den Sampler-Thread"""
+        self._sampling = False
+        if self._sampler_thread and self._sampler_thread.is_alive():
+            self._sampler_thread.join(timeout=2)
+        self._sampler_thread = None
+
+    def register_batch_callback(self, callback):
         """
-        Lese aktuelles Gewicht in Gramm mit verbesserter Filterung
+        Registriere Callback für jeden HX711 Batch des Samplers
 
         Args:
-            samples: Anzahl Messungen für Durchschnitt (Standard: 10)
+            callback: Funktion callback(fast_grams, timestamp) – fast_grams ist der Median
+                      der NUMBER_HW_MEASUREMENTS Einzelwerte des Batches (ohne Ring-Glättung),
+                      timestamp ist time.monotonic()
+        """
+        if callback not in self.on_batch_callbacks:
+            self.on_batch_callbacks.append(callback)
+
+    def _to_grams(self, reading):
+        if self.calibration_factor == 0:
+            return 0.0
+        return (reading - self.tare_offset) / self.calibration_factor
+
+    def _sample_loop(self):
+        last_history = 0.0
+        while self._sampling:
+            try:
+                batch = self._read_batch()
+                if batch is None:
+                    time.sleep(0.1)
+                    continue
 
-        Returns:
-            float: Gewicht in Gramm oder None bei Fehler
+                if self.on_batch_callbacks:
+                    fast_grams = self._to_grams(float(np.median(batch)))
+                    timestamp = time.monotonic()
+                    for callback in self.on_batch_callbacks:
+                        try:
+                            callback(fast_grams, timestamp)
+                        except Exception as e:
+                            logger.error(f"Error in weight batch callback: {e}")
+
+                snapshot = self._update_snapshot()
+                now = time.monotonic()
+                if now - last_history >= self.history_interval:
+                    self._record_history(snapshot)
+                    last_history = now
+            except Exception as e:
+                logger.error(f"Error in weight sampler: {e}")
+                time.sleep(0.5)  # Längere Pause bei Fehler
+
+    def _read_batch(self):
         """
-        if not self.is_initialized:
-            logger.warning("Sensor not initialized")
-            return None
+        Ein get_raw_data() Batch in den Ring Buffer schreiben
 
+        Returns:
+            list: Rohwerte des Batches oder None bei Fehler
+        """
         try:
-            readings = []
-            for _ in range(samples):
-                try:
-                    val = self.hx711.get_raw_data(NUMBER_HW_MEASUREMENTS)
-                    if val is not False:
-                        for j in range (NUMBER_HW_MEASUREMENTS):
-                            readings.append(val[j])
-                    time.sleep(0.1)  # Längere Pause zwischen Messungen
-                except Exception:
-                    continue
-
-            if not readings:
-                return None
+            with self._hx711_lock:
+                val = self.hx711.get_raw_data(NUMBER_HW_MEASUREMENTS)
+        except Exception:
+            return None
+        if val is False:  # HX711 gibt False bei Fehler zurück
+            return None
 
-            # Entferne Ausreißer (z.B. durch Vibrationen beim Landen/Abheben)
-            # Sortiere und entferne obere und untere 10%
-            readings_sorted = sorted(readings)
-            trim_count = max(1, int(len(readings_sorted) * 0.1))
-            trimmed_readings = readings_sorted[trim_count:-trim_count]
+        batch = val[:NUMBER_HW_MEASUREMENTS]
+        size = len(self._ring)
+        for reading in batch:
+            self._ring[self._ring_pos] = reading
+            self._ring_pos = (self._ring_pos + 1) % size
+        self._ring_count = min(self._ring_count + len(batch), size)
+        return batch
 
-            if not trimmed_readings:
-                trimmed_readings = readings_sorted
+    def _update_snapshot(self):
+        """
+        Robuste Statistik über den Ring Buffer: Median, getrimmter Mittelwert, Streuung
 
-            avg_reading = sum(trimmed_readings) / len(trimmed_readings)
-            weight_raw = avg_reading - self.tare_offset
-            weight_grams = weight_raw / self.calibration_factor if self.calibration_factor != 0 else 0
+        Returns:
+            dict: Neuer Snapshot (ersetzt self._snapshot atomar)
+        """
+        n = self._ring_count
+        window = self._ring[:n].copy() if n < len(self._ring) else self._ring.copy()
+
+        # Obere und untere 10% per Partition statt Sortierung entfernen
+        trim_count = max(1, int(n * self.trim_fraction))
+        if n > 2 * trim_count:
+            window.partition((trim_count, n - trim_count - 1))
+            trimmed = window[trim_count:n - trim_count]
+        else:
+            trimmed = window
+
+        avg_reading = float(trimmed.mean())
+        weight_grams = self._to_grams(avg_reading)
+
+        # Negative Werte auf 0 setzen (aber nur kleine negative Werte durch Sensor-Drift)
+        # Wenn Wert > -50g ist, setze auf 0, sonst könnte Kalibrierung falsch sein
+        if weight_grams < 0 and weight_grams > -50:
+            weight_grams = 0.0
+
+        previous = self._snapshot
+        snapshot = {
+            'weight_grams': weight_grams,
+            'smoothed_grams': previous['smoothed_grams'] if previous else None,
+            'avg_reading': avg_reading,
+            'median_reading': float(np.median(window)),
+            'std_reading': float(trimmed.std()),
+            'spread': float(window.max() - window.min()),
+            'samples': n,
+            'updated_at': time.monotonic(),
+        }
+        self._snapshot = snapshot
+        return snapshot
+
+    def _record_history(self, snapshot):
+        """Glättung und Drift-Buchhaltung (im Takt von history_interval)"""
+        # Gleitender Durchschnitt zur Glättung von Schwankungen
+        self.weight_history.append(snapshot['weight_grams'])
+        smoothed_weight = sum(self.weight_history) / len(self.weight_history)
+        snapshot['smoothed_grams'] = smoothed_weight
 
-            # Debug-Logging mit Min/Max für Schwankungsanalyse
-            min_reading = min(readings)
-            max_reading = max(readings)
-            spread = max_reading - min_reading
+        # Automatische Drift-Kompensation
+        # 1. Wenn Waage nahezu leer ist (< 5g), sammle Null-Punkt
+        if -5 < smoothed_weight < 5:
+            self.zero_readings.append(snapshot['avg_reading'])
+
+        # 2. Sammle stabile Messungen (wenn spread klein ist, d.h. wenig Schwankung)
+        # Spread < 100 bedeutet stabile Bedingungen (kein Vogel landet/fliegt)
+        if snapshot['spread'] < 100:
+            self.stable_readings.append((snapshot['avg_reading'], smoothed_weight))
+
+        # Alle X Minuten: Prüfe ob Drift-Kompensation nötig ist
+        current_time = time.time()
+        if current_time - self.last_drift_compensation > self.drift_compensation_interval:
+            self._compensate_drift()
+            self.last_drift_compensation = current_time
+
+        logger.debug(
+            f"Weight sensor: raw={snapshot['weight_grams']:.1f}g, smoothed={smoothed_weight:.1f}g, "
+            f"spread={snapshot['spread']:.2f}, std={snapshot['std_reading']:.2f}, "
+            f"zero={len(self.zero_readings)}, stable={len(self.stable_readings)}"
+        )
+        return smoothed_weight
+
+    def snapshot(self):
+        """
+        Aktueller gefilterter Zustand des Ring Buffers (ohne HX711 Zugriff)
 
-            # Negative Werte auf 0 setzen (aber nur kleine negative Werte durch Sensor-Drift)
-            # Wenn Wert > -50g ist, setze auf 0, sonst könnte Kalibrierung falsch sein
-            if weight_grams < 0 and weight_grams > -50:
-                weight_grams = 0.0
+        Returns:
+            dict oder None: weight_grams, smoothed_grams, median/std/spread der Rohwerte, age_seconds
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        result = dict(snapshot)
+        result['age_seconds'] = time.monotonic() - snapshot['updated_at']
+        return result
 
-            # Gleitender Durchschnitt zur Glättung von Schwankungen
-            self.weight_history.append(weight_grams)
-            if len(self.weight_history) > self.history_size:
-                self.weight_history.pop(0)
+    def read_weight_grams(self, samples=10):
+        """
+        Lese aktuelles Gewicht in Gramm mit verbesserter Filterung
 
-            smoothed_weight = sum(self.weight_history) / len(self.weight_history)
+        Mit laufendem Sampler ein O(1) Snapshot; ohne Sampler (z.B. test_weight)
+        werden wie bisher samples Batches blockierend gelesen.
 
-            # Automatische Drift-Kompensation
-            # 1. Wenn Waage nahezu leer ist (< 5g), sammle Null-Punkt
-            if -5 < smoothed_weight < 5:
-                self.zero_readings.append(avg_reading)
-                if len(self.zero_readings) > 20:
-                    self.zero_readings.pop(0)
+        Args:
+            samples: Anzahl Messungen für Durchschnitt ohne Sampler (Standard: 10)
 
-            # 2. Sammle stabile Messungen (wenn spread klein ist, d.h. wenig Schwankung)
-            # Spread < 100 bedeutet stabile Bedingungen (kein Vogel landet/fliegt)
-            if spread < 100:
-                self.stable_readings.append((avg_reading, smoothed_weight))
-                if len(self.stable_readings) > 30:
-                    self.stable_readings.pop(0)
+        Returns:
+            float: Gewicht in Gramm oder None bei Fehler
+        """
+        if not self.is_initialized:
+            logger.warning("Sensor not initialized")
+            return None
 
-            # Alle X Minuten: Prüfe ob Drift-Kompensation nötig ist
-            current_time = time.time()
-            if current_time - self.last_drift_compensation > self.drift_compensation_interval:
-                self._compensate_drift()
-                self.last_drift_compensation = current_time
+        try:
+            if self._sampling:
+                snapshot = self._snapshot
+                if snapshot is None or time.monotonic() - snapshot['updated_at'] > self.max_snapshot_age:
+                    return None  # Sampler liefert keine Werte mehr
+                if snapshot['smoothed_grams'] is None:
+                    return snapshot['weight_grams']
+                return snapshot['smoothed_grams']
+
+            read_any = False
+            for _ in range(samples):
+                read_any = self._read_batch() is not None or read_any
+                time.sleep(0.1)  # Längere Pause zwischen Messungen
 
-            logger.debug(f"Weight sensor: raw={weight_grams:.1f}g, smoothed={smoothed_weight:.1f}g, spread={spread:.2f}, zero={len(self.zero_readings)}, stable={len(self.stable_readings)}")
+            if not read_any:
+                return None
 
-            return smoothed_weight
+            return self._record_history(self._update_snapshot())
 
         except Exception as e:
             logger.error(f"Failed to read weight: {e}")
@@ -266,7 +411,7 @@ class WeightSensor:
         try:
             # Strategie 1: Waage ist leer (bevorzugt, da genauer)
             if len(self.zero_readings) >= 10:
-                avg_zero = sum(self.zero_readings) / len(self.zero_readings)
+                avg_zero = float(np.mean(self.zero_readings))
                 drift = avg_zero - self.tare_offset
 
                 if abs(drift) > 50:
@@ -275,7 +420,7 @@ class WeightSensor:
 
                     logger.info(f"Drift compensation (zero): tare_offset {old_offset:.2f} -> {self.tare_offset:.2f} (drift: {drift:.2f})")
                     self._save_calibration()
-                    self.zero_readings = []
+                    self.zero_readings.clear()
                     return
                 else:
                     logger.debug(f"Zero-based drift within tolerance: {drift:.2f}")
@@ -285,20 +430,12 @@ class WeightSensor:
             # dann ist die Differenz wahrscheinlich Temperaturdrift
             if len(self.stable_readings) >= 20:
                 # Teile in zwei Hälften: alt (erste 50%) vs neu (letzte 50%)
-                mid = len(self.stable_readings) // 2
-                old_readings = self.stable_readings[:mid]
-                new_readings = self.stable_readings[mid:]
+                stable = np.asarray(self.stable_readings)  # [N, 2]: (raw, weight)
+                mid = len(stable) // 2
 
                 # Berechne Durchschnitte
-                old_weights = [w for _, w in old_readings]
-                new_weights = [w for _, w in new_readings]
-                old_raw = [r for r, _ in old_readings]
-                new_raw = [r for r, _ in new_readings]
-
-                avg_old_weight = sum(old_weights) / len(old_weights)
-                avg_new_weight = sum(new_weights) / len(new_weights)
-                avg_old_raw = sum(old_raw) / len(old_raw)
-                avg_new_raw = sum(new_raw) / len(new_raw)
+                avg_old_raw, avg_old_weight = stable[:mid].mean(axis=0)
+                avg_new_raw, avg_new_weight = stable[mid:].mean(axis=0)
 
                 # Gewichtsänderung in Gramm (kann durch Fressen sein)
                 weight_change = avg_new_weight - avg_old_weight  # Kann negativ sein (Futter wird gegessen)
@@ -323,7 +460,8 @@ class WeightSensor:
                     logger.info(f"Drift compensation (stable+change): tare_offset {old_offset:.2f} -> {self.tare_offset:.2f} (drift: {drift_component:.2f}, weight changed {weight_change:.1f}g from {avg_old_weight:.1f}g to {avg_new_weight:.1f}g)")
                     self._save_calibration()
                     # Behalte einige neuere Messungen als Basis für nächste Runde
-                    self.stable_readings = self.stable_readings[mid:]
+                    for _ in range(mid):
+                        self.stable_readings.popleft()
                     return
                 else:
                     logger.debug(f"Drift component within tolerance: {drift_component:.2f}")
@@ -386,6 +524,7 @@ class WeightSensor:
     def cleanup(self):
         """Cleanup GPIO"""
         try:
+            self.stop_sampler()
             if self.hx711:
                 # HX711 Library hat kein explizites cleanup
                 logger.info("Weight sensor cleanup")
@@ -1,15 +1,26 @@
 """
 Home Assistant MQTT Client Integration
+Eine persistente Verbindung im start_birdy Prozess. Publiziert wird event-getrieben
+(Detection, Gewicht, Sensor-Status) und nur bei Änderung: pro Topic wird der Hash
+des letzten Payloads gehalten. refresh() gleicht den DB-Stand in grossen Abständen
+als Sicherheitsnetz ab – bei unverändertem Stand nur mit den wenigen nicht-retained Zuständen
+und ohne USB-Zugriff.
 """
+import hashlib
 import json
 import logging
 import os
+import threading
+import time
 
 import paho.mqtt.client as mqtt
 from django.conf import settings
+from django.utils import timezone
 
 logger = logging.getLogger('birdy')
 
+HA_STATUS_TOPIC = 'homeassistant/status'
+
 
 class HomeAssistantMQTT:
     """MQTT Client für Home Assistant Integration"""
@@ -21,9 +32,22 @@ class HomeAssistantMQTT:
         self.password = settings.BIRDY_SETTINGS['MQTT_PASSWORD']
         self.topic_prefix = settings.BIRDY_SETTINGS['MQTT_TOPIC_PREFIX']
 
+        self.refresh_seconds = settings.BIRDY_SETTINGS.get('MQTT_FULL_REFRESH_SECONDS', 900)
+        self.weight_deadband = settings.BIRDY_SETTINGS.get('MQTT_WEIGHT_DEADBAND_GRAMS', 1.0)
+
         self.client = None
         self.is_connected = False
 
+        self._lock = threading.Lock()
+        self._digests = {}             # topic → Hash des zuletzt publizierten Payloads
+        self._retained = set()         # Topics mit retain=True (überleben HA-Neustarts im Broker)
+        self._last_weight = None
+        self._refresh_pending = True   # Nach (Re-)Connect kompletten Stand publizieren
+        self._last_refresh = 0.0
+        self._refresh_date = None
+        self.published = 0
+        self.skipped = 0
+
     def initialize(self):
         """Initialisiere MQTT Client"""
         try:
@@ -32,13 +56,16 @@ class HomeAssistantMQTT:
             # Callbacks setzen
             self.client.on_connect = self._on_connect
             self.client.on_disconnect = self._on_disconnect
+            self.client.on_message = self._on_message
 
             # Authentication wenn konfiguriert
             if self.username and self.password:
                 self.client.username_pw_set(self.username, self.password)
 
-            # Verbinde zu Broker
-            self.client.connect(self.broker, self.port, keepalive=60)
+            # Verbindung im Loop-Thread aufbauen: Broker beim Boot nicht erreichbar
+            # oder später neu gestartet → paho verbindet selbständig neu
+            self.client.reconnect_delay_set(min_delay=1, max_delay=60)
+            self.client.connect_async(self.broker, self.port, keepalive=60)
 
             # Starte Loop in separatem Thread
             self.client.loop_start()
@@ -58,9 +85,32 @@ class HomeAssistantMQTT:
 
             # Publiziere Discovery Messages für Home Assistant
             self._publish_discovery()
+
+            # Birth Message: HA neu gestartet → Zustände neu senden
+            self.client.subscribe(HA_STATUS_TOPIC)
+
+            # Broker kann retained Messages verloren haben → alles neu publizieren
+            self._request_full_refresh()
         else:
             logger.error(f"MQTT connection failed with code {rc}")
 
+    def _on_message(self, client, userdata, message):
+        """Callback für abonnierte Topics (nur HA Birth Message)"""
+        if message.topic == HA_STATUS_TOPIC and message.payload == b'online':
+            logger.info("Home Assistant online – republishing discovery and state")
+            self._publish_discovery()
+            self._request_full_refresh()
+
+    def _request_full_refresh(self):
+        """
+        Alle Hashes verwerfen, refresh() publiziert beim nächsten Aufruf den kompletten Stand.
+        DB-Abfragen laufen nicht im paho-Thread, sondern im Main Loop.
+        """
+        with self._lock:
+            self._digests.clear()
+            self._last_weight = None
+            self._refresh_pending = True
+
     def _on_disconnect(self, client, userdata, rc):
         """Callback bei Disconnect"""
         self.is_connected = False
@@ -126,6 +176,25 @@ class HomeAssistantMQTT:
             retain=True
         )
 
+        # Sensor: Vorläufige Spezies während der Aufnahme (Detection Pipeline)
+        provisional_config = {
+            "name": "Birdy Current Species",
+            "state_topic": f"{self.topic_prefix}/bird/provisional",
+            "value_template": "{{ value_json.species }}",
+            "json_attributes_topic": f"{self.topic_prefix}/bird/provisional",
+            "unique_id": "birdy_current_species",
+            "icon": "mdi:bird",
+            "device": {
+                "identifiers": ["birdy_feeder"],
+                "name": "Birdy Bird Feeder"
+            }
+        }
+        self.client.publish(
+            "homeassistant/sensor/birdy/provisional_species/config",
+            json.dumps(provisional_config),
+            retain=True
+        )
+
         # Camera: Letzter Besucher (Foto via MQTT)
         camera_config = {
             "name": "Birdy Last Visitor",
@@ -163,22 +232,72 @@ class HomeAssistantMQTT:
 
         logger.info("Home Assistant discovery messages published")
 
+    def _unchanged(self, topic, digest):
+        with self._lock:
+            return self._digests.get(topic) == digest
+
+    def _publish(self, topic, payload, retain=False, fingerprint=None):
+        """
+        Payload nur publizieren, wenn er sich seit der letzten Publikation geändert hat
+
+        Args:
+            topic: MQTT Topic
+            payload: str oder bytes
+            retain: Retained Message
+            fingerprint: Statt des Payloads zu hashender Schlüssel (z.B. Pfad eines Bildes)
+
+        Returns:
+            bool: True wenn publiziert
+        """
+        if not self.is_connected:
+            return False
+
+        data = payload.encode() if isinstance(payload, str) else payload
+        key = fingerprint.encode() if fingerprint is not None else data
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        if self._unchanged(topic, digest):
+            self.skipped += 1
+            return False
+
+        info = self.client.publish(topic, data, retain=retain)
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            logger.warning(f"MQTT publish to {topic} failed with code {info.rc}")
+            return False
+
+        with self._lock:
+            self._digests[topic] = digest
+            if retain:
+                self._retained.add(topic)
+        self.published += 1
+        return True
+
     def publish_weight(self, weight_grams):
         """
-        Publiziere Futtermenge
+        Publiziere Futtermenge (Rauschen unterhalb MQTT_WEIGHT_DEADBAND_GRAMS wird unterdrückt)
 
         Args:
             weight_grams: Gewicht in Gramm
         """
-        if not self.is_connected:
+        if weight_grams is None:
+            return
+        if self._last_weight is not None and abs(weight_grams - self._last_weight) < self.weight_deadband:
             return
 
-        topic = f"{self.topic_prefix}/feed/weight"
-        self.client.publish(topic, f"{weight_grams:.1f}")
+        if self._publish(f"{self.topic_prefix}/feed/weight", f"{weight_grams:.1f}"):
+            self._last_weight = weight_grams
+
+    def publish_bird_present(self, present):
+        """
+        Publiziere ob ein Vogel auf der Futterstelle ist
+
+        Args:
+            present: bool
+        """
+        self._publish(f"{self.topic_prefix}/bird/detected", "ON" if present else "OFF")
 
     def publish_bird_detected(self, detection):
         """
-        Publiziere Vogel-Detektion
+        Publiziere Vogel-Detektion (inkl. Tagesstatistik)
 
         Args:
             detection: BirdDetection Model Instance
@@ -186,17 +305,20 @@ class HomeAssistantMQTT:
         if not self.is_connected:
             return
 
-        base_url = settings.BIRDY_SETTINGS['BIRDY_BASE_URL']
+        self.publish_bird_present(True)
+        self._publish_last_detection(detection)
+        self.publish_daily_stats(detection.local_date or timezone.localdate())
+
+        logger.info("Bird detection published to MQTT")
 
-        # Bird Present
-        self.client.publish(f"{self.topic_prefix}/bird/detected", "ON")
+    def _publish_last_detection(self, detection):
+        """Species, Attribute und Kamerabild der letzten Detection (retained)"""
+        base_url = settings.BIRDY_SETTINGS['BIRDY_BASE_URL']
 
         # Species Name + Attribute
         if detection.species:
             species_name = detection.species.common_name_de
-            self.client.publish(
-                f"{self.topic_prefix}/bird/species", species_name, retain=True
-            )
+            self._publish(f"{self.topic_prefix}/bird/species", species_name, retain=True)
 
             # Attribute mit Photo/Video URLs
             attributes = {
@@ -209,47 +331,56 @@ class HomeAssistantMQTT:
                 attributes["photo_url"] = f"{base_url}{detection.photo.file_url}"
             if detection.video and detection.video.file_url:
                 attributes["video_url"] = f"{base_url}{detection.video.file_url}"
+                if detection.video.hls_url:
+                    attributes["hls_url"] = f"{base_url}{detection.video.hls_url}"
 
-            self.client.publish(
-                f"{self.topic_prefix}/bird/attributes",
-                json.dumps(attributes),
-                retain=True
-            )
+            self._publish(f"{self.topic_prefix}/bird/attributes", json.dumps(attributes), retain=True)
 
         # Foto als Binary für MQTT Camera Entity
         self._publish_last_photo(detection)
 
-        logger.info("Bird detection published to MQTT")
+    def publish_provisional_species(self, species_name, confidence):
+        """
+        Publiziere vorläufige Spezies während der Aufnahme läuft
+
+        Args:
+            species_name: Label der aktuell besten Klassifikation
+            confidence: Konfidenz 0-1
+        """
+        self.publish_bird_present(True)
+        self._publish(
+            f"{self.topic_prefix}/bird/provisional",
+            json.dumps({"species": species_name, "confidence": f"{confidence:.2%}", "final": False})
+        )
 
     def _publish_last_photo(self, detection):
-        """Publiziere Foto als Binary auf Camera-Topic"""
+        """Publiziere Foto als Binary auf Camera-Topic (Datei wird nur bei neuem Foto gelesen)"""
         if not detection.photo:
             return
 
-        photo_path = detection.photo.file_path
+        # JPEG-Thumbnail reicht für die HA Kamera-Entity (Original nur als Fallback)
+        photo_path = detection.photo.thumbnail_file_path(640)
         if not photo_path or not os.path.exists(photo_path):
             logger.warning(f"Photo file not found: {photo_path}")
             return
 
+        topic = f"{self.topic_prefix}/camera/last_visitor"
+        fingerprint = f"{photo_path}:{os.stat(photo_path).st_mtime_ns}"
+        if self._unchanged(topic, hashlib.blake2b(fingerprint.encode(), digest_size=16).digest()):
+            return
+
         try:
             with open(photo_path, 'rb') as f:
                 image_data = f.read()
 
-            self.client.publish(
-                f"{self.topic_prefix}/camera/last_visitor",
-                image_data,
-                retain=True
-            )
-            logger.debug(f"Published photo to MQTT camera ({len(image_data)} bytes)")
+            if self._publish(topic, image_data, retain=True, fingerprint=fingerprint):
+                logger.debug(f"Published photo to MQTT camera ({len(image_data)} bytes)")
         except Exception as e:
             logger.error(f"Failed to publish photo to MQTT: {e}")
 
     def publish_bird_left(self):
         """Publiziere dass Vogel weg ist"""
-        if not self.is_connected:
-            return
-
-        self.client.publish(f"{self.topic_prefix}/bird/detected", "OFF")
+        self.publish_bird_present(False)
 
     def publish_daily_stats(self, date):
         """
@@ -261,47 +392,92 @@ class HomeAssistantMQTT:
         if not self.is_connected:
             return
 
-        from django.db.models import Avg, Count
+        from django.db.models import Sum
 
-        from species.models import BirdDetection
+        from species.models import DailyStatistics
 
-        # Gesamtbesuche heute (nur gültige Besuche mit Spezies)
-        total_visits = BirdDetection.objects.filter(
-            timestamp__date=date,
-            processed=True,
-            species__isnull=False  # Nur gültige Besuche (>=50% confidence, kein background)
-        ).count()
+        # Gesamtbesuche (Tageszähler: nur neue Besuche mit gültiger Spezies)
+        total_visits = DailyStatistics.objects.filter(
+            date=date
+        ).aggregate(total=Sum('visit_count'))['total'] or 0
 
         # Publiziere Anzahl Besuche heute
-        self.client.publish(f"{self.topic_prefix}/stats/today", str(total_visits))
+        self._publish(f"{self.topic_prefix}/stats/today", str(total_visits))
 
         # Top 5 Spezies heute
-        top_species = BirdDetection.objects.filter(
-            timestamp__date=date,
-            processed=True,
-            species__isnull=False
-        ).values('species__common_name_de', 'species__scientific_name').annotate(
-            visits=Count('id'),
-            avg_conf=Avg('confidence')
-        ).order_by('-visits')[:5]
+        top_species = DailyStatistics.objects.filter(
+            date=date,
+            visit_count__gt=0
+        ).select_related('species').order_by('-visit_count')[:5]
 
         stats_data = {
             "date": date.isoformat(),
             "total_visits": total_visits,
             "top_species": [
                 {
-                    "name": stat['species__common_name_de'],
-                    "scientific_name": stat['species__scientific_name'],
-                    "visits": stat['visits'],
-                    "avg_confidence": f"{stat['avg_conf']:.2%}" if stat['avg_conf'] else "0%"
+                    "name": stat.species.common_name_de,
+                    "scientific_name": stat.species.scientific_name,
+                    "visits": stat.visit_count,
+                    "avg_confidence": f"{stat.avg_confidence:.2%}" if stat.avg_confidence else "0%"
                 }
                 for stat in top_species
             ]
         }
 
-        self.client.publish(
-            f"{self.topic_prefix}/stats/daily",
-            json.dumps(stats_data)
+        self._publish(f"{self.topic_prefix}/stats/daily", json.dumps(stats_data))
+
+    def refresh(self):
+        """
+        Sicherheitsnetz für verpasste Events (im Main Loop aufrufen, kehrt meist sofort zurück).
+
+        Gleicht den kompletten Stand aus der DB ab: nach (Re-)Connect, HA-Neustart, bei
+        Datumswechsel (Tageszähler auf 0) und alle MQTT_FULL_REFRESH_SECONDS. Nicht-retained
+        Topics (Gewicht, Anwesenheit, Statistik) werden dabei immer neu gesendet, unveränderte
+        retained Topics (Species, Attribute, Kamerabild) nicht.
+        """
+        if not self.is_connected:
+            return
+
+        now = time.monotonic()
+        today = timezone.localdate()
+        with self._lock:
+            due = (
+                self._refresh_pending
+                or today != self._refresh_date
+                or now - self._last_refresh >= self.refresh_seconds
+            )
+            if not due:
+                return
+            self._refresh_pending = False
+            # Nicht-retained Werte kennt ein Subscriber nur, wenn er sie live empfangen hat
+            self._digests = {topic: digest for topic, digest in self._digests.items() if topic in self._retained}
+            self._last_weight = None
+        self._last_refresh = now
+        self._refresh_date = today
+
+        from sensors.models import SensorStatus
+        from species.models import BirdDetection
+
+        published_before = self.published
+        try:
+            status = SensorStatus.get_current()
+            self.publish_weight(status.current_weight_grams)
+            self.publish_bird_present(status.bird_present)
+            self.publish_daily_stats(today)
+
+            last_detection = BirdDetection.objects.filter(
+                processed=True,
+                species__isnull=False
+            ).select_related('species', 'photo', 'video').first()
+            if last_detection:
+                self._publish_last_detection(last_detection)
+        except Exception as e:
+            logger.error(f"MQTT refresh failed: {e}")
+            return
+
+        logger.debug(
+            f"MQTT refresh: {self.published - published_before} topic(s) changed "
+            f"(total published={self.published}, skipped={self.skipped})"
         )
 
     def cleanup(self):
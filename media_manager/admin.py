@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.utils.safestring import mark_safe
 
 from .models import MediaStorageStats, Photo, Video
+from .templatetags.media_tags import video_player
 
 
 @admin.register(Photo)
@@ -21,7 +22,7 @@ class PhotoAdmin(admin.ModelAdmin):
     def photo_preview(self, obj):
         """Zeige Photo-Preview im Admin"""
         if obj.file:
-            html = f'<img src="{obj.file.url}" style="max-width: 800px; height: auto; border: 1px solid #ccc;">'
+            html = f'<img src="{obj.thumbnail_url(640)}" style="max-width: 800px; height: auto; border: 1px solid #ccc;">'
             return mark_safe(html)
         return 'Kein Foto'
     photo_preview.short_description = 'Foto Vorschau'
@@ -72,9 +73,9 @@ class VideoAdmin(admin.ModelAdmin):
         if obj.file:
             html = '<div style="max-width: 800px;">'
 
-            # Zeige Thumbnail wenn vorhanden
-            if obj.thumbnail_frame:
-                html += f'<img src="{obj.thumbnail_frame.url}" style="max-width: 100%; height: auto; border: 1px solid #ccc;"><br><br>'
+            # Player mit Poster (bestes Frame), HLS wenn vorhanden
+            html += video_player(obj, preload='metadata', css_style='max-width: 100%; border: 1px solid #ccc;')
+            html += '<br><br>'
 
             # Video-Info und Download-Link
             html += f'''
@@ -0,0 +1,100 @@
+"""
+Management Command - Thumbnails (AVIF/WebP/JPEG) für vorhandene Fotos nachgenerieren
+Dekodieren + Encodieren ist CPU-gebunden → Process Pool über alle Kerne, DB-Updates im Hauptprozess.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from media_manager.models import Photo
+from media_manager.thumbnails import available_formats, generate_thumbnails
+
+
+def _render(photo_id, media_root, relpath, widths, formats, quality):
+    """Worker: nur Dateiarbeit, keine DB (läuft im Subprozess)"""
+    try:
+        return photo_id, generate_thumbnails(media_root, relpath, widths=widths, formats=formats, quality=quality), None
+    except Exception as e:
+        return photo_id, None, str(e)
+
+
+class Command(BaseCommand):
+    help = 'Generiert Thumbnails für Fotos ohne Thumbnails (parallel auf allen CPU-Kernen)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Anzahl Prozesse (default: alle CPU-Kerne)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Auch Fotos mit vorhandenen Thumbnails neu generieren'
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=200,
+            help='DB-Updates pro bulk_update (default: 200)'
+        )
+
+    def handle(self, *args, **options):
+        s = settings.BIRDY_SETTINGS
+        widths = tuple(s.get('THUMBNAIL_WIDTHS', (320, 640)))
+        formats = tuple(available_formats(s.get('THUMBNAIL_FORMATS', ('avif', 'webp', 'jpeg'))))
+        quality = s.get('THUMBNAIL_QUALITY', 75)
+
+        photos = Photo.objects.exclude(file='').exclude(file__isnull=True)
+        if not options['force']:
+            photos = photos.filter(is_thumbnail_generated=False)
+        jobs = list(photos.values_list('id', 'file'))
+
+        self.stdout.write(self.style.SUCCESS('=== Photo Thumbnails ===\n'))
+        self.stdout.write(f'Fotos:    {len(jobs)}')
+        self.stdout.write(f'Formate:  {", ".join(formats)}')
+        self.stdout.write(f'Breiten:  {", ".join(str(w) for w in widths)}')
+        self.stdout.write(f'Prozesse: {options["workers"]}')
+        self.stdout.write('')
+        if not jobs:
+            return
+
+        media_root = str(settings.MEDIA_ROOT)
+        pending = []
+        done = failed = 0
+        t0 = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = [
+                pool.submit(_render, photo_id, media_root, relpath, widths, formats, quality)
+                for photo_id, relpath in jobs
+            ]
+            for future in as_completed(futures):
+                photo_id, variants, error = future.result()
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'Fehler bei Photo {photo_id}: {error}'))
+                    continue
+
+                photo = Photo(id=photo_id)
+                photo.set_thumbnails(variants)
+                pending.append(photo)
+                done += 1
+                if len(pending) >= options['batch']:
+                    self._save(pending)
+                    pending = []
+                    self.stdout.write(f'  {done}/{len(jobs)} ({done / (time.perf_counter() - t0):.1f} Fotos/s)')
+
+        self._save(pending)
+        elapsed = time.perf_counter() - t0
+        self.stdout.write(self.style.SUCCESS(
+            f'{done} Fotos in {elapsed:.1f}s ({done / elapsed:.1f} Fotos/s), {failed} Fehler'
+        ))
+
+    def _save(self, photos):
+        if photos:
+            Photo.objects.bulk_update(photos, ['thumbnails', 'thumbnail_path', 'is_thumbnail_generated'])
@@ -0,0 +1,178 @@
+"""
+Load Test: Wie viele gleichzeitige Video-Streams schafft der Media-Server?
+Jeder Client spielt ein Video in Echtzeit ab (Range-Requests in Abspiel-Bitrate,
+wie ein Browser-Player) – eine Stufe gilt als gehalten, wenn jeder Stream
+mindestens die Bitrate des Videos bekommt.
+"""
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Misst, wie viele parallele Video-Streams (Range, Echtzeit-Bitrate) der Media-Server hält'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Video-URL (default: neuestes Video über BIRDY_BASE_URL)'
+        )
+        parser.add_argument(
+            '--streams',
+            default='1,2,4,8,16,32',
+            help='Komma-separierte Anzahl paralleler Streams pro Stufe (default: 1,2,4,8,16,32)'
+        )
+        parser.add_argument(
+            '--seconds',
+            type=float,
+            default=15.0,
+            help='Dauer pro Stufe in Sekunden (default: 15)'
+        )
+        parser.add_argument(
+            '--chunk-kb',
+            type=int,
+            default=256,
+            help='Grösse eines Range-Requests in KB (default: 256)'
+        )
+        parser.add_argument(
+            '--bitrate-factor',
+            type=float,
+            default=1.0,
+            help='Abspielgeschwindigkeit relativ zur Video-Bitrate (default: 1.0)'
+        )
+
+    def handle(self, *args, **options):
+        url = options['url'] or self._default_url()
+        parts = urlsplit(url)
+        size = self._content_length(parts)
+        bitrate = self._bitrate(size) * options['bitrate_factor']
+        levels = [int(n) for n in options['streams'].split(',')]
+
+        self.stdout.write(self.style.SUCCESS('=== Media Load Test ===\n'))
+        self.stdout.write(f'URL:      {url}')
+        self.stdout.write(f'Grösse:   {size / 1e6:.1f} MB')
+        self.stdout.write(f'Bitrate:  {bitrate * 8 / 1e6:.2f} Mbit/s pro Stream (Soll)')
+        self.stdout.write(f'Stufe:    {options["seconds"]:.0f}s, Chunks {options["chunk_kb"]} KB')
+        self.stdout.write('')
+        self.stdout.write(
+            f'  {"Streams":>7} {"Gesamt MB/s":>12} {"Min Mbit/s":>11} {"TTFB p50":>9} {"TTFB p95":>9} '
+            f'{"Stalls":>7} {"Fehler":>7}  Ergebnis'
+        )
+
+        sustained = 0
+        for n in levels:
+            result = self._run_level(parts, size, bitrate, n, options['seconds'], options['chunk_kb'] * 1024)
+            ok = result['errors'] == 0 and result['min_rate'] >= bitrate * 0.98
+            if ok:
+                sustained = n
+            ttfb = sorted(result['ttfb'])
+            p50 = statistics.median(ttfb) * 1000 if ttfb else 0
+            p95 = ttfb[int(len(ttfb) * 0.95)] * 1000 if ttfb else 0
+            style = self.style.SUCCESS if ok else self.style.ERROR
+            self.stdout.write(style(
+                f'  {n:7d} {result["total_bytes"] / options["seconds"] / 1e6:12.1f} '
+                f'{result["min_rate"] * 8 / 1e6:11.2f} {p50:8.1f}ms {p95:8.1f}ms '
+                f'{result["stalls"]:7d} {result["errors"]:7d}  {"OK" if ok else "zu langsam"}'
+            ))
+            if not ok:
+                break
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f'Gehaltene parallele Streams: {sustained}'))
+
+    def _default_url(self):
+        from django.conf import settings
+
+        from media_manager.models import Video
+
+        video = Video.objects.exclude(file='').order_by('-timestamp').first()
+        if video is None:
+            raise CommandError('Kein Video in der DB – --url angeben')
+        return settings.BIRDY_SETTINGS['BIRDY_BASE_URL'].rstrip('/') + video.file.url
+
+    def _connect(self, parts):
+        cls = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        return cls(parts.netloc, timeout=30)
+
+    def _content_length(self, parts):
+        conn = self._connect(parts)
+        try:
+            conn.request('HEAD', parts.path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                raise CommandError(f'HEAD {parts.path}: HTTP {response.status}')
+            if response.getheader('Accept-Ranges') != 'bytes':
+                self.stdout.write(self.style.WARNING('Server meldet keine Range-Unterstützung'))
+            return int(response.getheader('Content-Length'))
+        finally:
+            conn.close()
+
+    def _bitrate(self, size):
+        """Bytes/s des Videos – aus Video.duration_seconds, sonst 2 Mbit/s angenommen"""
+        from media_manager.models import Video
+
+        video = Video.objects.filter(filesize_bytes=size, duration_seconds__gt=0).first()
+        if video:
+            return size / video.duration_seconds
+        return 2e6 / 8
+
+    def _run_level(self, parts, size, bitrate, streams, seconds, chunk):
+        result = {'total_bytes': 0, 'min_rate': float('inf'), 'ttfb': [], 'stalls': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+
+        def player(index):
+            conn = self._connect(parts)
+            position = (index * chunk * 7) % max(size - chunk, 1)  # Streams nicht im Gleichschritt
+            received = stalls = errors = 0
+            ttfbs = []
+            start = time.monotonic()
+            try:
+                while time.monotonic() < deadline:
+                    # Wie ein Player: erst nachladen, wenn der Puffer unter 2s fällt
+                    buffered = received / bitrate - (time.monotonic() - start)
+                    if buffered > 2.0:
+                        time.sleep(max(0.0, min(buffered - 2.0, deadline - time.monotonic(), 0.5)))
+                        continue
+                    if buffered < 0:
+                        stalls += 1
+
+                    end = min(position + chunk, size) - 1
+                    t0 = time.monotonic()
+                    try:
+                        conn.request('GET', parts.path, headers={'Range': f'bytes={position}-{end}'})
+                        response = conn.getresponse()
+                        first = response.read(1)
+                        ttfbs.append(time.monotonic() - t0)
+                        body = first + response.read()
+                        if response.status != 206 or len(body) != end - position + 1:
+                            errors += 1
+                    except (OSError, http.client.HTTPException):
+                        errors += 1
+                        conn.close()
+                        conn = self._connect(parts)
+                        continue
+                    received += len(body)
+                    position = end + 1 if end + 1 < size else 0
+            finally:
+                conn.close()
+
+            rate = received / max(time.monotonic() - start, 1e-6)
+            with lock:
+                result['total_bytes'] += received
+                result['min_rate'] = min(result['min_rate'], rate)
+                result['ttfb'].extend(ttfbs)
+                result['stalls'] += stalls
+                result['errors'] += errors
+
+        threads = [threading.Thread(target=player, args=(i,), daemon=True) for i in range(streams)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return result
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_manager', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_manager', '0002_photo_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='hls_playlist',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
@@ -36,7 +36,9 @@ class Photo(models.Model):
 
     # Verarbeitung
     is_thumbnail_generated = models.BooleanField(default=False)
-    thumbnail_path = models.CharField(max_length=500, blank=True)
+    thumbnail_path = models.CharField(max_length=500, blank=True)  # Grösstes JPEG-Thumbnail (relativ zu MEDIA_ROOT)
+    # Alle Varianten {format: {breite: relpath}}, siehe media_manager.thumbnails
+    thumbnails = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ['-timestamp']
@@ -64,6 +66,44 @@ class Photo(models.Model):
         # Für USB-Dateien müsste ein separater View erstellt werden
         return None
 
+    def set_thumbnails(self, variants):
+        """Varianten aus media_manager.thumbnails.generate_thumbnails() übernehmen"""
+        self.thumbnails = variants
+        jpeg = variants.get('jpeg') or {}
+        self.thumbnail_path = jpeg[max(jpeg, key=int)] if jpeg else ''
+        self.is_thumbnail_generated = bool(variants)
+
+    def _thumbnail_relpath(self, width=None, fmt='jpeg'):
+        """Kleinste Variante mit Breite >= width (sonst die grösste), None ohne Thumbnails"""
+        variants = (self.thumbnails or {}).get(fmt)
+        if not variants:
+            return None
+        widths = sorted(int(w) for w in variants)
+        chosen = next((w for w in widths if width is None or w >= width), widths[-1])
+        return variants[str(chosen)]
+
+    def thumbnail_url(self, width=None, fmt='jpeg'):
+        """URL eines Thumbnails (Fallback: Original)"""
+        relpath = self._thumbnail_relpath(width, fmt)
+        if relpath:
+            return self.file.storage.url(relpath)
+        return self.file_url
+
+    def thumbnail_file_path(self, width=None, fmt='jpeg'):
+        """Dateipfad eines Thumbnails (Fallback: Original)"""
+        relpath = self._thumbnail_relpath(width, fmt)
+        if relpath:
+            return os.path.join(settings.MEDIA_ROOT, relpath)
+        return self.file_path
+
+    def thumbnail_srcset(self, fmt):
+        """srcset-Attribut ("url 320w, url 640w") für ein Format, '' ohne Varianten"""
+        variants = (self.thumbnails or {}).get(fmt) or {}
+        return ', '.join(
+            f"{self.file.storage.url(relpath)} {width}w"
+            for width, relpath in sorted(variants.items(), key=lambda item: int(item[0]))
+        )
+
     def get_filesize_display(self):
         """Lesbare Dateigröße"""
         size = self.filesize_bytes
@@ -91,9 +131,12 @@ class Video(models.Model):
     framerate = models.IntegerField(default=30)
     codec = models.CharField(max_length=50, default='h264')
 
-    # Thumbnail
+    # Thumbnail / Poster (bestes Frame der Aufnahme)
     thumbnail_frame = models.ImageField(upload_to='video_thumbnails/', null=True, blank=True)
 
+    # HLS VOD-Playlist relativ zu MEDIA_ROOT (nur mit HLS_ENABLED)
+    hls_playlist = models.CharField(max_length=500, blank=True)
+
     class Meta:
         ordering = ['-timestamp']
         indexes = [
@@ -119,6 +162,20 @@ class Video(models.Model):
             return self.file.url
         return None
 
+    @property
+    def hls_url(self):
+        """URL der HLS-Playlist oder None"""
+        if self.hls_playlist:
+            return self.file.storage.url(self.hls_playlist)
+        return None
+
+    @property
+    def poster_url(self):
+        """URL des Poster-Frames oder None"""
+        if self.thumbnail_frame:
+            return self.thumbnail_frame.url
+        return None
+
     def get_filesize_display(self):
         """Lesbare Dateigröße"""
         size = self.filesize_bytes
@@ -0,0 +1,66 @@
+"""
+Template Tags für Fotos - <picture> mit AVIF/WebP/JPEG srcset und Lazy Loading
+"""
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from media_manager.thumbnails import FORMATS
+
+register = template.Library()
+
+# Galerie-Karten: Grid minmax(300px, 1fr), 200px hoch
+GALLERY_SIZES = '(max-width: 700px) 100vw, 360px'
+
+
+@register.simple_tag
+def photo_picture(photo, alt='', sizes=GALLERY_SIZES, loading='lazy'):
+    """
+    <picture> für ein Foto: moderne Formate als <source>, JPEG-Thumbnail als <img>.
+    Ohne Thumbnails (noch nicht generiert) wird das Original eingebunden.
+
+    Usage:
+        {% load media_tags %}
+        {% photo_picture detection.photo alt=detection.species.common_name_de %}
+    """
+    if not photo or not photo.file:
+        return ''
+
+    sources = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (FORMATS[fmt][2], photo.thumbnail_srcset(fmt), sizes)
+            for fmt in ('avif', 'webp')
+            if photo.thumbnail_srcset(fmt)
+        ),
+    )
+
+    jpeg_srcset = photo.thumbnail_srcset('jpeg')
+    if jpeg_srcset:
+        img = format_html(
+            '<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="{}" decoding="async">',
+            photo.thumbnail_url(), jpeg_srcset, sizes, alt, loading,
+        )
+    else:
+        img = format_html('<img src="{}" alt="{}" loading="{}" decoding="async">', photo.file.url, alt, loading)
+
+    return format_html('<picture>{}{}</picture>', sources, img)
+
+
+@register.simple_tag
+def video_player(video, preload='none', css_style='max-width: 100%;'):
+    """
+    <video> mit Poster (bestes Frame) – HLS-Quelle zuerst (Safari/HA), sonst Faststart-MP4.
+    preload="none": bis zum Klick wird nur das Poster geladen.
+    """
+    if not video or not video.file:
+        return ''
+
+    sources = format_html('<source src="{}" type="video/mp4">', video.file.url)
+    if video.hls_url:
+        sources = format_html('<source src="{}" type="application/vnd.apple.mpegurl">{}', video.hls_url, sources)
+
+    return format_html(
+        '<video controls playsinline preload="{}" poster="{}" style="{}">{}</video>',
+        preload, video.poster_url or '', css_style, sources,
+    )
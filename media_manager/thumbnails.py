@@ -0,0 +1,124 @@
+"""
+Thumbnails - verkleinerte Varianten (AVIF/WebP/JPEG) neben jedem Foto
+Galerie, Admin und MQTT-Kamera laden diese statt des 1280×720 q95 Originals.
+"""
+import logging
+from pathlib import Path
+
+logger = logging.getLogger('birdy')
+
+# Format-Name → (Pillow-Format, Endung, MIME-Type, Encoder-Optionen)
+FORMATS = {
+    'avif': ('AVIF', '.avif', 'image/avif', {'speed': 8}),
+    'webp': ('WEBP', '.webp', 'image/webp', {'method': 4}),
+    'jpeg': ('JPEG', '.jpg', 'image/jpeg', {'optimize': True, 'progressive': True}),
+}
+
+
+def available_formats(formats):
+    """
+    Nur Formate, die diese Pillow-Installation schreiben kann (AVIF erst ab Pillow 11.2
+    bzw. mit pillow-avif-plugin). JPEG bleibt immer als Fallback.
+    """
+    from PIL import Image
+
+    try:
+        import pillow_avif  # noqa: F401 – registriert AVIF bei älteren Pillow-Versionen
+    except ImportError:
+        pass
+    Image.init()
+
+    usable = [fmt for fmt in formats if fmt in FORMATS and FORMATS[fmt][0] in Image.SAVE]
+    if 'jpeg' not in usable:
+        usable.append('jpeg')
+    return usable
+
+
+def thumbnail_relpath(photo_relpath, width, fmt):
+    """photos/2026/10/17/x.jpg → photos/2026/10/17/x_320w.webp"""
+    path = Path(photo_relpath)
+    return str(path.with_name(f"{path.stem}_{width}w{FORMATS[fmt][1]}"))
+
+
+def generate_thumbnails(media_root, photo_relpath, image=None, widths=(320, 640), formats=('webp', 'jpeg'),
+                        quality=75):
+    """
+    Thumbnails für ein Foto schreiben.
+
+    Args:
+        media_root: MEDIA_ROOT (Thumbnails liegen relativ dazu neben dem Foto)
+        photo_relpath: Pfad des Fotos relativ zu media_root
+        image: Bereits geladenes PIL Image (Ingest); sonst wird das Foto geladen
+        widths: Zielbreiten in Pixel (nie grösser als das Original)
+        formats: Gewünschte Formate, siehe FORMATS
+        quality: Encoder-Qualität für alle Formate
+
+    Returns:
+        dict: {format: {breite(str): relpath}} – Format für Photo.thumbnails
+    """
+    from PIL import Image
+
+    media_root = Path(media_root)
+    widths = sorted(widths, reverse=True)
+
+    if image is None:
+        image = Image.open(media_root / photo_relpath)
+        # JPEG direkt in reduzierter Auflösung dekodieren (DCT-Scaling) – spart beim Backfill den Grossteil
+        image.draft('RGB', (widths[0], widths[0] * image.height // image.width))
+    image = image.convert('RGB')
+
+    variants = {fmt: {} for fmt in formats}
+    # Absteigend skalieren: jede Stufe aus der nächstgrösseren statt jedes Mal aus dem Original
+    source = image
+    for width in widths:
+        width = min(width, image.width)
+        height = round(image.height * width / image.width)
+        if source.size != (width, height):
+            source = source.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+        for fmt in formats:
+            pil_format, _, _, options = FORMATS[fmt]
+            relpath = thumbnail_relpath(photo_relpath, width, fmt)
+            target = media_root / relpath
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(target.name + '.tmp')
+            source.save(tmp, format=pil_format, quality=quality, **options)
+            tmp.replace(target)  # Webserver sieht nie halb geschriebene Dateien
+            variants[fmt][str(width)] = relpath
+
+    return variants
+
+
+def create_photo_thumbnails(photo, image=None):
+    """
+    Thumbnails gemäss Settings erzeugen und am Photo speichern
+
+    Args:
+        photo: media_manager.models.Photo mit file
+        image: Optional bereits geladenes PIL Image
+
+    Returns:
+        bool: True wenn Thumbnails erzeugt wurden
+    """
+    from django.conf import settings
+
+    if not photo.file:
+        return False
+
+    s = settings.BIRDY_SETTINGS
+    try:
+        variants = generate_thumbnails(
+            settings.MEDIA_ROOT,
+            photo.file.name,
+            image=image,
+            widths=s.get('THUMBNAIL_WIDTHS', (320, 640)),
+            formats=available_formats(s.get('THUMBNAIL_FORMATS', ('avif', 'webp', 'jpeg'))),
+            quality=s.get('THUMBNAIL_QUALITY', 75),
+        )
+    except Exception as e:
+        logger.warning(f"Thumbnail generation failed for {photo.filename}: {e}")
+        return False
+
+    photo.set_thumbnails(variants)
+    photo.save(update_fields=['thumbnails', 'thumbnail_path', 'is_thumbnail_generated'])
+    return True
@@ -0,0 +1,130 @@
+"""
+Video Output - Streaming-fähige Aufnahmen: Faststart-MP4, optionale HLS-Segmente, latest.mp4
+"""
+import logging
+import os
+import shutil
+import struct
+import subprocess
+from pathlib import Path
+
+logger = logging.getLogger('birdy')
+
+
+def _top_level_atoms(path):
+    """Namen der MP4 Top-Level-Atome in Dateireihenfolge (liest nur die Header)"""
+    atoms = []
+    with open(path, 'rb') as f:
+        size_total = os.fstat(f.fileno()).st_size
+        offset = 0
+        while offset + 8 <= size_total:
+            f.seek(offset)
+            size, name = struct.unpack('>I4s', f.read(8))
+            if size == 1:
+                size = struct.unpack('>Q', f.read(8))[0]
+            elif size == 0:
+                size = size_total - offset
+            if size < 8:
+                break
+            atoms.append(name.decode('latin-1'))
+            offset += size
+    return atoms
+
+
+def is_faststart(path):
+    """moov vor mdat? (Player können dann ohne Download des ganzen Files starten)"""
+    atoms = _top_level_atoms(path)
+    if 'moov' not in atoms:
+        return False
+    return 'mdat' not in atoms or atoms.index('moov') < atoms.index('mdat')
+
+
+def ensure_faststart(path):
+    """
+    MP4 bei Bedarf mit moov vorne neu schreiben (Stream-Copy, atomar ersetzt).
+    Aufnahmen aus _mux_h264 sind bereits faststart; rpicam-vid Direktaufnahmen nicht.
+
+    Returns:
+        bool: True wenn die Datei (jetzt) faststart ist
+    """
+    path = Path(path)
+    try:
+        if is_faststart(path):
+            return True
+    except (OSError, struct.error) as e:
+        logger.warning(f"Could not inspect {path.name}: {e}")
+        return False
+
+    tmp = path.with_name(f".{path.stem}.faststart.mp4")
+    result = subprocess.run([
+        'ffmpeg', '-y', '-v', 'error',
+        '-i', str(path),
+        '-c', 'copy',
+        '-movflags', '+faststart',
+        str(tmp)
+    ], capture_output=True, text=True)
+    if result.returncode != 0:
+        tmp.unlink(missing_ok=True)
+        logger.error(f"Faststart remux failed for {path.name}: {result.stderr[-300:]}")
+        return False
+
+    os.replace(tmp, path)
+    logger.debug(f"Faststart remux: {path.name}")
+    return True
+
+
+def create_hls(mp4_path, segment_seconds=2):
+    """
+    HLS VOD-Playlist (fMP4-Segmente, Stream-Copy) neben dem Video erzeugen.
+
+    Args:
+        mp4_path: Aufgenommenes Video
+        segment_seconds: Ziel-Segmentlänge (geschnitten wird an Keyframes)
+
+    Returns:
+        Path zur index.m3u8 oder None bei Fehler
+    """
+    mp4_path = Path(mp4_path)
+    hls_dir = mp4_path.with_name(f"{mp4_path.stem}_hls")
+    tmp_dir = mp4_path.with_name(f".{mp4_path.stem}_hls.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    result = subprocess.run([
+        'ffmpeg', '-y', '-v', 'error',
+        '-i', str(mp4_path),
+        '-c', 'copy',
+        '-f', 'hls',
+        '-hls_time', str(segment_seconds),
+        '-hls_playlist_type', 'vod',
+        '-hls_segment_type', 'fmp4',
+        '-hls_fmp4_init_filename', 'init.mp4',
+        '-hls_segment_filename', str(tmp_dir / 'segment_%03d.m4s'),
+        str(tmp_dir / 'index.m3u8')
+    ], capture_output=True, text=True)
+    if result.returncode != 0:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.error(f"HLS segmenting failed for {mp4_path.name}: {result.stderr[-300:]}")
+        return None
+
+    # Playlist erst sichtbar machen, wenn alle Segmente geschrieben sind
+    shutil.rmtree(hls_dir, ignore_errors=True)
+    os.replace(tmp_dir, hls_dir)
+    return hls_dir / 'index.m3u8'
+
+
+def publish_latest(video_path, latest_path):
+    """
+    latest.mp4 atomar auf das neue Video zeigen lassen – Hardlink + rename statt Byte-Kopie.
+    Leser (HA Media Browser via NFS) sehen immer entweder das alte oder das neue Video.
+    Liegen beide nicht auf demselben Dateisystem, wird einmal kopiert und dann umbenannt.
+    """
+    video_path = Path(video_path)
+    latest_path = Path(latest_path)
+    tmp = latest_path.with_name(f".{latest_path.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(video_path, tmp)
+    except OSError:
+        shutil.copy2(video_path, tmp)
+    os.replace(tmp, latest_path)
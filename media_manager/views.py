@@ -1,2 +1,177 @@
+"""
+Media Serving - Fotos/Videos aus MEDIA_ROOT mit Range, ETag und sendfile
+Ersetzt django.views.static.serve: Videos sind seekbar (206 Partial Content),
+Browser cachen datierte Dateien dauerhaft, und gunicorn überträgt die Bytes per
+sendfile() aus dem Kernel statt durch den Python-Worker.
+"""
+import mimetypes
+import os
+import re
+import stat
 
-# Create your views here.
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Nicht in jeder mimetypes-Datenbank enthalten
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+mimetypes.add_type('video/iso.segment', '.m4s')
+
+# photos/2026/10/17/..., videos/..., video_thumbnails/... ändern sich nach dem Schreiben nie
+IMMUTABLE_PATH = re.compile(r'^(photos|videos|video_thumbnails)/\d{4}/\d{2}/\d{2}/')
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _RangeFile:
+    """
+    Dateiobjekt, das ab der aktuellen Position nur length Bytes liefert.
+
+    fileno() bleibt erhalten: gunicorns wsgi.file_wrapper nutzt dann sendfile()
+    ab der aktuellen Position für Content-Length Bytes (Zero-Copy). Ohne
+    file_wrapper (runserver) begrenzt read() den Stream.
+    """
+
+    def __init__(self, file, offset, length):
+        self._file = file
+        self._remaining = length
+        file.seek(offset)
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def _etag(st):
+    """Starker ETag aus Inode, Grösse und mtime (ändert sich bei jedem Neuschreiben/Ersetzen)"""
+    return f'"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def _parse_range(header, size):
+    """
+    Einzelnen Byte-Range parsen.
+
+    Returns:
+        (start, end) inklusive, None wenn kein/mehrteiliger Range (→ ganze Datei),
+        'invalid' wenn nicht erfüllbar (→ 416)
+    """
+    match = RANGE_HEADER.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N: die letzten N Bytes
+        length = int(last)
+        if length == 0:
+            return 'invalid'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return 'invalid'
+    return start, end
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]
+    modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return modified_since is not None and int(mtime) <= modified_since
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Datei aus MEDIA_ROOT ausliefern.
+
+    MEDIA_SERVE_MODE:
+        'django'     – Range/ETag hier, Bytes per FileResponse (gunicorn: sendfile)
+        'x-accel'    – nginx liefert aus (X-Accel-Redirect auf MEDIA_ACCEL_PREFIX, internal location)
+        'x-sendfile' – Apache/lighttpd liefert aus (X-Sendfile mit absolutem Pfad)
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404(f'"{path}" does not exist')
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404(f'"{path}" is not a file')
+
+    etag = _etag(st)
+    content_type, encoding = mimetypes.guess_type(full_path)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(st.st_mtime),
+        'Accept-Ranges': 'bytes',
+        # Datierte Dateien nie revalidieren; latest.mp4 & Co. immer per ETag prüfen
+        'Cache-Control': (
+            'public, max-age=31536000, immutable' if IMMUTABLE_PATH.match(path) else 'public, no-cache'
+        ),
+    }
+
+    if _not_modified(request, etag, st.st_mtime):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    mode = settings.BIRDY_SETTINGS.get('MEDIA_SERVE_MODE', 'django')
+    if mode in ('x-accel', 'x-sendfile'):
+        # Proxy übernimmt Range und Übertragung
+        response = HttpResponse(content_type=content_type or 'application/octet-stream')
+        if mode == 'x-accel':
+            prefix = settings.BIRDY_SETTINGS.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+            response['X-Accel-Redirect'] = prefix + path.lstrip('/')
+        else:
+            response['X-Sendfile'] = full_path
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    size = st.st_size
+    byte_range = None
+    range_header = request.headers.get('Range')
+    # If-Range: Range nur gültig, wenn der Client noch dieselbe Version hat
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range == 'invalid':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    response = FileResponse(
+        _RangeFile(open(full_path, 'rb'), start, length),
+        status=206 if byte_range else 200,
+        content_type=content_type or 'application/octet-stream',
+    )
+    response['Content-Length'] = str(length)
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    for name, value in headers.items():
+        response[name] = value
+    return response
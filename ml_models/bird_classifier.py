@@ -7,25 +7,31 @@ from pathlib import Path
 
 import numpy as np
 from django.conf import settings
-from PIL import Image
 
 logger = logging.getLogger('birdy')
 
-from ai_edge_litert.interpreter import Interpreter  # noqa: E402
-
 
 class BirdClassifier:
     """TensorFlow Lite Vogel-Klassifikator"""
 
     def __init__(self):
         self.model_path = settings.BIRDY_SETTINGS['ML_MODEL_PATH']
-        self.interpreter = None
+        self.pool = None          # InterpreterPool (ML_INTERPRETER_POOL_SIZE Interpreter)
+        self.interpreter = None   # erster Interpreter des Pools (Kompatibilität)
         self.input_details = None
         self.output_details = None
         self.is_initialized = False
         self.labels = {}
         self.sci_labels = {}      # {index: scientific_name}
         self.allowed_indices = None  # None = kein Filter, set = Swiss Mittelland Filter
+        # Einmalig in _load_labels kompiliert (Post-Processing ohne Python-Schleifen):
+        self.class_ids = None        # np.intp [A] betrachtete Klassen (erlaubte oder alle), sortiert
+        self.class_labels = None     # np.ndarray [A] Labels zu class_ids
+        self.background_column = -1  # Spalte von Background in class_ids (-1 = keine)
+        self.output_quantization = (0.0, 0)  # (scale, zero_point), scale 0 = Float-Output
+        self.output_is_probability = False   # quantisierter Softmax-Output → nicht erneut softmaxen
+        self.batch_supported = True  # False wenn resize_tensor_input für Batch > 1 scheitert
+        self.batch_size = 1          # Feste Batch-Grösse der Pool-Interpreter (einmalig alloziert)
 
     def initialize(self):
         """Initialisiere TensorFlow Lite Modell"""
@@ -37,9 +43,12 @@ class BirdClassifier:
                 logger.info("Example: https://tfhub.dev/google/aiy/vision/classifier/birds_V1/1")
                 return False
 
-            self.interpreter = Interpreter(model_path=str(self.model_path))
-            self.interpreter.allocate_tensors()
+            from ml_models.interpreter_pool import create_pool
+
+            self.pool = create_pool(self.model_path, 'classifier')
+            self.interpreter = self.pool.slots[0].interpreter
 
+            # Details des ersten Interpreters (Batch-Grösse 1) für Preprocessing/Labels
             self.input_details = self.interpreter.get_input_details()
             self.output_details = self.interpreter.get_output_details()
 
@@ -48,6 +57,7 @@ class BirdClassifier:
             logger.info(f"Output: {self.output_details[0]['shape']}")
 
             self._load_labels()
+            self._allocate_batch()
 
             self.is_initialized = True
             return True
@@ -127,45 +137,118 @@ class BirdClassifier:
                 logger.info("No Swiss Mittelland allowlist found – using all species")
             self.allowed_indices = None
 
+        self._compile_class_table()
+
+    def _compile_class_table(self):
+        """
+        Allowlist, Labels und Output-Quantisierung einmalig in Arrays übersetzen.
+
+        Post-Processing arbeitet danach nur noch auf den A betrachteten Spalten
+        (Swiss Mittelland + Background, oder alle Klassen ohne Allowlist).
+        """
+        output = self.output_details[0]
+        num_classes = int(output['shape'][-1])
+
+        class_ids = None
+        if self.allowed_indices is not None:
+            class_ids = np.array(sorted(i for i in self.allowed_indices if i < num_classes), dtype=np.intp)
+        if class_ids is None or class_ids.size == 0:
+            class_ids = np.arange(num_classes, dtype=np.intp)
+
+        self.class_ids = class_ids
+        self.class_labels = np.array([self.labels.get(int(i), 'Unknown') for i in class_ids], dtype=object)
+
+        background = np.flatnonzero(np.char.lower(self.class_labels.astype(str)) == 'background')
+        self.background_column = int(background[0]) if background.size else -1
+
+        scale, zero_point = output.get('quantization', (0.0, 0))
+        self.output_quantization = (float(scale), int(zero_point))
+        if scale and np.issubdtype(output['dtype'], np.integer):
+            # Quantisierter Output, dessen Wertebereich in [0, 1] liegt, ist bereits Softmax
+            info = np.iinfo(output['dtype'])
+            low = (info.min - zero_point) * scale
+            high = (info.max - zero_point) * scale
+            self.output_is_probability = low >= -1e-6 and high <= 1.0 + 1e-6
+        else:
+            self.output_is_probability = False
+
+        logger.debug(
+            f"Class table: {class_ids.size}/{num_classes} classes, "
+            f"quantization={self.output_quantization}, probability_output={self.output_is_probability}"
+        )
+
     def preprocess_image(self, image_path):
-        """Bereite Bild für Inferenz vor"""
-        try:
-            input_shape = self.input_details[0]['shape']
-            input_dtype = self.input_details[0]['dtype']
+        """
+        Bereite Bild für Inferenz vor
+
+        Args:
+            image_path: Pfad zum Bild, RGB-Array [H, W, 3] uint8 (z.B. aus iter_candidate_frames)
+                        oder DecodedFrame (geteilt mit dem Bird Detector)
+
+        Returns:
+            np.ndarray [1, H, W, 3] im Input-Dtype des Modells oder None bei Fehler
+        """
+        input_details = self.input_details[0]
+        input_data = np.empty((1, *input_details['shape'][1:]), dtype=input_details['dtype'])
+        if not self._write_input(image_path, input_data[0]):
+            return None
+        return input_data
 
-            height, width = input_shape[1], input_shape[2]
+    def _write_input(self, image_path, out):
+        """
+        Schreibe ein vorverarbeitetes Frame direkt in out (z.B. View in den Input-Tensor).
 
-            # Lade und resize
-            image = Image.open(image_path).convert('RGB')
-            image = image.resize((width, height), Image.LANCZOS)
+        Args:
+            image_path: Pfad, RGB-Array oder DecodedFrame (siehe preprocess_image)
+            out: Ziel [H, W, 3] im Input-Dtype des Modells
 
-            # Zu numpy
-            input_data = np.array(image)
+        Returns:
+            bool: False bei Fehler (out unverändert)
+        """
+        from ml_models.frame import RESAMPLE_CLASSIFIER, DecodedFrame
+
+        try:
+            height, width = out.shape[0], out.shape[1]
+
+            # Einmal dekodieren (JPEG per Draft direkt verkleinert), Resize wird im Frame gecacht
+            frame = DecodedFrame.coerce(image_path, min_size=(width, height))
+            pixels = frame.resized((width, height), RESAMPLE_CLASSIFIER)
 
             # WICHTIG: Prüfe erwarteten Dtype
-            if input_dtype == np.uint8:
+            if out.dtype == np.uint8:
                 # Modell erwartet UINT8 (0-255)
-                input_data = input_data.astype(np.uint8)
-            elif input_dtype == np.float32:
-                # Modell erwartet FLOAT32 (0-1)
-                input_data = input_data.astype(np.float32) / 255.0
+                np.copyto(out, pixels)
             else:
-                logger.warning(f"Unknown input dtype: {input_dtype}, using float32")
-                input_data = input_data.astype(np.float32) / 255.0
-
-            # Add batch dimension
-            input_data = np.expand_dims(input_data, axis=0)
+                # Modell erwartet FLOAT32 (0-1)
+                if out.dtype != np.float32:
+                    logger.warning(f"Unknown input dtype: {out.dtype}, using float32 scaling")
+                np.multiply(pixels, np.float32(1.0 / 255.0), out=out, casting='unsafe')
 
-            return input_data
+            return True
 
         except Exception as e:
             logger.error(f"Failed to preprocess image: {e}")
             import traceback
             traceback.print_exc()
-            return None
+            return False
+
+    def _allocate_batch(self):
+        """
+        Input-Tensoren aller Pool-Interpreter einmalig auf CLASSIFIER_BATCH_SIZE vergrössern.
+        Danach läuft jeder invoke() mit dieser Grösse (Teil-Batches werden aufgefüllt) –
+        kein resize_tensor_input()/allocate_tensors() mehr pro Aufruf.
+        """
+        batch_size = max(1, settings.BIRDY_SETTINGS.get('CLASSIFIER_BATCH_SIZE', 8))
+        if batch_size > 1 and not all(slot.resize_batch(batch_size) for slot in self.pool.slots):
+            logger.warning(f"Model does not support batch size {batch_size}, classifying per frame")
+            self.batch_supported = False
+            batch_size = 1
+            for slot in self.pool.slots:
+                slot.resize_batch(1)
+        self.batch_size = batch_size
 
     def classify(self, image_path, top_k=5):
-        """Klassifiziere Vogel im Bild"""
+        """Klassifiziere Vogel im Bild (Pfad, RGB-Array oder DecodedFrame)"""
         if not self.is_initialized:
             logger.warning("Classifier not initialized")
             return None
@@ -173,53 +256,22 @@ class BirdClassifier:
         try:
             start_time = time.time()
 
-            input_data = self.preprocess_image(image_path)
-            if input_data is None:
-                return None
-
-            # Inferenz
-            self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-            self.interpreter.invoke()
-
-            # Predictions
-            output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-            predictions = output_data[0]
-
-            # Softmax über alle Klassen → korrekte Wahrscheinlichkeiten 0-1
-            # Float-Cast nötig: quantisierte Modelle liefern int8/uint8 → sonst Integer-Overflow
-            predictions = predictions.astype(np.float32)
-            exp_preds = np.exp(predictions - np.max(predictions))
-            probabilities = exp_preds / np.sum(exp_preds)
-
-            # Top-K mit optionalem Swiss Mittelland Filter
-            if self.allowed_indices is not None:
-                # Nur erlaubte Arten berücksichtigen
-                allowed_list = [idx for idx in self.allowed_indices if idx < len(probabilities)]
-                if allowed_list:
-                    allowed_probs = probabilities[allowed_list]
-                    best_order = np.argsort(allowed_probs)[-top_k:][::-1]
-                    top_indices = [allowed_list[i] for i in best_order]
-                else:
-                    top_indices = list(np.argsort(probabilities)[-top_k:][::-1])
-            else:
-                top_indices = list(np.argsort(probabilities)[-top_k:][::-1])
-
-            results = {
-                'top_prediction': {
-                    'class_id': int(top_indices[0]),
-                    'label': self.labels.get(int(top_indices[0]), 'Unknown'),
-                    'confidence': float(probabilities[top_indices[0]])
-                },
-                'top_k_predictions': [
-                    {
-                        'class_id': int(idx),
-                        'label': self.labels.get(int(idx), 'Unknown'),
-                        'confidence': float(probabilities[idx])
-                    }
-                    for idx in top_indices
-                ],
-                'processing_time_ms': int((time.time() - start_time) * 1000)
-            }
+            # Eigener Batch-1 Interpreter: die Batch-Tensoren des Pools bleiben unverändert
+            with self.pool.acquire_single() as slot:
+                # Pixel direkt in den Input-Tensor schreiben
+                if not self._write_input(image_path, slot.input_buffer()[0]):
+                    return None
+
+                # Inferenz
+                slot.interpreter.invoke()
+
+                # Predictions (View auf Output-Tensor → nur erlaubte Klassen werden kopiert)
+                probabilities = self._to_probabilities(slot.output_buffer()[:1])
+            top_indices = self._top_k_indices(probabilities, top_k)
+
+            results = self._build_result(
+                probabilities[0], top_indices[0], int((time.time() - start_time) * 1000)
+            )
 
             logger.info(
                 f"Classification: {results['top_prediction']['label']} "
@@ -235,6 +287,200 @@ class BirdClassifier:
             traceback.print_exc()
             return None
 
+    def classify_batch(self, frames, top_k=5):
+        """
+        Klassifiziere mehrere Frames mit einem invoke() pro Batch.
+
+        Die Frames werden in Chunks der festen Batch-Grösse (CLASSIFIER_BATCH_SIZE,
+        beim Initialisieren alloziert) auf die Interpreter des Pools verteilt (parallel
+        bei ML_INTERPRETER_POOL_SIZE > 1); kürzere Chunks werden mit Nullen aufgefüllt.
+        Softmax (nur über erlaubte Klassen) und Top-K laufen vektorisiert über [N, A].
+        Unterstützt das Modell keine Batch-Grösse > 1, läuft ein invoke() pro Frame.
+
+        Args:
+            frames: Liste von Bildpfaden, RGB-Arrays oder DecodedFrames
+            top_k: Anzahl Top-Predictions pro Frame
+
+        Returns:
+            dict mit
+              'results': Liste pro Frame (wie classify(), None bei Fehler),
+                         'processing_time_ms' = amortisierte Zeit pro Frame
+              'visit': aggregiertes Ergebnis über alle Nicht-Background Frames
+              'processing_time_ms': Gesamtzeit
+              'per_frame_ms': amortisierte Zeit pro Frame (float)
+            oder None bei Fehler
+        """
+        if not self.is_initialized:
+            logger.warning("Classifier not initialized")
+            return None
+
+        frames = list(frames)
+        if not frames:
+            return None
+
+        try:
+            start_time = time.time()
+
+            batch_size = self.batch_size
+            chunks = [frames[i:i + batch_size] for i in range(0, len(frames), batch_size)]
+
+            outputs = self.pool.map(self._classify_chunk, chunks)
+            probabilities = np.concatenate([probs for probs, _ in outputs])
+            valid = np.concatenate([mask for _, mask in outputs])
+
+            top_indices = self._top_k_indices(probabilities, top_k)
+
+            total_ms = (time.time() - start_time) * 1000
+            per_frame_ms = total_ms / len(frames)
+
+            results = [
+                self._build_result(probabilities[i], top_indices[i], int(round(per_frame_ms)))
+                if valid[i] else None
+                for i in range(len(frames))
+            ]
+
+            batch_result = {
+                'results': results,
+                'visit': self._aggregate_visit(probabilities[valid], top_k),
+                'processing_time_ms': int(total_ms),
+                'per_frame_ms': per_frame_ms,
+            }
+
+            logger.info(
+                f"Batch classification: {len(frames)} frames (batch={batch_size}, "
+                f"interpreters={min(self.pool.size, len(chunks))}) "
+                f"in {total_ms:.0f}ms ({per_frame_ms:.1f}ms/frame)"
+            )
+
+            return batch_result
+
+        except Exception as e:
+            logger.error(f"Batch classification failed: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def _classify_chunk(self, chunk):
+        """
+        Klassifiziere einen Chunk auf einem ausgeliehenen Interpreter des Pools.
+
+        Args:
+            chunk: Frames (höchstens batch_size, kürzere Chunks werden aufgefüllt)
+
+        Returns:
+            tuple: (probabilities [len(chunk), A], valid [len(chunk)] bool)
+        """
+        with self.pool.acquire() as slot:
+            batch_size = slot.batch_size  # fix (siehe _allocate_batch) → kein erneutes allocate_tensors()
+            probabilities = np.zeros((len(chunk), self.class_ids.size), dtype=np.float32)
+            valid = np.zeros(len(chunk), dtype=bool)
+
+            for offset in range(0, len(chunk), batch_size):
+                part = chunk[offset:offset + batch_size]
+
+                # Pixel direkt in den Input-Tensor schreiben (View nur bis vor invoke() halten)
+                input_buffer = slot.input_buffer()
+                for j, frame in enumerate(part):
+                    valid[offset + j] = self._write_input(frame, input_buffer[j])
+                    if not valid[offset + j]:
+                        input_buffer[j].fill(0)
+                input_buffer[len(part):].fill(0)  # Teil-Batch auffüllen
+                del input_buffer
+
+                slot.interpreter.invoke()
+
+                probabilities[offset:offset + len(part)] = self._to_probabilities(
+                    slot.output_buffer()[:len(part)]
+                )
+
+        return probabilities, valid
+
+    def _to_probabilities(self, output_data):
+        """
+        Roh-Output [N, classes] → Wahrscheinlichkeiten [N, A] über die betrachteten Klassen.
+
+        Quantisierte Outputs werden mit scale/zero_point dequantisiert. Ist der
+        Output bereits Softmax, wird nur auf die erlaubten Klassen renormiert,
+        sonst läuft der Softmax ausschliesslich über die A erlaubten Logits.
+        """
+        if self.class_ids.size != output_data.shape[1]:
+            output_data = output_data[:, self.class_ids]
+        values = output_data.astype(np.float32)
+
+        scale, zero_point = self.output_quantization
+        if scale:
+            values -= zero_point
+            values *= scale
+
+        if self.output_is_probability:
+            totals = values.sum(axis=1, keepdims=True)
+            return values / np.maximum(totals, 1e-12)
+        return self._softmax(values)
+
+    @staticmethod
+    def _softmax(logits):
+        """Zeilenweiser Softmax über [N, classes] → Wahrscheinlichkeiten 0-1"""
+        exp_preds = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+        return exp_preds / np.sum(exp_preds, axis=1, keepdims=True)
+
+    @staticmethod
+    def _top_k_indices(probabilities, top_k):
+        """
+        Top-K Spalten pro Zeile (absteigend) per argpartition – O(A + k log k).
+
+        Args:
+            probabilities: [N, A] (Spalten → Klassen über class_ids)
+
+        Returns:
+            np.ndarray [N, k] mit Spalten-Indices
+        """
+        top_k = min(top_k, probabilities.shape[1])
+        if top_k < probabilities.shape[1]:
+            candidates = np.argpartition(-probabilities, top_k - 1, axis=1)[:, :top_k]
+        else:
+            candidates = np.broadcast_to(np.arange(top_k), (probabilities.shape[0], top_k))
+
+        order = np.argsort(-np.take_along_axis(probabilities, candidates, axis=1), axis=1)
+        return np.take_along_axis(candidates, order, axis=1)
+
+    def _build_result(self, probabilities, top_columns, processing_time_ms):
+        """Ergebnis-Dict für ein Frame (Format von classify())"""
+        predictions = [
+            {
+                'class_id': int(self.class_ids[col]),
+                'label': self.class_labels[col],
+                'confidence': float(probabilities[col])
+            }
+            for col in top_columns
+        ]
+        return {
+            'top_prediction': predictions[0],
+            'top_k_predictions': predictions,
+            'processing_time_ms': processing_time_ms
+        }
+
+    def _aggregate_visit(self, probabilities, top_k):
+        """
+        Besuchs-Ergebnis: Mittelwert der Wahrscheinlichkeiten aller Frames,
+        deren Top-1 nicht Background ist (alle Frames wenn nur Background).
+
+        Returns:
+            dict mit 'top_prediction', 'top_k_predictions', 'frame_count' oder None
+        """
+        if probabilities.size == 0:
+            return None
+
+        top1 = probabilities.argmax(axis=1)
+        background = top1 == self.background_column
+        selected = probabilities[~background] if (~background).any() else probabilities
+
+        mean_probs = selected.mean(axis=0, keepdims=True)
+        top_indices = self._top_k_indices(mean_probs, top_k)[0]
+        visit = self._build_result(mean_probs[0], top_indices, 0)
+        del visit['processing_time_ms']
+        visit['frame_count'] = int(selected.shape[0])
+        return visit
+
     def is_confident_detection(self, classification_result):
         """Prüfe ob Klassifikation confident genug ist"""
         if not classification_result:
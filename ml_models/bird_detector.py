@@ -31,7 +31,8 @@ class BirdSizeDetector:
     """
 
     def __init__(self):
-        self.interpreter = None
+        self.pool = None          # InterpreterPool (ML_INTERPRETER_POOL_SIZE Interpreter)
+        self.interpreter = None   # erster Interpreter des Pools (Kompatibilität)
         self.input_size = (300, 300)  # SSD MobileNet V2
         self.is_initialized = False
 
@@ -51,14 +52,13 @@ class BirdSizeDetector:
             return False
 
         try:
-            from ai_edge_litert.interpreter import Interpreter
+            from ml_models.interpreter_pool import create_pool
 
-            self.interpreter = Interpreter(model_path=str(model_path))
-            self.interpreter.allocate_tensors()
+            self.pool = create_pool(model_path, 'detector')
+            self.interpreter = self.pool.slots[0].interpreter
 
             # Input-Grösse aus Modell lesen
-            input_details = self.interpreter.get_input_details()
-            shape = input_details[0]['shape']  # [1, H, W, 3]
+            shape = self.pool.slots[0].input_details[0]['shape']  # [1, H, W, 3]
             self.input_size = (int(shape[2]), int(shape[1]))  # (W, H)
 
             self.is_initialized = True
@@ -74,7 +74,7 @@ class BirdSizeDetector:
         Detektiere Vogel im Frame und gib beste Detektion zurück.
 
         Args:
-            image_path: Pfad zum Frame (JPEG)
+            image_path: Pfad zum Frame (JPEG), RGB-Array [H, W, 3] uint8 oder DecodedFrame
             min_score: Minimale Detection Confidence (aus Settings wenn None)
 
         Returns:
@@ -85,55 +85,67 @@ class BirdSizeDetector:
             return None
 
         from django.conf import settings as django_settings
-        from PIL import Image
+
+        from ml_models.frame import RESAMPLE_DETECTOR, DecodedFrame
 
         if min_score is None:
             min_score = django_settings.BIRDY_SETTINGS.get('BIRD_DETECTOR_MIN_SCORE', 0.3)
 
         try:
-            img = Image.open(image_path).convert('RGB').resize(self.input_size)
-            input_data = np.expand_dims(np.array(img, dtype=np.uint8), axis=0)
-
-            input_details = self.interpreter.get_input_details()
-            output_details = self.interpreter.get_output_details()
-
-            self.interpreter.set_tensor(input_details[0]['index'], input_data)
-            self.interpreter.invoke()
-
-            boxes = self.interpreter.get_tensor(output_details[0]['index'])[0]    # [20, 4]
-            classes = self.interpreter.get_tensor(output_details[1]['index'])[0]  # [20]
-            scores = self.interpreter.get_tensor(output_details[2]['index'])[0]   # [20]
-            num_det = int(self.interpreter.get_tensor(output_details[3]['index'])[0])
-
-            best = None
-            for i in range(min(num_det, len(scores))):
-                if scores[i] < min_score:
-                    break  # sortiert absteigend nach Score
-                if int(classes[i]) != BIRD_CLASS_ID:
-                    continue
-
-                ymin, xmin, ymax, xmax = boxes[i]
-                coverage = float((ymax - ymin) * (xmax - xmin))
+            frame = DecodedFrame.coerce(image_path, min_size=self.input_size)
+            pixels = frame.resized(self.input_size, RESAMPLE_DETECTOR)
 
-                if best is None or scores[i] > best['score']:
-                    best = {
-                        'bbox': (float(ymin), float(xmin), float(ymax), float(xmax)),
-                        'coverage': coverage,
-                        'score': float(scores[i]),
-                        'center_x': float((xmin + xmax) / 2),
-                        'center_y': float((ymin + ymax) / 2),
-                    }
-
-            return best
+            with self.pool.acquire() as slot:
+                # Pixel direkt in den Input-Tensor, Outputs als Views lesen (keine Kopien)
+                np.copyto(slot.input_buffer()[0], pixels)
+                slot.interpreter.invoke()
+                return self._best_bird(slot, min_score)
 
         except Exception as e:
             logger.error(f"Bird detector inference error: {e}")
             return None
 
+    @staticmethod
+    def _best_bird(slot, min_score):
+        """
+        Beste Vogel-Detektion aus den Output-Tensoren des Slots.
+
+        Die Output-Views leben nur in dieser Funktion – sie sind freigegeben,
+        bevor der Slot an den Pool zurückgeht (sonst scheitert das nächste invoke()).
+        """
+        boxes = slot.output_buffer(0)[0]    # [20, 4]
+        classes = slot.output_buffer(1)[0]  # [20]
+        scores = slot.output_buffer(2)[0]   # [20]
+        num_det = int(slot.output_buffer(3)[0])
+
+        best = None
+        for i in range(min(num_det, len(scores))):
+            if scores[i] < min_score:
+                break  # sortiert absteigend nach Score
+            if int(classes[i]) != BIRD_CLASS_ID:
+                continue
+
+            ymin, xmin, ymax, xmax = boxes[i]
+            coverage = float((ymax - ymin) * (xmax - xmin))
+
+            if best is None or scores[i] > best['score']:
+                best = {
+                    'bbox': (float(ymin), float(xmin), float(ymax), float(xmax)),
+                    'coverage': coverage,
+                    'score': float(scores[i]),
+                    'center_x': float((xmin + xmax) / 2),
+                    'center_y': float((ymin + ymax) / 2),
+                }
+
+        return best
+
     def is_valid_bird_frame(self, image_path):
         """
         Prüft ob Frame einen ausreichend grossen Vogel im ROI zeigt.
 
+        Args:
+            image_path: Pfad zum Frame oder RGB-Array (siehe detect_bird)
+
         Returns:
             bool: True = Frame akzeptieren, False = verwerfen
             Wenn Detector nicht initialisiert: True (fail open)
@@ -141,6 +153,18 @@ class BirdSizeDetector:
         if not self.is_initialized:
             return True  # fail open: Species Classifier entscheidet
 
+        return self.valid_bird_detection(image_path) is not None
+
+    def valid_bird_detection(self, image_path):
+        """
+        Beste Vogel-Detektion, falls sie Coverage- und ROI-Filter besteht.
+
+        Args:
+            image_path: Pfad zum Frame oder RGB-Array (siehe detect_bird)
+
+        Returns:
+            dict (siehe detect_bird) oder None wenn Frame verworfen wird
+        """
         from django.conf import settings as django_settings
         s = django_settings.BIRDY_SETTINGS
 
@@ -155,7 +179,7 @@ class BirdSizeDetector:
         detection = self.detect_bird(image_path)
 
         if detection is None:
-            return False  # kein Vogel detektiert
+            return None  # kein Vogel detektiert
 
         coverage = detection['coverage']
         cx = detection['center_x']
@@ -166,7 +190,7 @@ class BirdSizeDetector:
                 f"Bird detector: coverage {coverage:.1%} < {min_coverage:.1%} "
                 f"(score={detection['score']:.2f})"
             )
-            return False
+            return None
 
         roi_x_min, roi_x_max, roi_y_min, roi_y_max = roi
         in_roi = (roi_x_min <= cx <= roi_x_max) and (roi_y_min <= cy <= roi_y_max)
@@ -176,13 +200,71 @@ class BirdSizeDetector:
                 f"Bird detector: center ({cx:.2f},{cy:.2f}) outside ROI "
                 f"x=[{roi_x_min},{roi_x_max}] y=[{roi_y_min},{roi_y_max}]"
             )
-            return False
+            return None
 
         logger.debug(
             f"Bird detector: OK coverage={coverage:.1%} "
             f"center=({cx:.2f},{cy:.2f}) score={detection['score']:.2f}"
         )
-        return True
+        return detection
+
+    def is_valid_bird_frames(self, frames):
+        """
+        Prüfe mehrere Frames – parallel auf den Interpretern des Pools.
+
+        Args:
+            frames: Liste von Pfaden oder RGB-Arrays (Arrays müssen während
+                    des Aufrufs gültig bleiben, siehe iter_video_frames)
+
+        Returns:
+            list[bool]: Ergebnis pro Frame (wie is_valid_bird_frame)
+        """
+        if not self.is_initialized:
+            return [True] * len(frames)
+        return self.pool.map(self.is_valid_bird_frame, frames)
+
+    def valid_bird_detections(self, frames):
+        """
+        Wie valid_bird_detection() für mehrere Frames, parallel auf dem Pool.
+
+        Returns:
+            list: Detektion (dict) oder None pro Frame; alles None wenn nicht initialisiert
+        """
+        if not self.is_initialized:
+            return [None] * len(frames)
+        return self.pool.map(self.valid_bird_detection, frames)
+
+
+def crop_to_detection(frame, bbox, margin=0.25):
+    """
+    Schneide ein quadratisches Fenster um die Vogel-Bbox aus (Kaskaden-Modus).
+
+    Die Bbox wird um margin (Anteil der längeren Bbox-Seite) erweitert und auf
+    ein Quadrat ergänzt, damit der Classifier beim Resize nicht verzerrt.
+    Am Bildrand wird das Fenster ins Bild verschoben bzw. gekürzt.
+
+    Args:
+        frame: RGB-Array [H, W, 3]
+        bbox: (ymin, xmin, ymax, xmax) normalisiert 0-1 (siehe detect_bird)
+        margin: Rand um die Bbox
+
+    Returns:
+        np.ndarray: Crop als View in frame (kein Kopieren)
+    """
+    height, width = frame.shape[:2]
+    ymin, xmin, ymax, xmax = bbox
+
+    box_w = (xmax - xmin) * width
+    box_h = (ymax - ymin) * height
+    side = int(round(max(box_w, box_h) * (1 + 2 * margin)))
+    side = max(1, min(side, width, height))
+
+    cx = (xmin + xmax) / 2 * width
+    cy = (ymin + ymax) / 2 * height
+    x0 = int(round(min(max(cx - side / 2, 0), width - side)))
+    y0 = int(round(min(max(cy - side / 2, 0), height - side)))
+
+    return frame[y0:y0 + side, x0:x0 + side]
 
 
 # Singleton
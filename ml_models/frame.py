@@ -0,0 +1,105 @@
+"""
+Decoded Frame - einmal dekodieren, Inputs für Detector und Classifier daraus ableiten
+Bildpfade werden nur einmal geöffnet (JPEG mit Draft-Modus direkt in reduzierter
+Grösse), skalierte Model-Inputs werden pro (Grösse, Filter) gecacht.
+"""
+import logging
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger('birdy')
+
+# Standard-Filter pro Modell (ML_FAST_RESIZE=True → überall BILINEAR)
+RESAMPLE_CLASSIFIER = Image.LANCZOS
+RESAMPLE_DETECTOR = Image.BICUBIC
+
+
+class DecodedFrame:
+    """
+    Ein dekodiertes RGB-Frame mit Cache der skalierten Model-Inputs.
+
+    Kann aus einem Bildpfad (open()) oder einem RGB-Array [H, W, 3] uint8
+    (z.B. aus iter_video_frames – vorher kopieren) erzeugt werden.
+    BirdSizeDetector und BirdClassifier akzeptieren Pfade, Arrays oder DecodedFrame.
+    """
+
+    def __init__(self, array=None, image=None, source=None):
+        self._array = array
+        self._image = image
+        self.source = source
+        self._resized = {}  # {(width, height, resample): np.ndarray}
+
+    @classmethod
+    def open(cls, path, min_size=None):
+        """
+        Dekodiere ein Bild von Disk.
+
+        Args:
+            path: Bildpfad
+            min_size: (width, height) – kleinste benötigte Grösse. JPEGs werden dann
+                      per draft() mit 1/2, 1/4 oder 1/8 Skalierung dekodiert, solange
+                      das Ergebnis mindestens so gross bleibt.
+        """
+        image = Image.open(path)
+        if min_size is not None and image.format == 'JPEG':
+            image.draft('RGB', (int(min_size[0]), int(min_size[1])))
+        image = image.convert('RGB')
+        return cls(image=image, source=Path(path))
+
+    @classmethod
+    def coerce(cls, frame, min_size=None):
+        """Pfad, Array oder DecodedFrame → DecodedFrame"""
+        if isinstance(frame, cls):
+            return frame
+        if isinstance(frame, np.ndarray):
+            return cls(array=frame)
+        return cls.open(frame, min_size=min_size)
+
+    @property
+    def image(self):
+        if self._image is None:
+            self._image = Image.fromarray(self._array)
+        return self._image
+
+    @property
+    def array(self):
+        if self._array is None:
+            self._array = np.asarray(self._image)
+        return self._array
+
+    @property
+    def size(self):
+        """(width, height) des dekodierten Frames"""
+        if self._image is not None:
+            return self._image.size
+        return self._array.shape[1], self._array.shape[0]
+
+    def resized(self, size, resample=RESAMPLE_CLASSIFIER):
+        """
+        Skaliertes Frame als uint8-Array [H, W, 3] (gecacht).
+
+        Args:
+            size: (width, height)
+            resample: PIL Filter; mit ML_FAST_RESIZE wird BILINEAR verwendet
+        """
+        resample = fast_resample(resample)
+        key = (int(size[0]), int(size[1]), resample)
+        cached = self._resized.get(key)
+        if cached is None:
+            if self.size == key[:2]:
+                cached = self.array
+            else:
+                cached = np.asarray(self.image.resize(key[:2], resample))
+            self._resized[key] = cached
+        return cached
+
+
+def fast_resample(resample):
+    """BILINEAR statt des Modell-Filters wenn ML_FAST_RESIZE aktiv ist"""
+    from django.conf import settings
+
+    if settings.BIRDY_SETTINGS.get('ML_FAST_RESIZE', False):
+        return Image.BILINEAR
+    return resample
@@ -0,0 +1,180 @@
+"""
+Interpreter Pool - mehrere TFLite Interpreter pro Modell für parallele Inferenz
+Der Pi 5 hat 4 Kerne: N Interpreter × num_threads lassen sich so aufteilen,
+dass Frames parallel laufen statt seriell auf einem einzelnen Interpreter.
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger('birdy')
+
+
+class InterpreterSlot:
+    """
+    Ein Interpreter des Pools mit gecachten Tensor-Details.
+
+    input_buffer()/output_buffer() liefern NumPy-Views direkt in die Tensor-Buffer
+    des Interpreters (interpreter.tensor()) – kein set_tensor()/get_tensor()-Kopieren.
+    Views dürfen während invoke() nicht mehr referenziert sein (TFLite prüft das)
+    und müssen vor dem Zurückgeben des Slots an den Pool freigegeben werden.
+    """
+
+    def __init__(self, interpreter, index):
+        self.interpreter = interpreter
+        self.index = index
+        self._refresh_details()
+
+    def _refresh_details(self):
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self._input_tensor = self.interpreter.tensor(self.input_details[0]['index'])
+        self._output_tensors = [self.interpreter.tensor(d['index']) for d in self.output_details]
+
+    def input_buffer(self):
+        """View in den Input-Tensor [batch, H, W, C] – Pixel direkt hineinschreiben"""
+        return self._input_tensor()
+
+    def output_buffer(self, i=0):
+        """View in den i-ten Output-Tensor (nur bis zum nächsten invoke() gültig)"""
+        return self._output_tensors[i]()
+
+    @property
+    def batch_size(self):
+        return int(self.input_details[0]['shape'][0])
+
+    def resize_batch(self, batch_size):
+        """
+        Passe Batch-Dimension des Input-Tensors an (nur wenn nötig).
+
+        Returns:
+            bool: False wenn das Modell die Batch-Grösse nicht unterstützt
+                  (Interpreter bleibt dann bei Batch-Grösse 1)
+        """
+        if self.batch_size == batch_size:
+            return True
+
+        try:
+            self._resize(batch_size)
+            return True
+        except Exception as e:
+            logger.warning(f"Interpreter {self.index}: batch size {batch_size} not supported: {e}")
+            if batch_size != 1:
+                self._resize(1)
+            return False
+
+    def _resize(self, batch_size):
+        shape = list(self.input_details[0]['shape'])
+        shape[0] = batch_size
+        self.interpreter.resize_tensor_input(self.input_details[0]['index'], shape)
+        self.interpreter.allocate_tensors()
+        self._refresh_details()
+
+
+class InterpreterPool:
+    """
+    Pool aus N Interpretern desselben Modells.
+
+    acquire() leiht einen freien Interpreter exklusiv aus (blockiert bis einer
+    frei ist) – damit sind die Modell-Wrapper thread-safe. acquire_single() liefert
+    einen zusätzlichen Interpreter mit fester Batch-Grösse 1, damit Einzelbilder die
+    Batch-Tensoren der Pool-Interpreter nicht umallozieren. map() verteilt
+    Aufrufe über einen ThreadPoolExecutor mit N Workern auf die Interpreter.
+    Mit size=1 verhält sich alles wie ein einzelner Interpreter (seriell).
+    """
+
+    def __init__(self, model_path, size=1, num_threads=None, use_xnnpack=True, name='model'):
+        from ai_edge_litert.interpreter import Interpreter
+
+        self.model_path = Path(model_path)
+        self.size = max(1, int(size))
+        self.num_threads = num_threads
+        self.name = name
+
+        kwargs = {'model_path': str(self.model_path)}
+        if num_threads:
+            kwargs['num_threads'] = int(num_threads)
+        if not use_xnnpack:
+            # Standard-Resolver nutzt XNNPACK wo verfügbar; nur abschalten wenn explizit gewünscht
+            from ai_edge_litert.interpreter import OpResolverType
+            kwargs['experimental_op_resolver_type'] = OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+
+        self._interpreter_cls = Interpreter
+        self._kwargs = kwargs
+        self.slots = []
+        self._free = queue.Queue()
+        for i in range(self.size):
+            slot = self._create_slot(i)
+            self.slots.append(slot)
+            self._free.put(slot)
+
+        self._single = None
+        self._single_lock = threading.Lock()
+
+        self._executor = None
+        if self.size > 1:
+            self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix=f"{name}-pool")
+
+        logger.info(
+            f"Interpreter pool '{name}': {self.size} × {num_threads or 'default'} threads "
+            f"(XNNPACK {'on' if use_xnnpack else 'off'})"
+        )
+
+    def _create_slot(self, index):
+        interpreter = self._interpreter_cls(**self._kwargs)
+        interpreter.allocate_tensors()
+        return InterpreterSlot(interpreter, index)
+
+    @contextmanager
+    def acquire_single(self):
+        """Eigenen Interpreter mit Batch-Grösse 1 ausleihen (beim ersten Aufruf angelegt)"""
+        with self._single_lock:
+            if self._single is None:
+                self._single = self._create_slot('single')
+            yield self._single
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """Leihe einen freien Interpreter aus (Context Manager)"""
+        slot = self._free.get(timeout=timeout)
+        try:
+            yield slot
+        finally:
+            self._free.put(slot)
+
+    def map(self, func, items):
+        """
+        Führe func(item) für alle Items aus – parallel auf bis zu size Threads.
+
+        func muss sich selbst per acquire() einen Interpreter holen (z.B. die
+        öffentlichen Methoden von BirdClassifier/BirdSizeDetector).
+
+        Returns:
+            list: Ergebnisse in Reihenfolge der Items
+        """
+        items = list(items)
+        if self._executor is None or len(items) <= 1:
+            return [func(item) for item in items]
+        return list(self._executor.map(func, items))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def create_pool(model_path, name):
+    """Erzeuge Interpreter Pool mit Layout aus BIRDY_SETTINGS"""
+    from django.conf import settings
+
+    s = settings.BIRDY_SETTINGS
+    return InterpreterPool(
+        model_path,
+        size=s.get('ML_INTERPRETER_POOL_SIZE', 1),
+        num_threads=s.get('ML_INTERPRETER_NUM_THREADS'),
+        use_xnnpack=s.get('ML_USE_XNNPACK', True),
+        name=name,
+    )
@@ -0,0 +1,115 @@
+"""
+Benchmark-Command für die PIR Flankenerkennung (Edge Alerts vs. Polling)
+"""
+import queue
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Misst Trigger→Callback Latenz und Leerlauf-CPU der PIR Modi mit simuliertem GPIO'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode',
+            choices=['edge', 'poll', 'both'],
+            default='both',
+            help='Zu messender Modus (default: both)'
+        )
+        parser.add_argument(
+            '--triggers',
+            type=int,
+            default=50,
+            help='Anzahl simulierter Bewegungen pro Modus (default: 50)'
+        )
+        parser.add_argument(
+            '--idle',
+            type=float,
+            default=5.0,
+            help='Leerlauf-Messdauer in Sekunden (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        modes = ['edge', 'poll'] if options['mode'] == 'both' else [options['mode']]
+
+        self.stdout.write(self.style.SUCCESS('=== PIR Benchmark ===\n'))
+        self.stdout.write('GPIO:       FakeGPIOBackend (simuliert)')
+        self.stdout.write(f'Triggers:   {options["triggers"]} pro Modus')
+        self.stdout.write(f'Leerlauf:   {options["idle"]:.1f}s')
+        self.stdout.write('')
+
+        rows = []
+        for mode in modes:
+            rows.append((mode, *self._benchmark_mode(mode, options['triggers'], options['idle'])))
+
+        self.stdout.write(self.style.SUCCESS('=== Ergebnis ==='))
+        self.stdout.write(
+            f'  {"Modus":<6} {"Median ms":>10} {"P95 ms":>8} {"Max ms":>8} {"Verpasst":>9} {"Idle CPU ms/s":>14}'
+        )
+        for mode, median_ms, p95_ms, max_ms, missed, idle_cpu in rows:
+            self.stdout.write(
+                f'  {mode:<6} {median_ms:10.2f} {p95_ms:8.2f} {max_ms:8.2f} {missed:9d} {idle_cpu:14.3f}'
+            )
+
+    def _benchmark_mode(self, mode, triggers, idle_seconds):
+        """
+        Returns:
+            tuple: (Median ms, P95 ms, Max ms, verpasste Flanken, Leerlauf-CPU ms pro Sekunde)
+        """
+        import numpy as np
+
+        from hardware.gpio_backend import FakeGPIOBackend
+        from hardware.pir_sensor import PIRSensorController
+
+        class ProbeSensor(PIRSensorController):
+            """Meldet den Zeitpunkt jeder verarbeiteten Flanke statt PIREvents zu speichern"""
+
+            def __init__(self, backend):
+                super().__init__(backend=backend, warmup_seconds=0)
+                self.edges = queue.SimpleQueue()
+
+            def _handle_motion_detected(self, timestamp, gpio_state):
+                self.edges.put(time.monotonic_ns())
+
+            def _handle_no_motion(self, timestamp, gpio_state, duration):
+                self.edges.put(time.monotonic_ns())
+
+        backend = FakeGPIOBackend(supports_alerts=(mode == 'edge'))
+        sensor = ProbeSensor(backend)
+        sensor.initialize()
+        if sensor.mode != mode:
+            self.stdout.write(self.style.WARNING(f'Modus {mode} nicht verfügbar – gemessen wird {sensor.mode}'))
+
+        rng = random.Random(0)
+        latencies = []
+        missed = 0
+        try:
+            for _ in range(triggers):
+                for level in (1, 0):
+                    tick = backend.set_level(level)
+                    try:
+                        handled = sensor.edges.get(timeout=1.0)
+                        latencies.append((handled - tick) / 1e6)
+                    except queue.Empty:
+                        missed += 1
+                    # Zufälliger Abstand, damit Polling nicht im Takt der Flanken liegt
+                    time.sleep(rng.uniform(0.01, 0.1))
+
+            # Leerlauf: CPU-Zeit des Prozesses ohne Flanken
+            cpu_start = time.process_time()
+            time.sleep(idle_seconds)
+            idle_cpu = (time.process_time() - cpu_start) * 1000 / idle_seconds
+        finally:
+            sensor.cleanup()
+
+        if not latencies:
+            return 0.0, 0.0, 0.0, missed, idle_cpu
+        return (
+            float(np.median(latencies)),
+            float(np.percentile(latencies, 95)),
+            float(np.max(latencies)),
+            missed,
+            idle_cpu,
+        )
@@ -0,0 +1,133 @@
+"""
+Benchmark-Command für die Aufnahme-Modi (rpicam-vid vs. Ring Buffer)
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Misst Trigger-Latenz, Pre-Trigger Abdeckung und Totzeit der Aufnahme-Modi'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            choices=['fake', 'camera'],
+            default='fake',
+            help='fake = synthetische Frames (ohne Kamera), camera = echter Camera Worker (default: fake)'
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='Anzahl Aufnahmen (default: 5)'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5.0,
+            help='Live-Aufnahmedauer pro Lauf in Sekunden (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('=== Aufnahme Benchmark ===\n'))
+
+        if options['source'] == 'fake':
+            self._benchmark_fake(options['runs'], options['duration'])
+        else:
+            self._benchmark_camera(options['runs'], options['duration'])
+
+    def _benchmark_fake(self, runs, duration):
+        from django.conf import settings
+
+        from hardware.ring_buffer import FakeFrameSource, H264RingBuffer
+
+        framerate = settings.BIRDY_SETTINGS['CAMERA_FRAMERATE']
+        pre_trigger = settings.BIRDY_SETTINGS.get('PRE_TRIGGER_SECONDS', 3)
+
+        ring = H264RingBuffer(pre_trigger, framerate)
+        source = FakeFrameSource(ring, framerate=framerate, gop=framerate)
+
+        self.stdout.write(f'Quelle:       FakeFrameSource ({framerate} fps, GOP {framerate})')
+        self.stdout.write(f'Pre-Trigger:  {pre_trigger}s ({ring.max_frames} Frames)')
+        self.stdout.write('')
+
+        source.start()
+        latencies = []
+        pre_seconds = []
+        gaps = []
+
+        try:
+            with tempfile.TemporaryDirectory(prefix='birdy_bench_') as tmp:
+                idle_since = time.time()
+                for i in range(runs):
+                    # Puffer vollaufen lassen (wie Wartezeit zwischen zwei Vögeln)
+                    time.sleep(max(0.0, pre_trigger - (time.time() - idle_since)))
+
+                    path = Path(tmp) / f'run_{i}.h264'
+                    t0 = time.perf_counter()
+                    pre = ring.begin_recording(path)
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                    pre_seconds.append(pre)
+
+                    time.sleep(duration)
+
+                    t1 = time.perf_counter()
+                    stats = ring.end_recording()
+                    idle_since = time.time()
+                    gaps.append((time.perf_counter() - t1) * 1000)
+
+                    self.stdout.write(
+                        f'  Lauf {i + 1}: pre={pre:.2f}s, frames={stats["pre_frames"]}+{stats["live_frames"]}, '
+                        f'{stats["bytes"] / 1024:.0f} KB, trigger→flush {latencies[-1]:.1f}ms'
+                    )
+        finally:
+            source.stop()
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=== Ergebnis (ringbuffer) ==='))
+        self.stdout.write(f'  Trigger→Flush:     Ø {sum(latencies) / len(latencies):.1f}ms, max {max(latencies):.1f}ms')
+        self.stdout.write(f'  Stop-Latenz:       Ø {sum(gaps) / len(gaps):.1f}ms')
+        self.stdout.write(f'  Pre-Trigger:       Ø {sum(pre_seconds) / len(pre_seconds):.2f}s (Soll {pre_trigger}s)')
+        self.stdout.write('  Kamera-Totzeit:    0s (Sensor bleibt offen)')
+
+    def _benchmark_camera(self, runs, duration):
+        from hardware.camera import get_camera
+
+        camera = get_camera()
+        if not camera.is_initialized:
+            self.stdout.write(self.style.ERROR('Kamera konnte nicht initialisiert werden'))
+            return
+
+        mode = getattr(camera, 'recording_mode', 'rpicam')
+        self.stdout.write(f'Quelle:       Camera Worker (Modus: {mode})')
+        self.stdout.write('')
+
+        dead_times = []
+        try:
+            with tempfile.TemporaryDirectory(prefix='birdy_bench_') as tmp:
+                for i in range(runs):
+                    path = Path(tmp) / f'run_{i}.mp4'
+                    t0 = time.time()
+                    video, actual = camera.record_video_dynamic(path, pir_sensor=None, max_duration=duration)
+                    wall = time.time() - t0
+
+                    if not video:
+                        self.stdout.write(self.style.ERROR(f'  Lauf {i + 1}: Aufnahme fehlgeschlagen'))
+                        continue
+
+                    # Totzeit = Wandzeit, die nicht im Video landet (Stop/Start, Mux)
+                    dead = max(0.0, wall - duration)
+                    dead_times.append(dead)
+                    self.stdout.write(
+                        f'  Lauf {i + 1}: Video {actual:.1f}s, Wandzeit {wall:.1f}s, Totzeit {dead:.2f}s'
+                    )
+        finally:
+            camera.cleanup()
+
+        if dead_times:
+            self.stdout.write('')
+            self.stdout.write(self.style.SUCCESS(f'=== Ergebnis ({mode}) ==='))
+            self.stdout.write(f'  Totzeit pro Besuch: Ø {sum(dead_times) / len(dead_times):.2f}s')
@@ -22,6 +22,8 @@ class Command(BaseCommand):
 
         weight_sensor = get_weight_sensor()
         if weight_sensor.is_initialized:
+            # Kontinuierliches Sampling – read_weight_grams() blockiert den Main Loop nicht mehr
+            weight_sensor.start_sampler()
             self.stdout.write(self.style.SUCCESS('✓ Weight sensor initialized'))
         else:
             self.stdout.write(self.style.ERROR('✗ Weight sensor failed'))
@@ -61,12 +63,20 @@ class Command(BaseCommand):
         if mqtt.is_connected:
             self.stdout.write(self.style.SUCCESS('✓ MQTT connected'))
         else:
-            self.stdout.write(self.style.WARNING('⚠ MQTT not connected'))
+            self.stdout.write(self.style.WARNING('⚠ MQTT not connected yet (reconnects in background)'))
 
         # 4. PIR Callbacks registrieren
         self.stdout.write('Registering PIR callbacks...')
+        from django.conf import settings
+
         from services.bird_detection import get_detection_service
 
+        # Landung/Abflug auf der Futterplatte aus dem Gewichtsstrom (Weight Gate + Masse)
+        landing_detector = None
+        if weight_sensor.is_initialized and settings.BIRDY_SETTINGS.get('WEIGHT_LANDING_ENABLED', False):
+            from hardware.landing_detector import LandingDetector
+            landing_detector = LandingDetector(weight_sensor)
+
         # WICHTIG: Übergebe Hardware-Instanzen an Detection Service
         # Damit nutzt der Service die gleichen Instanzen wie start_birdy (gleicher Prozess)
         detection_service = get_detection_service(
@@ -74,8 +84,12 @@ class Command(BaseCommand):
             classifier=classifier,
             pir_sensor=pir_sensor,
             bird_detector=bird_detector,
+            landing_detector=landing_detector,
         )
         pir_sensor.register_motion_callback(detection_service.handle_motion_detected)
+        if landing_detector is not None and settings.BIRDY_SETTINGS.get('WEIGHT_LANDING_TRIGGER', False):
+            landing_detector.register_landing_callback(detection_service.handle_landing_detected)
+            self.stdout.write(self.style.SUCCESS('✓ Weight landing trigger registered'))
 
         self.stdout.write(self.style.SUCCESS('✓ Detection service registered'))
 
@@ -92,6 +106,7 @@ class Command(BaseCommand):
             from django.utils import timezone
 
             from sensors.models import SensorStatus, WeightMeasurement
+            from services.live_events import publish_event
 
             last_weight_measurement = time.time()
             last_sensor_status_update = time.time()
@@ -113,6 +128,8 @@ class Command(BaseCommand):
                             status.save()
 
                             logger.info(f"Weight measured: {weight:.1f}g")
+                            publish_event('weight', {'weight_grams': round(weight, 1)}, only_changes=True)
+                            mqtt.publish_weight(weight)
                         else:
                             status = SensorStatus.get_current()
                             status.weight_sensor_online = False
@@ -138,18 +155,45 @@ class Command(BaseCommand):
                             status.camera_online = camera.is_initialized
 
                         status.save()
+                        publish_event('sensor_status', {
+                            'weight_sensor_online': status.weight_sensor_online,
+                            'pir_sensor_online': status.pir_sensor_online,
+                            'camera_online': status.camera_online,
+                            'bird_present': status.bird_present,
+                        }, only_changes=True)
+                        mqtt.publish_bird_present(status.bird_present)
                         logger.debug(f"Sensor status: PIR={status.pir_sensor_online}, Camera={status.camera_online}, Weight={status.weight_sensor_online}")
+
+                        # Persistence Backlog (Detections, die noch nicht gespeichert sind)
+                        persistence = detection_service.get_persistence_status()
+                        if persistence and persistence['depth']:
+                            logger.info(
+                                f"Persistence backlog: {persistence['depth']} job(s), "
+                                f"oldest {persistence['oldest_age_seconds']}s"
+                            )
+
+                        triggers = detection_service.get_trigger_status()
+                        if triggers:
+                            logger.debug(
+                                f"PIR triggers: received={triggers['received']}, started={triggers['started']}, "
+                                f"merged={triggers['merged']}, queued={triggers['queued']}, "
+                                f"dropped={triggers['dropped']}"
+                            )
                     except Exception as e:
                         logger.error(f"Error updating sensor status: {e}")
 
                     last_sensor_status_update = current_time
 
+                # MQTT Abgleich mit der DB (nach Reconnect, Datumswechsel, sonst selten)
+                mqtt.refresh()
+
                 time.sleep(1)
 
         except KeyboardInterrupt:
             self.stdout.write('\n\nShutting down...')
 
-            # Cleanup
+            # Cleanup (ausstehende Detections zuerst speichern)
+            detection_service.shutdown()
             weight_sensor.cleanup()
             pir_sensor.cleanup()
             camera.cleanup()
@@ -1,2 +1,118 @@
+"""
+Tests für den PIR Sensor Controller (Edge- und Polling-Modus) mit FakeGPIOBackend
+"""
+import queue
+import time
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from hardware.gpio_backend import FakeGPIOBackend
+from hardware.pir_sensor import PIRSensorController
+from services.pir_event_writer import PendingPIREvent
+
+
+class RecordingEventWriter:
+    """Ersatz für den PIREventWriter – sammelt Events statt sie zu speichern"""
+
+    def __init__(self):
+        self.events = []
+
+    def submit(self, event_type, timestamp, duration_seconds=None):
+        event = PendingPIREvent(event_type, timestamp, duration_seconds)
+        self.events.append(event)
+        return event
+
+    def stop(self, timeout=5):
+        pass
+
+
+class PIRSensorControllerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.motion = queue.SimpleQueue()
+        self.no_motion = queue.SimpleQueue()
+
+    def _start(self, backend):
+        pir = PIRSensorController(backend=backend, warmup_seconds=0)
+        pir._event_writer = RecordingEventWriter()
+        pir.register_motion_callback(self.motion.put)
+        pir.register_no_motion_callback(self.no_motion.put)
+        self.assertTrue(pir.initialize())
+        self.addCleanup(pir.cleanup)
+        return pir
+
+    def _wait_idle(self, pir):
+        """Warten bis der Dispatch-Thread alle eingereihten Flanken verarbeitet hat"""
+        deadline = time.monotonic() + 2
+        while not pir._edge_queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+    def test_edge_mode_runs_callbacks(self):
+        backend = FakeGPIOBackend()
+        pir = self._start(backend)
+        self.assertEqual(pir.mode, 'edge')
+
+        backend.set_level(1)
+        event = self.motion.get(timeout=2)
+        self.assertEqual(event.event_type, 'triggered')
+        self.assertTrue(pir.motion_active)
+        self.assertTrue(pir.is_motion_detected())
+
+        backend.set_level(0)
+        event = self.no_motion.get(timeout=2)
+        self.assertEqual(event.event_type, 'cleared')
+        self.assertGreaterEqual(event.duration_seconds, 0)
+        self.assertFalse(pir.motion_active)
+
+        self.assertEqual([e.event_type for e in pir._event_writer.events], ['triggered', 'cleared'])
+
+    def test_cooldown_ignores_retrigger(self):
+        backend = FakeGPIOBackend()
+        pir = self._start(backend)
+
+        backend.set_level(1)
+        self.motion.get(timeout=2)
+        backend.set_level(0)
+        self.no_motion.get(timeout=2)
+
+        # Erneute Bewegung innerhalb von min_motion_interval → ignoriert, auch kein 'cleared'
+        backend.set_level(1)
+        backend.set_level(0)
+        self._wait_idle(pir)
+        self.assertTrue(self.motion.empty())
+        self.assertTrue(self.no_motion.empty())
+        self.assertEqual(len(pir._event_writer.events), 2)
+
+    def test_duplicate_edges_are_ignored(self):
+        backend = FakeGPIOBackend()
+        pir = self._start(backend)
+
+        backend.set_level(1)
+        self.motion.get(timeout=2)
+
+        # Doppelte HIGH-Flanke (Prellen) und Watchdog (level 2) dürfen nichts auslösen
+        pir.min_motion_interval = 0
+        pir._on_edge(1, time.monotonic_ns())
+        pir._on_edge(2, time.monotonic_ns())
+        self._wait_idle(pir)
+        self.assertTrue(self.motion.empty())
+        self.assertEqual(len(pir._event_writer.events), 1)
+
+        backend.set_level(0)
+        self.no_motion.get(timeout=2)
+        pir._on_edge(0, time.monotonic_ns())
+        self._wait_idle(pir)
+        self.assertTrue(self.no_motion.empty())
+        self.assertEqual(len(pir._event_writer.events), 2)
+
+    def test_falls_back_to_polling_without_alerts(self):
+        backend = FakeGPIOBackend(supports_alerts=False)
+        pir = self._start(backend)
+        self.assertEqual(pir.mode, 'poll')
+        self.assertEqual(backend._callbacks, [])
+
+        backend.set_level(1)
+        self.assertEqual(self.motion.get(timeout=2).event_type, 'triggered')
+        backend.set_level(0)
+        self.assertEqual(self.no_motion.get(timeout=2).event_type, 'cleared')
@@ -2,8 +2,8 @@
 Bird Detection Service - Orchestriert gesamten Detection-Workflow
 """
 import logging
-import shutil
 import threading
+import time
 from pathlib import Path
 
 from celery import shared_task
@@ -13,15 +13,88 @@ from django.utils import timezone
 logger = logging.getLogger('birdy')
 
 
+class EarlyExitPolicy:
+    """
+    Abbruch-Regel für die Frame-Klassifikation eines Besuchs.
+
+    Stoppt, sobald K aufeinanderfolgende klassifizierte Frames dieselbe
+    Nicht-Background Art mit Konfidenz >= T zeigen, oder wenn das Zeitbudget
+    pro Besuch aufgebraucht ist.
+    """
+
+    CONFIDENT_STREAK = 'confident_streak'
+    LATENCY_BUDGET = 'latency_budget'
+    COMPLETED = 'completed'
+
+    def __init__(self, consecutive_frames=3, confidence=0.9, budget_ms=None):
+        self.consecutive_frames = consecutive_frames  # 0 = Streak-Regel aus
+        self.confidence = confidence
+        self.budget_ms = budget_ms                    # None = unbegrenzt
+        self.started_at = time.monotonic()
+        self.reset_streak()
+
+    @classmethod
+    def from_settings(cls):
+        s = settings.BIRDY_SETTINGS
+        return cls(
+            consecutive_frames=s.get('EARLY_EXIT_CONSECUTIVE_FRAMES', 0),
+            confidence=s.get('EARLY_EXIT_CONFIDENCE', 0.9),
+            budget_ms=s.get('CLASSIFICATION_BUDGET_MS'),
+        )
+
+    @property
+    def enabled(self):
+        return bool(self.consecutive_frames) or self.budget_ms is not None
+
+    def reset_streak(self):
+        self._streak_label = None
+        self._streak = 0
+
+    def observe(self, label, confidence, is_background):
+        """
+        Nächstes Frame (in Video-Reihenfolge) in die Streak-Regel einspeisen.
+
+        Returns:
+            str: CONFIDENT_STREAK wenn die Regel erfüllt ist, sonst None
+        """
+        if not self.consecutive_frames:
+            return None
+
+        if is_background or confidence < self.confidence:
+            self.reset_streak()
+            return None
+
+        if label == self._streak_label:
+            self._streak += 1
+        else:
+            self._streak_label = label
+            self._streak = 1
+
+        return self.CONFIDENT_STREAK if self._streak >= self.consecutive_frames else None
+
+    def budget_exceeded(self):
+        if self.budget_ms is None:
+            return False
+        return (time.monotonic() - self.started_at) * 1000 >= self.budget_ms
+
+    def as_dict(self):
+        return {
+            'consecutive_frames': self.consecutive_frames,
+            'confidence': self.confidence,
+            'budget_ms': self.budget_ms,
+        }
+
+
 class BirdDetectionService:
     """Service für kompletten Vogel-Detektion Workflow"""
 
-    def __init__(self, camera=None, classifier=None, pir_sensor=None, bird_detector=None):
+    def __init__(self, camera=None, classifier=None, pir_sensor=None, bird_detector=None, landing_detector=None):
         self.storage_path = settings.USB_STORAGE_PATH
         self.camera = camera
         self.classifier = classifier
         self.pir_sensor = pir_sensor
         self.bird_detector = bird_detector
+        self.landing_detector = landing_detector
 
         # Verhindert parallele Aufnahmen während ein Besuch aufgezeichnet wird
         self._recording_lock = threading.Lock()
@@ -30,51 +103,72 @@ class BirdDetectionService:
         # {species_label: datetime}
         self._last_visit_times = {}
 
+        # Streaming Detection Pipeline des laufenden Besuchs (DETECTION_PIPELINE_ENABLED)
+        self._active_pipeline = None
+
+        # DB/Media/MQTT-Arbeit gültiger Besuche (siehe persistence_worker)
+        self._persistence_worker = None
+
+        # PIR-Trigger → Capture-Thread (siehe trigger_scheduler)
+        self._trigger_scheduler = None
+
     def handle_motion_detected(self, pir_event):
         """
-        Handler für PIR Motion Event - startet Detection Workflow
+        Handler für PIR Motion Event - reicht den Trigger an den Capture-Thread weiter
+
+        Trigger während einer Aufnahme verlängern diese, Trigger während der
+        Klassifikation starten danach eine neue Aufnahme (siehe TriggerScheduler).
 
         Args:
-            pir_event: PIREvent Model Instance
+            pir_event: PendingPIREvent (DB-ID wird vom PIR Event Writer nachgetragen)
         """
-        # Wenn gerade eine Aufnahme läuft: PIR-Trigger ignorieren
-        # (Die laufende Aufnahme überwacht den PIR selbst und läuft weiter)
-        if self._recording_lock.locked():
-            logger.debug("Recording already in progress – PIR trigger ignored")
-            return
+        outcome = self.trigger_scheduler.trigger(pir_event)
+        if outcome == 'started':
+            logger.info("Motion detected - starting bird detection workflow...")
+        else:
+            logger.info(f"Motion detected - trigger {outcome} ({self.trigger_scheduler.phase})")
 
-        logger.info("Motion detected - starting bird detection workflow...")
-
-        # WICHTIG: Starte Detection in separatem Thread um PIR Monitoring nicht zu blockieren!
-        # Kamera läuft nur in diesem Prozess, Celery Worker hat keinen Zugriff
-        detection_thread = threading.Thread(
-            target=self.process_detection,
-            args=(pir_event.id,),
-            daemon=False,  # Nicht daemon, damit Thread zu Ende läuft
-            name=f"BirdDetection-{pir_event.id}"
-        )
-        detection_thread.start()
-        logger.debug(f"Detection thread started: {detection_thread.name}")
+    def handle_landing_detected(self, event):
+        """
+        Handler für Landungen auf der Futterplatte (LandingDetector) - zusätzliche Trigger-Quelle
 
-    def process_detection(self, pir_event_id):
+        Args:
+            event: Landing Event dict (type, mass_grams, timestamp, monotonic)
         """
-        Vollständiger Detection-Workflow mit PIR-basierter dynamischer Aufnahmedauer.
+        outcome = self.trigger_scheduler.trigger(None)  # kein PIREvent
+        logger.info(f"Landing detected (~{event['mass_grams']:.1f}g) - trigger {outcome}")
+
+    @property
+    def trigger_scheduler(self):
+        """Trigger Scheduler mit dem langlebigen Capture-Thread (lazy)"""
+        if self._trigger_scheduler is None:
+            from services.trigger_scheduler import TriggerScheduler
+
+            # Kamera läuft nur in diesem Prozess, Celery Worker hat keinen Zugriff
+            self._trigger_scheduler = TriggerScheduler(
+                self.process_detection,
+                max_age_seconds=settings.BIRDY_SETTINGS.get('TRIGGER_MAX_AGE_SECONDS', 20),
+            )
+        return self._trigger_scheduler
+
+    def get_trigger_status(self):
+        """Zähler der PIR-Trigger (received/started/merged/queued/dropped)"""
+        if self._trigger_scheduler is None:
+            return None
+        return self._trigger_scheduler.status()
+
+    def process_detection(self, pir_event):
+        """
+        Capture-Pfad des Detection-Workflows mit PIR-basierter dynamischer Aufnahmedauer.
 
         1. Nehme Video auf (dynamisch: stoppt wenn PIR LOW oder max_duration)
-        2. Extrahiere Kandidaten-Frames (proportional zur Aufnahmedauer)
+        2. Streame Kandidaten-Frames (proportional zur Aufnahmedauer, ohne Temp-Dateien)
         3. Klassifiziere Vogel
-        4. Speichere Ergebnisse
-        5. Update Statistiken
-        6. Benachrichtige Home Assistant
+        4. Übergebe gültige Besuche an den Persistence Worker (Foto, DB, Statistiken,
+           Home Assistant) – _recording_lock ist danach sofort wieder frei
         """
-        from media_manager.models import Photo, Video
-        from sensors.models import PIREvent
-        from species.models import BirdDetection, BirdSpecies, DailyStatistics
-
         with self._recording_lock:
             try:
-                pir_event = PIREvent.objects.get(id=pir_event_id)
-
                 camera = self.camera
                 classifier = self.classifier
                 pir_sensor = self.pir_sensor
@@ -100,215 +194,628 @@ class BirdDetectionService:
                 video_filename = f"{filename_base}.mp4"
                 video_path = self.storage_path / 'videos' / date_path / video_filename
 
-                logger.info(f"Recording video: {video_path}")
-                recorded_video, actual_duration = camera.record_video_dynamic(
-                    video_path,
-                    pir_sensor=pir_sensor,
-                )
-
-                if not recorded_video:
-                    logger.error("Video recording failed")
-                    return
-
-                # Extrahiere Kandidaten-Frames proportional zur tatsächlichen Aufnahmedauer
-                logger.info(f"Extracting candidate frames (video duration: {actual_duration:.1f}s)...")
-                candidate_frames = camera.extract_candidate_frames(
-                    recorded_video,
-                    actual_duration=actual_duration,
-                )
+                # Pipeline-Modus: Live-Frames werden schon während der Aufnahme bewertet
+                pipeline = self._start_pipeline(camera)
+                record_kwargs = {'on_frame': pipeline.submit} if pipeline is not None else {}
 
-                if not candidate_frames:
-                    logger.error("Candidate frame extraction failed")
-                    recorded_video.unlink(missing_ok=True)
-                    return
+                logger.info(f"Recording video: {video_path}")
 
-                temp_dir = candidate_frames[0].parent
+                # Weight Gate: ohne Landung auf der Platte wird die Aufnahme abgebrochen
+                # (Blick zurück, falls der Vogel schon vor dem Trigger gelandet ist)
+                landing = self.landing_detector
+                s = settings.BIRDY_SETTINGS
+                recording_started = time.monotonic()
+                window_start = recording_started - s.get('WEIGHT_GATE_LOOKBACK_SECONDS', 5)
+                gate = landing is not None and s.get('WEIGHT_GATE_ENABLED', False)
+                if gate:
+                    gate_timeout = s.get('WEIGHT_GATE_TIMEOUT_SECONDS', 3)
+                    record_kwargs['abort'] = lambda: (
+                        time.monotonic() - recording_started > gate_timeout
+                        and not landing.landed_since(window_start)
+                    )
+
+                scheduler = self._trigger_scheduler
+                if scheduler is not None:
+                    # Trigger während der Aufnahme verlängern diese (statt verworfen zu werden)
+                    record_kwargs['last_trigger_at'] = lambda: scheduler.last_trigger_at
 
-                # Bird Size & Position Filter: Frames ohne vollständigen Vogel im ROI verwerfen
-                bird_detector = self.bird_detector
-                if bird_detector and bird_detector.is_initialized and settings.BIRDY_SETTINGS.get('BIRD_DETECTOR_ENABLED', True):
-                    filtered = [f for f in candidate_frames if bird_detector.is_valid_bird_frame(f)]
-                    if filtered:
-                        logger.info(
-                            f"Bird detector: {len(filtered)}/{len(candidate_frames)} frames passed "
-                            f"(coverage + ROI filter)"
-                        )
-                        candidate_frames = filtered
+                try:
+                    recorded_video, actual_duration = camera.record_video_dynamic(
+                        video_path,
+                        pir_sensor=pir_sensor,
+                        **record_kwargs,
+                    )
+                finally:
+                    if scheduler is not None:
+                        scheduler.recording_finished()
+
+                gate_closed = gate and recorded_video and not landing.landed_since(window_start)
+                if not recorded_video or gate_closed:
+                    if gate_closed:
+                        logger.info("Weight gate: nothing landed on the feeder – recording discarded")
+                        recorded_video.unlink(missing_ok=True)
                     else:
-                        logger.info(
-                            f"Bird detector: 0/{len(candidate_frames)} frames passed – "
-                            f"using all frames as fallback (species classifier decides)"
-                        )
+                        logger.error("Video recording failed")
+                    if pipeline is not None:
+                        pipeline.finish(timeout=1)
+                        self._active_pipeline = None
+                    return
 
-                # Klassifiziere alle Frames, wähle den mit höchster Konfidenz
-                logger.info(f"Classifying {len(candidate_frames)} candidate frames...")
+                # Kandidaten-Frames streamen (rawvideo Pipe, keine Temp-JPEGs),
+                # filtern und klassifizieren – bestes Frame bleibt als Array im Speicher
+                logger.info(f"Scoring candidate frames (video duration: {actual_duration:.1f}s)...")
                 classification = None
-                species = None
                 is_valid_visit = False
-                best_frame = None
-                best_confidence = -1.0
-                total_processing_ms = 0
                 min_confidence = settings.BIRDY_SETTINGS['MIN_CONFIDENCE_SPECIES']
-                ignored_species = settings.BIRDY_SETTINGS.get('IGNORED_SPECIES', set())
 
                 if classifier.is_initialized:
-                    for i, frame_path in enumerate(candidate_frames):
-                        result = classifier.classify(frame_path, top_k=5)
-                        if not result:
-                            continue
-
-                        total_processing_ms += result['processing_time_ms']
-                        top_pred = result['top_prediction']
-                        confidence = top_pred['confidence']
-                        is_background = (
-                            top_pred['label'].lower() == 'background'
-                            or top_pred['label'] in ignored_species
-                        )
+                    if pipeline is not None:
+                        scored = self._finish_pipeline(pipeline, camera, recorded_video, actual_duration)
+                    else:
+                        scored = self._score_candidate_frames(camera, recorded_video, actual_duration)
 
-                        logger.debug(
-                            f"Frame {i+1}/{len(candidate_frames)}: "
-                            f"{top_pred['label']} ({confidence:.1%})"
-                            + (" [ignored]" if top_pred['label'] in ignored_species else "")
-                            + (" [background]" if top_pred['label'].lower() == 'background' else "")
-                        )
+                    if scored['frames_total'] == 0:
+                        logger.error("Candidate frame extraction failed")
+                        recorded_video.unlink(missing_ok=True)
+                        return
 
-                        if not is_background and confidence > best_confidence:
-                            best_confidence = confidence
-                            best_frame = frame_path
-                            classification = result
+                    best_frame = scored['best_frame']
+                    best_confidence = scored['best_confidence']
+                    total_processing_ms = scored['processing_time_ms']
+                    classification = scored['classification']
 
                     if best_frame is not None and best_confidence >= min_confidence:
                         is_valid_visit = True
                         classification['processing_time_ms'] = total_processing_ms
-                        species_label = classification['top_prediction']['label']
-
-                        species, created = BirdSpecies.objects.get_or_create(
-                            scientific_name=species_label,
-                            defaults={
-                                'common_name_de': species_label,
-                                'inat_taxon_id': classification['top_prediction']['class_id']
-                            }
-                        )
-                        if created:
-                            logger.info(f"New species discovered: {species_label}")
 
                         logger.info(
-                            f"Best frame: {best_frame.name} → "
-                            f"{species_label} ({best_confidence:.1%}) "
+                            f"Best frame: #{scored['best_index'] + 1} → "
+                            f"{classification['top_prediction']['label']} ({best_confidence:.1%}) "
                             f"[{total_processing_ms}ms total]"
                         )
                     else:
                         reason = (
                             f"best confidence too low ({best_confidence:.1%} < {min_confidence:.1%})"
-                            if best_frame else "no valid (non-background) frame found"
+                            if best_frame is not None else "no valid (non-background) frame found"
                         )
                         logger.info(f"Not a valid visit: {reason}")
 
-                # Kein gültiger Besuch → Temp-Frames + Video löschen, kein DB-Eintrag
+                # Kein gültiger Besuch → Video löschen, kein DB-Eintrag
                 if not is_valid_visit:
-                    shutil.rmtree(temp_dir, ignore_errors=True)
                     recorded_video.unlink(missing_ok=True)
                     logger.info("No valid detection – files deleted, no DB entries created")
                     return
 
-                # Bestes Frame an finalen Pfad kopieren
-                photo_filename = f"{filename_base}.jpg"
-                photo_path = self.storage_path / 'photos' / date_path / photo_filename
-                photo_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(best_frame, photo_path)
+                # Ab hier: gültiger Besuch → Persistenz/Benachrichtigung ausserhalb des Capture-Pfads
+                self.persistence_worker.submit({
+                    'pir_event': pir_event,
+                    'timestamp': timestamp,
+                    'date_path': date_path,
+                    'filename_base': filename_base,
+                    'recorded_video': recorded_video,
+                    'actual_duration': actual_duration,
+                    'best_frame': best_frame,
+                    'classification': classification,
+                    'scoring_metadata': scored['metadata'],
+                    'estimated_mass_grams': landing.estimated_mass(window_start) if landing is not None else None,
+                })
+                logger.info("Capture path done – detection queued for persistence")
 
-                # Temp-Frames aufräumen
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            except Exception as e:
+                logger.error(f"Error in detection workflow: {e}", exc_info=True)
 
-                # Ab hier: gültiger Besuch → DB-Einträge erstellen
+    @property
+    def persistence_worker(self):
+        """Persistence Worker (lazy, ein Thread pro Service)"""
+        if self._persistence_worker is None:
+            from services.persistence_worker import PersistenceWorker
+
+            self._persistence_worker = PersistenceWorker(
+                self._persist_detection,
+                maxsize=settings.BIRDY_SETTINGS.get('PERSISTENCE_QUEUE_SIZE', 16),
+            )
+        return self._persistence_worker
+
+    def get_persistence_status(self):
+        """Queue-Tiefe und Backlog-Alter des Persistence Workers"""
+        if self._persistence_worker is None:
+            return None
+        return self._persistence_worker.status()
+
+    def shutdown(self, timeout=30):
+        """Laufende Aufnahme abschliessen und ausstehende Detections speichern (beim Beenden von start_birdy)"""
+        if self._trigger_scheduler is not None:
+            self._trigger_scheduler.stop(timeout=timeout)
+        if self._persistence_worker is not None:
+            self._persistence_worker.stop(timeout=timeout)
+
+    def _persist_detection(self, job):
+        """
+        Speichere einen gültigen Besuch – läuft im Persistence Worker Thread.
 
-                # latest.mp4 aktualisieren (für HA Media Browser via NFS)
-                latest_path = self.storage_path / 'videos' / 'latest.mp4'
-                try:
-                    shutil.copy2(recorded_video, latest_path)
-                    logger.debug(f"Updated latest.mp4 → {recorded_video.name}")
-                except Exception as e:
-                    logger.warning(f"Could not update latest.mp4: {e}")
-
-                # Video DB Entry
-                actual_filename = recorded_video.name
-                relative_video_path = str(Path('videos') / date_path / actual_filename)
-
-                video_obj = Video.objects.create(
-                    timestamp=timestamp,
-                    file=relative_video_path,
-                    filename=actual_filename,
-                    filesize_bytes=recorded_video.stat().st_size if recorded_video.exists() else 0,
-                    duration_seconds=actual_duration,
-                    width=settings.BIRDY_SETTINGS['CAMERA_RESOLUTION'][0],
-                    height=settings.BIRDY_SETTINGS['CAMERA_RESOLUTION'][1],
-                    framerate=settings.BIRDY_SETTINGS['CAMERA_FRAMERATE'],
-                    codec='h264'
-                )
+        1. Bestes Frame als JPEG
+        2. latest.mp4 aktualisieren
+        3. Video/Photo/BirdDetection DB-Einträge
+        4. Statistiken aktualisieren
+        5. Home Assistant benachrichtigen
 
-                # Photo DB Entry
-                from PIL import Image
-                try:
-                    with Image.open(photo_path) as img:
-                        width, height = img.size
-                except Exception:
-                    width, height = 0, 0
-
-                relative_photo_path = str(Path('photos') / date_path / photo_filename)
-
-                photo_obj = Photo.objects.create(
-                    timestamp=timestamp,
-                    file=relative_photo_path,
-                    filename=photo_filename,
-                    filesize_bytes=photo_path.stat().st_size if photo_path.exists() else 0,
-                    width=width,
-                    height=height
-                )
+        Args:
+            job: dict aus process_detection()
+        """
+        from PIL import Image
+
+        from media_manager.models import Photo, Video
+        from media_manager.thumbnails import create_photo_thumbnails
+        from media_manager.video_output import create_hls, ensure_faststart, publish_latest
+        from services.pir_event_writer import resolve_pir_event_id
+        from species.models import BirdSpecies
+        from species.statistics import create_detection
+
+        timestamp = job['timestamp']
+        date_path = job['date_path']
+        filename_base = job['filename_base']
+        recorded_video = job['recorded_video']
+        actual_duration = job['actual_duration']
+        best_frame = job['best_frame']
+        classification = job['classification']
+
+        # PIREvent ist bis hierhin normalerweise längst gespeichert (Write-Behind)
+        pir_event_id = resolve_pir_event_id(job['pir_event'])
+
+        species_label = classification['top_prediction']['label']
+        species, created = BirdSpecies.objects.get_or_create(
+            scientific_name=species_label,
+            defaults={
+                'common_name_de': species_label,
+                'inat_taxon_id': classification['top_prediction']['class_id']
+            }
+        )
+        if created:
+            logger.info(f"New species discovered: {species_label}")
+
+        # Nur das beste Frame wird als JPEG gespeichert
+        photo_filename = f"{filename_base}.jpg"
+        photo_path = self.storage_path / 'photos' / date_path / photo_filename
+        photo_path.parent.mkdir(parents=True, exist_ok=True)
+        photo_image = Image.fromarray(best_frame)
+        photo_image.save(str(photo_path), quality=95)
+        height, width = best_frame.shape[:2]
+
+        # Streaming-fähig: moov vorne (rpicam-vid Direktaufnahmen), optional HLS-Segmente
+        ensure_faststart(recorded_video)
+        hls_playlist = None
+        if settings.BIRDY_SETTINGS.get('HLS_ENABLED', False):
+            hls_playlist = create_hls(recorded_video, settings.BIRDY_SETTINGS.get('HLS_SEGMENT_SECONDS', 2))
+
+        # latest.mp4 aktualisieren (für HA Media Browser via NFS) – Hardlink + rename statt Kopie
+        latest_path = self.storage_path / 'videos' / 'latest.mp4'
+        try:
+            publish_latest(recorded_video, latest_path)
+            logger.debug(f"Updated latest.mp4 → {recorded_video.name}")
+        except Exception as e:
+            logger.warning(f"Could not update latest.mp4: {e}")
+
+        # Video DB Entry
+        actual_filename = recorded_video.name
+        relative_video_path = str(Path('videos') / date_path / actual_filename)
+
+        video_obj = Video.objects.create(
+            timestamp=timestamp,
+            file=relative_video_path,
+            filename=actual_filename,
+            filesize_bytes=recorded_video.stat().st_size if recorded_video.exists() else 0,
+            duration_seconds=actual_duration,
+            width=settings.BIRDY_SETTINGS['CAMERA_RESOLUTION'][0],
+            height=settings.BIRDY_SETTINGS['CAMERA_RESOLUTION'][1],
+            framerate=settings.BIRDY_SETTINGS['CAMERA_FRAMERATE'],
+            codec='h264',
+            hls_playlist=str(hls_playlist.relative_to(self.storage_path)) if hls_playlist else '',
+        )
+
+        # Photo DB Entry
+        relative_photo_path = str(Path('photos') / date_path / photo_filename)
+
+        photo_obj = Photo.objects.create(
+            timestamp=timestamp,
+            file=relative_photo_path,
+            filename=photo_filename,
+            filesize_bytes=photo_path.stat().st_size if photo_path.exists() else 0,
+            width=width,
+            height=height
+        )
+
+        # Galerie-Thumbnails (AVIF/WebP/JPEG) aus dem bereits dekodierten Frame
+        if create_photo_thumbnails(photo_obj, image=photo_image):
+            logger.debug(f"Thumbnails created for {photo_filename}")
+
+        # Poster = bestes Frame (bevorzugt als grösstes JPEG-Thumbnail statt 1280×720 q95)
+        video_obj.thumbnail_frame = photo_obj.thumbnail_path or relative_photo_path
+        video_obj.save(update_fields=['thumbnail_frame'])
+
+        # Visit-Deduplication: Ist das eine Fortsetzung eines laufenden Besuchs?
+        is_new_visit = self._determine_is_new_visit(species_label, timestamp)
+
+        # BirdDetection Entry + Tages/Monats/Jahreszähler in einer Transaktion (zählt nur is_new_visit=True)
+        detection = create_detection(
+            timestamp=timestamp,
+            species=species,
+            confidence=classification['top_prediction']['confidence'],
+            top_predictions=classification['top_k_predictions'],
+            photo=photo_obj,
+            video=video_obj,
+            pir_event_id=pir_event_id,
+            processed=True,
+            processing_time_ms=classification['processing_time_ms'],
+            is_new_visit=is_new_visit,
+            scoring_metadata=job['scoring_metadata'],
+            estimated_mass_grams=job.get('estimated_mass_grams'),
+        )
+
+        visit_label = "neuer Besuch" if is_new_visit else "Fortsetzung Besuch"
+        logger.info(f"Detection saved: {species.common_name_de} [{visit_label}], statistics updated")
 
-                # Video-Thumbnail setzen
-                video_obj.thumbnail_frame = relative_photo_path
-                video_obj.save()
-
-                # Visit-Deduplication: Ist das eine Fortsetzung eines laufenden Besuchs?
-                species_label = classification['top_prediction']['label']
-                is_new_visit = self._determine_is_new_visit(species_label, timestamp)
-
-                # BirdDetection Entry
-                detection = BirdDetection.objects.create(
-                    timestamp=timestamp,
-                    species=species,
-                    confidence=classification['top_prediction']['confidence'],
-                    top_predictions=classification['top_k_predictions'],
-                    photo=photo_obj,
-                    video=video_obj,
-                    pir_event=pir_event,
-                    processed=True,
-                    processing_time_ms=classification['processing_time_ms'],
-                    is_new_visit=is_new_visit,
+        # Dashboard (SSE) sofort informieren
+        try:
+            from services.live_events import detection_event, publish_event
+            publish_event('detection', detection_event(detection))
+        except Exception as e:
+            logger.warning(f"Could not publish live event: {e}")
+
+        # Home Assistant benachrichtigen
+        try:
+            from homeassistant.mqtt_client import get_mqtt_client
+            mqtt = get_mqtt_client()
+
+            if mqtt.is_connected:
+                mqtt.publish_bird_detected(detection)
+                logger.info("Home Assistant notified")
+        except Exception as e:
+            logger.error(f"Failed to notify Home Assistant: {e}")
+
+        logger.info("Bird detection workflow completed successfully")
+
+    def _score_candidate_frames(self, camera, video_path, actual_duration):
+        """
+        Streamt Kandidaten-Frames, filtert per Bird Detector und klassifiziert sie.
+
+        Mit CLASSIFIER_CASCADE_ENABLED klassifiziert der Classifier nur den
+        Bbox-Crop des Detectors (Frames ohne Vogel-Bbox werden nicht klassifiziert).
+        Die EarlyExitPolicy beendet das Scoring vorzeitig (stabile Art über K
+        Frames oder Zeitbudget erschöpft); restliche Frames werden nicht dekodiert.
+        Besteht kein Frame den Detector-Filter, wird das Video ein zweites Mal
+        dekodiert und jedes Frame klassifiziert (Fallback: Species Classifier entscheidet).
+
+        Args:
+            camera: Camera-Instanz (iter_candidate_frames)
+            video_path: Pfad zum aufgenommenen MP4
+            actual_duration: Aufnahmedauer in Sekunden
+
+        Returns:
+            dict mit 'classification', 'best_frame' (RGB-Array-Kopie oder None),
+            'best_index', 'best_confidence', 'processing_time_ms', 'frames_total',
+            'frames_passed', 'frames_scored', 'frames_skipped', 'stop_reason',
+            'metadata' (für BirdDetection.scoring_metadata)
+        """
+        from hardware.frame_stream import candidate_frame_rate
+
+        bird_detector, cascade = self._frame_filter()
+        policy = EarlyExitPolicy.from_settings()
+
+        frames = camera.iter_candidate_frames(video_path, actual_duration=actual_duration)
+        scored = self._classify_frames(frames, bird_detector, policy, cascade)
+
+        if bird_detector is not None and scored['frames_total'] > 0:
+            if scored['frames_passed']:
+                logger.info(
+                    f"Bird detector: {scored['frames_passed']}/{scored['frames_total']} frames passed "
+                    f"(coverage + ROI filter)"
                 )
+            elif scored['stop_reason'] == EarlyExitPolicy.LATENCY_BUDGET:
+                logger.info(f"Bird detector: 0/{scored['frames_total']} frames passed – latency budget exhausted")
+            elif cascade:
+                # Kaskade: ohne Vogel-Bbox kein Classifier-Lauf (kein Vollbild-Fallback)
+                logger.info(f"Bird detector: 0/{scored['frames_total']} frames passed – cascade skips classifier")
+            else:
+                logger.info(
+                    f"Bird detector: 0/{scored['frames_total']} frames passed – "
+                    f"using all frames as fallback (species classifier decides)"
+                )
+                policy.reset_streak()
+                frames = camera.iter_candidate_frames(video_path, actual_duration=actual_duration)
+                scored = self._classify_frames(frames, None, policy)
 
-                visit_label = "neuer Besuch" if is_new_visit else "Fortsetzung Besuch"
-                logger.info(f"Detection saved: {species.common_name_de} [{visit_label}]")
+        # Übersprungene Frames = nie dekodiert wegen Early Exit
+        frames_expected = candidate_frame_rate(actual_duration)[0]
+        scored['frames_skipped'] = max(0, frames_expected - scored['frames_total'])
 
-                # Statistiken aktualisieren (zählt nur is_new_visit=True)
-                DailyStatistics.update_for_date(timestamp.date(), species)
-                logger.info("Statistics updated")
+        if scored['stop_reason'] != EarlyExitPolicy.COMPLETED:
+            logger.info(
+                f"Early exit ({scored['stop_reason']}): scored {scored['frames_scored']}/{frames_expected} "
+                f"frames, skipped {scored['frames_skipped']}"
+            )
 
-                # Home Assistant benachrichtigen
-                try:
-                    from homeassistant.mqtt_client import get_mqtt_client
-                    mqtt = get_mqtt_client()
+        scored['metadata'] = self._scoring_metadata(scored, policy, cascade, frames_expected=frames_expected)
+        return scored
+
+    def _frame_filter(self):
+        """
+        Returns:
+            tuple: (bird_detector oder None wenn deaktiviert, cascade)
+        """
+        bird_detector = self.bird_detector
+        use_detector = (
+            bird_detector is not None
+            and bird_detector.is_initialized
+            and settings.BIRDY_SETTINGS.get('BIRD_DETECTOR_ENABLED', True)
+        )
+        cascade = use_detector and settings.BIRDY_SETTINGS.get('CLASSIFIER_CASCADE_ENABLED', False)
+        return (bird_detector if use_detector else None), cascade
+
+    def _scoring_metadata(self, scored, policy, cascade, **extra):
+        """Frame-Zähler und Abbruchgrund für BirdDetection.scoring_metadata"""
+        metadata = {
+            'frames_decoded': scored['frames_total'],
+            'frames_passed': scored['frames_passed'],
+            'frames_scored': scored['frames_scored'],
+            'frames_skipped': scored['frames_skipped'],
+            'stop_reason': scored['stop_reason'],
+            'best_frame_index': scored['best_index'],
+            'cascade': cascade,
+            'early_exit': policy.as_dict(),
+        }
+        metadata.update(extra)
+        return metadata
+
+    def _start_pipeline(self, camera):
+        """
+        Starte die Streaming-Pipeline für diesen Besuch, falls aktiviert und möglich.
+
+        Returns:
+            DetectionPipeline oder None (→ klassischer Ablauf nach der Aufnahme)
+        """
+        if not settings.BIRDY_SETTINGS.get('DETECTION_PIPELINE_ENABLED', False):
+            return None
+        if not getattr(camera, 'supports_frame_tap', False):
+            logger.debug("Detection pipeline needs a camera with frame tap (CAMERA_RECORDING_MODE='ringbuffer')")
+            return None
+        if not self.classifier or not self.classifier.is_initialized:
+            return None
+
+        from services.detection_pipeline import DetectionPipeline
+
+        bird_detector, cascade = self._frame_filter()
+        pipeline = DetectionPipeline(
+            self,
+            bird_detector=bird_detector,
+            policy=EarlyExitPolicy.from_settings(),
+            cascade=cascade,
+            on_provisional=self._publish_provisional,
+        )
+        self._active_pipeline = pipeline
+        return pipeline
 
-                    if mqtt.is_connected:
-                        mqtt.publish_bird_detected(detection)
-                        logger.info("Home Assistant notified")
-                except Exception as e:
-                    logger.error(f"Failed to notify Home Assistant: {e}")
+    def _finish_pipeline(self, pipeline, camera, video_path, actual_duration):
+        """
+        Endergebnis der Pipeline nach Aufnahme-Ende (Format wie _score_candidate_frames).
 
-                logger.info("Bird detection workflow completed successfully")
+        Kamen keine Live-Frames an, wird das Video klassisch ausgewertet; hat der
+        Detector alle Frames verworfen (ohne Kaskade), entscheidet wie im
+        klassischen Ablauf der Classifier über alle Frames des Videos.
+        """
+        scored = pipeline.finish()
+        self._active_pipeline = None
+
+        if scored['frames_total'] == 0:
+            logger.warning("Detection pipeline received no live frames – scoring recorded video instead")
+            return self._score_candidate_frames(camera, video_path, actual_duration)
+
+        policy = pipeline.policy
+        if (
+            pipeline.bird_detector is not None
+            and not pipeline.cascade
+            and scored['frames_passed'] == 0
+            and scored['stop_reason'] != EarlyExitPolicy.LATENCY_BUDGET
+        ):
+            logger.info(
+                f"Bird detector: 0/{scored['frames_total']} live frames passed – "
+                f"classifying recorded video as fallback"
+            )
+            policy.reset_streak()
+            fallback = self._classify_frames(
+                camera.iter_candidate_frames(video_path, actual_duration=actual_duration), None, policy
+            )
+            fallback['pipeline'] = scored['pipeline']
+            fallback['frames_skipped'] = 0
+            scored = fallback
+
+        scored['metadata'] = self._scoring_metadata(
+            scored, policy, pipeline.cascade, mode='pipeline', pipeline=scored['pipeline']
+        )
+        return scored
+
+    def _publish_provisional(self, provisional):
+        """Vorläufige Art an Dashboard und Home Assistant melden (während die Aufnahme noch läuft)"""
+        from services.live_events import publish_event
+        publish_event('provisional', {
+            'species': provisional['label'],
+            'confidence': round(provisional['confidence'], 4),
+        })
+
+        try:
+            from homeassistant.mqtt_client import get_mqtt_client
+            mqtt = get_mqtt_client()
+
+            if mqtt.is_connected:
+                mqtt.publish_provisional_species(provisional['label'], provisional['confidence'])
+        except Exception as e:
+            logger.error(f"Failed to publish provisional species: {e}")
+
+    def get_pipeline_status(self):
+        """Queue-Tiefen/Lag der laufenden Detection Pipeline (None wenn keine aktiv)"""
+        pipeline = self._active_pipeline
+        return pipeline.status() if pipeline is not None else None
+
+    def score_frames(self, frames, bird_detector=None, policy=None, cascade=False):
+        """
+        Frame-Stream bewerten wie bei einer Detection (für Benchmarks und Auswertungen).
 
-            except Exception as e:
-                logger.error(f"Error in detection workflow: {e}", exc_info=True)
+        Args:
+            frames: Iterable von RGB-Arrays (z.B. hardware.frame_stream.iter_video_frames)
+            bird_detector: Optionaler BirdSizeDetector als Vorfilter
+            policy: Optionale EarlyExitPolicy
+            cascade: Classifier auf dem Bbox-Crop statt auf dem vollen Frame (braucht bird_detector)
+
+        Returns:
+            dict (siehe _score_candidate_frames)
+        """
+        return self._classify_frames(frames, bird_detector, policy, cascade)
+
+    def _classify_frames(self, frames, bird_detector=None, policy=None, cascade=False):
+        """
+        Klassifiziere einen Frame-Stream und merke das Frame mit höchster Konfidenz.
+
+        Frames werden in Gruppen von CLASSIFIER_BATCH_SIZE × Pool-Grösse gesammelt;
+        Detector und classify_batch() verteilen jede Gruppe parallel auf die
+        Interpreter ihres Pools (ML_INTERPRETER_POOL_SIZE). Nach jeder Gruppe
+        prüft die EarlyExitPolicy, ob der Stream abgebrochen werden kann – bei
+        aktiver Streak-Regel sind Gruppen daher höchstens K Frames gross (mindestens
+        ein Frame pro Interpreter).
+
+        Args:
+            frames: Iterable von RGB-Arrays (Buffer dürfen wiederverwendet werden)
+            bird_detector: Optionaler BirdSizeDetector – Frames ohne gültigen Vogel überspringen
+            policy: Optionale EarlyExitPolicy
+            cascade: Classifier auf dem Bbox-Crop statt auf dem vollen Frame (braucht bird_detector)
+
+        Returns:
+            dict (siehe _score_candidate_frames)
+        """
+        s = settings.BIRDY_SETTINGS
+        batch_size = max(1, s.get('CLASSIFIER_BATCH_SIZE', 8))
+        pool_size = max(1, s.get('ML_INTERPRETER_POOL_SIZE', 1))
+        group_size = batch_size * pool_size
+        if policy is not None and policy.consecutive_frames:
+            group_size = min(group_size, max(policy.consecutive_frames, pool_size))
+
+        scored = {
+            'classification': None,
+            'best_frame': None,
+            'best_index': None,
+            'best_confidence': -1.0,
+            'processing_time_ms': 0,
+            'frames_total': 0,
+            'frames_passed': 0,
+            'frames_scored': 0,
+            'stop_reason': None,
+        }
+
+        pending = []  # [(frame_index, frame_copy)]
+        for i, frame in enumerate(frames):
+            scored['frames_total'] += 1
+
+            pending.append((i, frame.copy()))  # Buffer wird vom Stream wiederverwendet
+            if len(pending) >= group_size:
+                self._score_group(pending, scored, bird_detector, policy, cascade)
+                pending = []
+
+                if scored['stop_reason'] is None and policy is not None and policy.budget_exceeded():
+                    scored['stop_reason'] = EarlyExitPolicy.LATENCY_BUDGET
+                if scored['stop_reason'] is not None:
+                    break
+
+        if pending:
+            self._score_group(pending, scored, bird_detector, policy, cascade)
+
+        # Generator sofort schliessen → ffmpeg wird beendet statt weiter zu dekodieren
+        close = getattr(frames, 'close', None)
+        if close is not None:
+            close()
+
+        if scored['stop_reason'] is None:
+            scored['stop_reason'] = EarlyExitPolicy.COMPLETED
+
+        return scored
+
+    def _score_group(self, pending, scored, bird_detector=None, policy=None, cascade=False):
+        """
+        Filtere gesammelte Frames per Detector (parallel) und klassifiziere den Rest.
+
+        Im Kaskaden-Modus klassifiziert der Classifier nur den Bbox-Crop des
+        Detectors; das volle Frame bleibt als Foto-Kandidat erhalten.
+        """
+        from ml_models.frame import DecodedFrame
+
+        # Ein DecodedFrame pro Frame: Detector und Classifier teilen Konvertierung und Resize-Cache
+        frames = [DecodedFrame(array=frame) for _, frame in pending]
+
+        if bird_detector is not None and cascade:
+            from ml_models.bird_detector import crop_to_detection
+
+            margin = settings.BIRDY_SETTINGS.get('CASCADE_CROP_MARGIN', 0.25)
+            detections = bird_detector.valid_bird_detections(frames)
+            items = [
+                (i, frame, crop_to_detection(frame, detection['bbox'], margin))
+                for (i, frame), detection in zip(pending, detections)
+                if detection is not None
+            ]
+        elif bird_detector is not None:
+            passed = bird_detector.is_valid_bird_frames(frames)
+            items = [
+                (i, frame, decoded)
+                for (i, frame), decoded, ok in zip(pending, frames, passed) if ok
+            ]
+        else:
+            items = [(i, frame, decoded) for (i, frame), decoded in zip(pending, frames)]
+
+        scored['frames_passed'] += len(items)
+        if items:
+            self._score_batch(items, scored, policy)
+
+    def _score_batch(self, items, scored, policy=None):
+        """
+        Klassifiziere gesammelte Frames und aktualisiere bestes Frame in scored.
+
+        Args:
+            items: [(frame_index, frame, classifier_input)] – classifier_input ist
+                   das DecodedFrame des Frames oder (Kaskade) der Bbox-Crop daraus
+        """
+        ignored_species = settings.BIRDY_SETTINGS.get('IGNORED_SPECIES', set())
+
+        batch = self.classifier.classify_batch([model_input for _, _, model_input in items], top_k=5)
+        if not batch:
+            return
+
+        scored['processing_time_ms'] += batch['processing_time_ms']
+        scored['frames_scored'] += len(items)
+
+        for (i, frame, _), result in zip(items, batch['results']):
+            if not result:
+                if policy is not None:
+                    policy.reset_streak()
+                continue
+
+            top_pred = result['top_prediction']
+            confidence = top_pred['confidence']
+            is_background = (
+                top_pred['label'].lower() == 'background'
+                or top_pred['label'] in ignored_species
+            )
+
+            logger.debug(
+                f"Frame {i+1}: "
+                f"{top_pred['label']} ({confidence:.1%})"
+                + (" [ignored]" if top_pred['label'] in ignored_species else "")
+                + (" [background]" if top_pred['label'].lower() == 'background' else "")
+            )
+
+            if policy is not None and scored['stop_reason'] is None:
+                scored['stop_reason'] = policy.observe(top_pred['label'], confidence, is_background)
+
+            if not is_background and confidence > scored['best_confidence']:
+                scored['best_confidence'] = confidence
+                scored['best_frame'] = frame
+                scored['best_index'] = i
+                scored['classification'] = result
 
     def _determine_is_new_visit(self, species_label, timestamp):
         """
@@ -361,7 +868,7 @@ def process_bird_detection(pir_event_id):
 
 
 # Service Instance
-def get_detection_service(camera=None, classifier=None, pir_sensor=None, bird_detector=None):
+def get_detection_service(camera=None, classifier=None, pir_sensor=None, bird_detector=None, landing_detector=None):
     """
     Hole Detection Service Instance
 
@@ -370,6 +877,7 @@ def get_detection_service(camera=None, classifier=None, pir_sensor=None, bird_de
         classifier: Classifier-Instanz (von start_birdy übergeben)
         pir_sensor: PIRSensorController-Instanz (für PIR-basierte Aufnahmedauer)
         bird_detector: BirdSizeDetector-Instanz (für Coverage + ROI Filter)
+        landing_detector: LandingDetector-Instanz (Weight Gate + geschätzte Masse)
 
     Returns:
         BirdDetectionService mit Hardware-Referenzen
@@ -379,4 +887,5 @@ def get_detection_service(camera=None, classifier=None, pir_sensor=None, bird_de
         classifier=classifier,
         pir_sensor=pir_sensor,
         bird_detector=bird_detector,
+        landing_detector=landing_detector,
     )
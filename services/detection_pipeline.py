@@ -0,0 +1,314 @@
+"""
+Detection Pipeline - Frames schon während der Aufnahme detektieren und klassifizieren
+Live-Frames aus dem Camera Worker laufen durch zwei Stufen (Bird Detector →
+Species Classifier) in eigenen Threads, verbunden über begrenzte Queues.
+"""
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger('birdy')
+
+_SENTINEL = None
+
+
+class StageStats:
+    """Queue-Tiefe und Lag (Aufnahme-Zeitpunkt → Stufe fertig) einer Pipeline-Stufe"""
+
+    def __init__(self, name, stage_queue):
+        self.name = name
+        self.queue = stage_queue
+        self.max_depth = 0
+        self.processed = 0
+        self.dropped = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+
+    def record_depth(self):
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def record_done(self, captured_at):
+        lag = time.time() - captured_at
+        self.processed += 1
+        self.lag_total += lag
+        self.lag_max = max(self.lag_max, lag)
+
+    def as_dict(self):
+        return {
+            'depth': self.queue.qsize(),
+            'max_depth': self.max_depth,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'lag_avg_ms': int(self.lag_total / self.processed * 1000) if self.processed else None,
+            'lag_max_ms': int(self.lag_max * 1000),
+        }
+
+
+class DetectionPipeline:
+    """
+    Streaming-Pipeline für einen Besuch.
+
+    submit() wird vom Frame-Tap der Kamera aufgerufen (Reader-Thread) und darf
+    nie blockieren: ist die Detector-Queue voll, wird das älteste Frame verworfen.
+    Der Classifier-Thread fasst alle wartenden Frames zu einem classify_batch()
+    zusammen und aktualisiert das beste Frame sowie die vorläufige Art
+    (provisional), die bei jedem Wechsel an on_provisional() gemeldet wird.
+    finish() wartet nach Aufnahme-Ende nur noch auf die restlichen Frames.
+    """
+
+    def __init__(self, service, bird_detector=None, policy=None, cascade=False, on_provisional=None):
+        self.service = service
+        self.bird_detector = bird_detector
+        self.policy = policy
+        self.cascade = cascade
+        self.on_provisional = on_provisional
+
+        s = settings.BIRDY_SETTINGS
+        queue_size = s.get('DETECTION_PIPELINE_QUEUE_SIZE', 8)
+        self.batch_size = max(1, s.get('CLASSIFIER_BATCH_SIZE', 8))
+
+        self.detect_queue = queue.Queue(maxsize=queue_size)
+        self.classify_queue = queue.Queue(maxsize=queue_size)
+        self.detect_stats = StageStats('detect', self.detect_queue)
+        self.classify_stats = StageStats('classify', self.classify_queue)
+
+        self.scored = {
+            'classification': None,
+            'best_frame': None,
+            'best_index': None,
+            'best_confidence': -1.0,
+            'processing_time_ms': 0,
+            'frames_total': 0,
+            'frames_passed': 0,
+            'frames_scored': 0,
+            'frames_skipped': 0,  # nach Early Exit eingetroffen oder wegen voller Queue verworfen
+            'stop_reason': None,
+        }
+        self.provisional = None  # {'label', 'confidence', 'frame_index', 'at'}
+        self._lock = threading.Lock()  # schützt scored/provisional/_dropped (Classifier-Thread vs. status())
+
+        # Verworfene Frame-Indizes (volle Queue hier oder im Camera Worker): die Early-Exit
+        # Streak darf nur über zeitlich lückenlose Frames zählen
+        self._dropped = []
+        self._last_submitted = None
+        self._last_classified = None
+
+        self._threads = [
+            threading.Thread(target=self._detect_loop, daemon=True, name="Pipeline-Detect"),
+            threading.Thread(target=self._classify_loop, daemon=True, name="Pipeline-Classify"),
+        ]
+        self._started_at = time.time()
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, index, captured_at, frame):
+        """Live-Frame einspeisen (Callback für record_video_dynamic(on_frame=...))"""
+        with self._lock:
+            self.scored['frames_total'] += 1
+            stopped = self.scored['stop_reason'] is not None
+            if stopped:
+                self.scored['frames_skipped'] += 1
+
+        if stopped:
+            return  # Early Exit erreicht – restliche Frames nicht mehr bewerten
+
+        if self._last_submitted is not None and index > self._last_submitted + 1:
+            # Lücke im Frame-Tap: Worker hat Frames verworfen
+            with self._lock:
+                self._dropped.append(self._last_submitted + 1)
+        self._last_submitted = index
+
+        item = (index, captured_at, frame)
+        while True:
+            try:
+                self.detect_queue.put_nowait(item)
+                break
+            except queue.Full:
+                try:
+                    dropped = self.detect_queue.get_nowait()  # ältestes Frame verwerfen
+                    self.detect_stats.dropped += 1
+                    with self._lock:
+                        self._dropped.append(dropped[0])
+                except queue.Empty:
+                    pass
+        self.detect_stats.record_depth()
+
+    def _detect_loop(self):
+        from ml_models.bird_detector import crop_to_detection
+        from ml_models.frame import DecodedFrame
+
+        margin = settings.BIRDY_SETTINGS.get('CASCADE_CROP_MARGIN', 0.25)
+
+        while True:
+            item = self.detect_queue.get()
+            if item is _SENTINEL:
+                self.classify_queue.put(_SENTINEL)
+                return
+
+            index, captured_at, frame = item
+            if self.scored['stop_reason'] is not None:
+                with self._lock:
+                    self.scored['frames_skipped'] += 1
+                continue
+
+            decoded = DecodedFrame(array=frame)
+            model_input = decoded
+
+            if self.bird_detector is not None:
+                detection = self.bird_detector.valid_bird_detection(decoded)
+                if detection is None:
+                    self.detect_stats.record_done(captured_at)
+                    continue
+                if self.cascade:
+                    model_input = crop_to_detection(frame, detection['bbox'], margin)
+
+            self.detect_stats.record_done(captured_at)
+            self.classify_queue.put((index, captured_at, frame, model_input))
+            self.classify_stats.record_depth()
+
+    def _classify_loop(self):
+        while True:
+            batch = [self.classify_queue.get()]
+            # Alles was schon wartet in denselben Batch (ohne auf weitere Frames zu warten)
+            while batch[-1] is not _SENTINEL and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.classify_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            done = batch[-1] is _SENTINEL
+            items = [item for item in batch if item is not _SENTINEL]
+
+            if items:
+                self._classify_items(items)
+
+            if done:
+                return
+
+    def _has_gap(self, index):
+        """Wurde zwischen dem zuletzt klassifizierten Frame und index ein Frame verworfen?"""
+        if self._last_classified is None:
+            return False
+        with self._lock:
+            return any(self._last_classified < dropped < index for dropped in self._dropped)
+
+    def _split_at_gaps(self, items):
+        """Batch in zeitlich lückenlose Abschnitte teilen → [(gap_before, items)]"""
+        segments = []
+        for item in items:
+            index = item[0]
+            gap = self._has_gap(index)
+            if gap or not segments:
+                segments.append((gap, []))
+            segments[-1][1].append(item)
+            self._last_classified = index
+        return segments
+
+    def _classify_items(self, items):
+        from services.bird_detection import EarlyExitPolicy
+
+        with self._lock:
+            if self.scored['stop_reason'] is None and self.policy is not None and self.policy.budget_exceeded():
+                self.scored['stop_reason'] = EarlyExitPolicy.LATENCY_BUDGET
+            stopped = self.scored['stop_reason'] is not None
+            if stopped:
+                self.scored['frames_skipped'] += len(items)
+        if stopped:
+            return
+
+        scored = dict(self.scored)
+        skipped = 0
+        for gap, segment in self._split_at_gaps(items):
+            if gap and self.policy is not None:
+                self.policy.reset_streak()
+            if scored['stop_reason'] is not None:
+                skipped += len(segment)  # Early Exit mitten im Batch
+                continue
+            self.service._score_batch(
+                [(index, frame, model_input) for index, _, frame, model_input in segment], scored, self.policy
+            )
+        for _, captured_at, _, _ in items:
+            self.classify_stats.record_done(captured_at)
+
+        with self._lock:
+            # frames_total/frames_skipped zählen submit() und Detector-Thread parallel hoch
+            concurrent = {key: self.scored[key] for key in ('frames_total', 'frames_skipped')}
+            self.scored.update(scored)
+            self.scored.update(concurrent)
+            self.scored['frames_skipped'] += skipped
+            self.scored['frames_passed'] += len(items)
+
+            result = scored['classification']
+            if result is None:
+                return
+            label = result['top_prediction']['label']
+            changed = self.provisional is None or self.provisional['label'] != label
+            self.provisional = {
+                'label': label,
+                'confidence': scored['best_confidence'],
+                'frame_index': scored['best_index'],
+                'at': time.time() - self._started_at,
+            }
+
+        if changed:
+            logger.info(
+                f"Provisional species: {label} ({scored['best_confidence']:.1%}) "
+                f"after {self.provisional['at']:.1f}s"
+            )
+            if self.on_provisional is not None:
+                try:
+                    self.on_provisional(dict(self.provisional))
+                except Exception as e:
+                    logger.error(f"Provisional species callback failed: {e}")
+
+    def finish(self, timeout=None):
+        """
+        Aufnahme beendet: restliche Frames abarbeiten und Endergebnis liefern.
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden (DETECTION_PIPELINE_FINISH_TIMEOUT)
+
+        Returns:
+            dict wie BirdDetectionService.score_frames(), zusätzlich 'pipeline' (status())
+        """
+        if timeout is None:
+            timeout = settings.BIRDY_SETTINGS.get('DETECTION_PIPELINE_FINISH_TIMEOUT', 5)
+
+        finish_start = time.time()
+        self.detect_queue.put(_SENTINEL)
+        deadline = finish_start + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.time()))
+
+        finish_ms = int((time.time() - finish_start) * 1000)
+        if any(thread.is_alive() for thread in self._threads):
+            logger.warning(f"Detection pipeline did not drain within {timeout}s – using partial result")
+
+        with self._lock:
+            scored = dict(self.scored)
+        scored['frames_skipped'] += self.detect_stats.dropped
+        if scored['stop_reason'] is None:
+            from services.bird_detection import EarlyExitPolicy
+            scored['stop_reason'] = EarlyExitPolicy.COMPLETED
+
+        scored['pipeline'] = self.status()
+        scored['pipeline']['finish_ms'] = finish_ms
+        logger.info(
+            f"Detection pipeline finished {finish_ms}ms after recording stop: "
+            f"{scored['frames_scored']}/{scored['frames_total']} frames scored, "
+            f"detect={scored['pipeline']['detect']}, classify={scored['pipeline']['classify']}"
+        )
+        return scored
+
+    def status(self):
+        """Queue-Tiefen, Lag und vorläufige Art (für Logs, Metadaten und Tuning)"""
+        with self._lock:
+            provisional = dict(self.provisional) if self.provisional else None
+        return {
+            'detect': self.detect_stats.as_dict(),
+            'classify': self.classify_stats.as_dict(),
+            'provisional': provisional,
+        }
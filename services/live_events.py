@@ -0,0 +1,188 @@
+"""
+Live Events - Push-Kanal für Dashboard und Home Assistant (Server-Sent Events)
+Detection-Service und Main Loop publizieren über Redis Pub/Sub; der ASGI-Prozess
+hält pro Event Loop genau ein Redis-Abo und verteilt jedes Event an alle SSE-Clients.
+"""
+import asyncio
+import json
+import logging
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger('birdy')
+
+DEFAULT_CHANNEL = 'birdy:events'
+
+
+def _redis_url():
+    return settings.BIRDY_SETTINGS.get('LIVE_EVENTS_REDIS_URL') or settings.CELERY_BROKER_URL
+
+
+def _channel():
+    return settings.BIRDY_SETTINGS.get('LIVE_EVENTS_CHANNEL', DEFAULT_CHANNEL)
+
+
+class LiveEventPublisher:
+    """
+    Synchroner Publisher (Detection-Service, Main Loop).
+
+    publish() blockiert höchstens ein lokales Redis PUBLISH (< 1 ms) und wirft nie:
+    ohne Redis gehen Live-Events verloren, die Detection läuft normal weiter.
+    """
+
+    def __init__(self, redis_url=None, channel=None):
+        self.redis_url = redis_url or _redis_url()
+        self.channel = channel or _channel()
+        self._client = None
+        self._last = {}          # event_type → letzter Payload (für publish(..., only_changes=True))
+        self._failing = False
+        self.published = 0
+
+    def _get_client(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._client
+
+    def publish(self, event_type, data, only_changes=False):
+        """
+        Args:
+            event_type: 'detection', 'provisional', 'weight', 'sensor_status', ...
+            data: JSON-serialisierbares dict
+            only_changes: Nicht publizieren, wenn data gleich dem letzten Event dieses Typs ist
+        """
+        if not settings.BIRDY_SETTINGS.get('LIVE_EVENTS_ENABLED', False):
+            return
+        if only_changes and self._last.get(event_type) == data:
+            return
+        self._last[event_type] = data
+
+        message = json.dumps({'type': event_type, 'data': data, 'ts': time.time()}, default=str)
+        try:
+            self._get_client().publish(self.channel, message)
+            self.published += 1
+            if self._failing:
+                logger.info("Live events: Redis reachable again")
+                self._failing = False
+        except Exception as e:
+            if not self._failing:
+                logger.warning(f"Live events: publish failed ({e}) – events are dropped until Redis is back")
+                self._failing = True
+
+
+# Singleton Instance
+_publisher_instance = None
+
+
+def get_event_publisher():
+    """Hole Singleton Instance des Live Event Publishers"""
+    global _publisher_instance
+    if _publisher_instance is None:
+        _publisher_instance = LiveEventPublisher()
+    return _publisher_instance
+
+
+def publish_event(event_type, data, only_changes=False):
+    """Kurzform für get_event_publisher().publish()"""
+    get_event_publisher().publish(event_type, data, only_changes=only_changes)
+
+
+def detection_event(detection):
+    """Payload für ein 'detection' Event (alles, was das Dashboard für eine neue Karte braucht)"""
+    photo = detection.photo
+    video = detection.video
+    return {
+        'id': detection.id,
+        'species': detection.species.common_name_de if detection.species else None,
+        'scientific_name': detection.species.scientific_name if detection.species else None,
+        'confidence': round(detection.confidence, 4),
+        'timestamp': detection.timestamp.isoformat(),
+        'is_new_visit': detection.is_new_visit,
+        'photo_url': photo.file_url if photo else None,
+        'thumbnail_url': photo.thumbnail_url(320) if photo else None,
+        'video_url': video.file_url if video else None,
+    }
+
+
+class EventHub:
+    """
+    Fan-out im ASGI-Prozess: ein Redis-Abo, eine Queue pro SSE-Client.
+
+    Idle Clients kosten nur ihre wartende Queue (kein Polling, kein eigenes Redis-Abo).
+    Jedes Event wird einmal als SSE-Frame formatiert und an alle Queues verteilt;
+    langsame Clients verlieren die ältesten Events statt den Hub zu blockieren.
+    """
+
+    def __init__(self, redis_url=None, channel=None, queue_size=100):
+        self.redis_url = redis_url or _redis_url()
+        self.channel = channel or _channel()
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._task = None
+        self._event_id = 0
+
+    def subscribe(self):
+        """Neue Client-Queue (startet das Redis-Abo beim ersten Client)"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    async def _listen(self):
+        import redis.asyncio as aioredis
+
+        while True:
+            client = aioredis.Redis.from_url(self.redis_url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    logger.info(f"Live events: subscribed to {self.channel}")
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            self._broadcast(message['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Live events: Redis subscription lost ({e}), retrying in 2s")
+                await asyncio.sleep(2)
+            finally:
+                await client.aclose()
+
+    def _broadcast(self, raw):
+        try:
+            event = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        self._event_id += 1
+        frame = (
+            f"id: {self._event_id}\n"
+            f"event: {event.get('type', 'message')}\n"
+            f"data: {json.dumps(event.get('data'))}\n\n"
+        )
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()  # Ältestes Event verwerfen
+            queue.put_nowait(frame)
+
+
+# Ein Hub pro Event Loop (uvicorn: einer pro Worker-Prozess)
+_hubs = {}
+
+
+def get_event_hub():
+    """Hub des laufenden Event Loops"""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = EventHub()
+    return hub
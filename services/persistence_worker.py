@@ -0,0 +1,113 @@
+"""
+Persistence Worker - DB-, Media- und MQTT-Arbeit ausserhalb des Capture-Pfads
+process_detection() reicht gültige Besuche über eine begrenzte Queue weiter,
+damit _recording_lock direkt nach der Klassifikation wieder frei ist.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger('birdy')
+
+_SENTINEL = None
+
+
+class PersistenceWorker:
+    """
+    Ein Worker-Thread, der Jobs der Reihe nach an handler(job) übergibt.
+
+    Die Queue ist begrenzt: ist sie voll, blockiert submit() (Backpressure auf
+    den Capture-Pfad statt unbegrenzt wachsendem Speicher für beste Frames).
+    Fehler im Handler werden geloggt und gezählt, der Thread läuft weiter.
+    """
+
+    def __init__(self, handler, maxsize=16, name="Persistence-Worker"):
+        self.handler = handler
+        self.queue = queue.Queue(maxsize=maxsize)
+
+        self.max_depth = 0
+        self.processed = 0
+        self.failed = 0
+        self.blocked = 0                 # submit() musste auf freien Platz warten
+        self.last_duration_ms = None
+        self._enqueued_at = deque()      # Enqueue-Zeitpunkte wartender Jobs (für Backlog-Alter)
+        self._lock = threading.Lock()
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name=name)
+        self._thread.start()
+
+    def submit(self, job):
+        """
+        Job einreihen.
+
+        Args:
+            job: Beliebiges Objekt, wird unverändert an handler() übergeben
+        """
+        with self._lock:
+            self._enqueued_at.append(time.time())
+
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            self.blocked += 1
+            logger.warning(f"Persistence queue full ({self.queue.maxsize}) – capture path waits for worker")
+            self.queue.put(job)
+
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        while True:
+            job = self.queue.get()
+            if job is _SENTINEL:
+                return
+
+            with self._lock:
+                if self._enqueued_at:
+                    self._enqueued_at.popleft()
+
+            start = time.time()
+            try:
+                self.handler(job)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Persistence job failed: {e}", exc_info=True)
+            finally:
+                self.last_duration_ms = int((time.time() - start) * 1000)
+                # Langlebiger Thread – abgelaufene DB-Verbindungen wie ein Request-Ende aufräumen
+                close_old_connections()
+
+    def status(self):
+        """Queue-Tiefe, Alter des ältesten wartenden Jobs und Zähler"""
+        with self._lock:
+            oldest = self._enqueued_at[0] if self._enqueued_at else None
+        return {
+            'depth': self.queue.qsize(),
+            'max_depth': self.max_depth,
+            'oldest_age_seconds': round(time.time() - oldest, 1) if oldest is not None else 0.0,
+            'processed': self.processed,
+            'failed': self.failed,
+            'blocked': self.blocked,
+            'last_duration_ms': self.last_duration_ms,
+        }
+
+    def stop(self, timeout=30):
+        """
+        Restliche Jobs abarbeiten und Thread beenden.
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden
+        """
+        if not self._thread.is_alive():
+            return
+        pending = self.queue.qsize()
+        if pending:
+            logger.info(f"Waiting for {pending} pending persistence job(s)...")
+        self.queue.put(_SENTINEL)
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Persistence worker did not finish within {timeout}s")
@@ -0,0 +1,207 @@
+"""
+PIR Event Writer - PIREvents gesammelt im Hintergrund speichern (Write-Behind)
+Der GPIO-Thread legt Events nur in einen begrenzten Ring; ein Writer-Thread
+schreibt sie per bulk_create in Batches (nach Anzahl oder Zeit).
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger('birdy')
+
+
+class PendingPIREvent:
+    """
+    Leichtgewichtiges PIR Event für Callbacks – ohne DB-Roundtrip.
+
+    id ist None, bis der Writer das Event gespeichert hat; wait_for_id()
+    blockiert bis dahin (oder bis das Event verworfen wurde).
+    """
+
+    __slots__ = ('event_type', 'timestamp', 'duration_seconds', 'id', 'queued_at', '_written')
+
+    def __init__(self, event_type, timestamp, duration_seconds=None):
+        self.event_type = event_type
+        self.timestamp = timestamp
+        self.duration_seconds = duration_seconds
+        self.id = None
+        self.queued_at = time.monotonic()
+        self._written = threading.Event()
+
+    def wait_for_id(self, timeout=None):
+        """
+        Args:
+            timeout: Maximale Wartezeit in Sekunden
+
+        Returns:
+            int oder None: DB-ID (None bei Timeout oder verworfenem Event)
+        """
+        self._written.wait(timeout)
+        return self.id
+
+    def __repr__(self):
+        return f"<PendingPIREvent {self.event_type} @ {self.timestamp} id={self.id}>"
+
+
+def resolve_pir_event_id(pir_event, timeout=None):
+    """
+    DB-ID eines PIR Events – akzeptiert IDs, PIREvent- und PendingPIREvent-Instanzen.
+
+    Args:
+        timeout: Maximale Wartezeit auf den Writer (default: PIR_EVENT_FLUSH_SECONDS × 5)
+    """
+    if pir_event is None or isinstance(pir_event, int):
+        return pir_event
+    if isinstance(pir_event, PendingPIREvent):
+        if timeout is None:
+            timeout = settings.BIRDY_SETTINGS.get('PIR_EVENT_FLUSH_SECONDS', 1.0) * 5
+        return pir_event.wait_for_id(timeout)
+    return pir_event.id
+
+
+class PIREventWriter:
+    """
+    Begrenzter Ring + Writer-Thread für PIREvents.
+
+    submit() blockiert nie: ist der Ring voll (z.B. DB länger nicht erreichbar),
+    wird das älteste ungespeicherte Event verworfen. Schlägt bulk_create fehl,
+    bleibt der Batch im Ring und wird nach retry_seconds erneut versucht.
+    """
+
+    def __init__(self, max_events=1000, batch_size=50, flush_seconds=1.0, retry_seconds=5.0):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.retry_seconds = retry_seconds
+
+        self._ring = deque()
+        self.max_events = max_events
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self._running = True
+        self._cond = threading.Condition()
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name="PIR-Event-Writer")
+        self._thread.start()
+
+    def submit(self, event_type, timestamp, duration_seconds=None):
+        """
+        Event einreihen (aus dem GPIO-Thread).
+
+        Returns:
+            PendingPIREvent für die Callbacks
+        """
+        event = PendingPIREvent(event_type, timestamp, duration_seconds)
+        with self._cond:
+            if len(self._ring) >= self.max_events:
+                dropped = self._ring.popleft()
+                dropped._written.set()  # Wartende nicht hängen lassen (id bleibt None)
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    logger.warning(f"PIR event buffer full ({self.max_events}) – {self.dropped} event(s) dropped")
+            self._ring.append(event)
+            # Erstes Event startet den Flush-Timer, voller Batch wird sofort geschrieben
+            if len(self._ring) == 1 or len(self._ring) >= self.batch_size:
+                self._cond.notify()
+        return event
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        from sensors.models import PIREvent
+
+        while True:
+            with self._cond:
+                # Warten bis ein Batch voll ist oder das älteste Event flush_seconds alt ist
+                while self._running and len(self._ring) < self.batch_size:
+                    if not self._ring:
+                        self._cond.wait()
+                        continue
+                    remaining = self.flush_seconds - (time.monotonic() - self._ring[0].queued_at)
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(timeout=remaining)
+                if not self._ring and not self._running:
+                    return
+                batch = [self._ring.popleft() for _ in range(min(self.batch_size, len(self._ring)))]
+
+            if not batch:
+                continue
+
+            # Langlebiger Thread – abgelaufene DB-Verbindungen wie ein Request-Ende aufräumen
+            close_old_connections()
+            try:
+                rows = PIREvent.objects.bulk_create([
+                    PIREvent(
+                        timestamp=event.timestamp,
+                        event_type=event.event_type,
+                        duration_seconds=event.duration_seconds,
+                    )
+                    for event in batch
+                ])
+            except Exception as e:
+                self.failed_batches += 1
+                logger.error(f"Failed to write {len(batch)} PIR event(s): {e}")
+                with self._cond:
+                    # Batch zurück an den Anfang (Ring-Grenze gilt weiterhin)
+                    for event in reversed(batch):
+                        if len(self._ring) >= self.max_events:
+                            event._written.set()
+                            self.dropped += 1
+                        else:
+                            self._ring.appendleft(event)
+                    if not self._running:
+                        return
+                    self._cond.wait(timeout=self.retry_seconds)
+                continue
+
+            for event, row in zip(batch, rows):
+                event.id = row.pk
+                event._written.set()
+            self.written += len(batch)
+
+    def status(self):
+        """Ring-Füllstand und Zähler"""
+        with self._cond:
+            pending = len(self._ring)
+        return {
+            'pending': pending,
+            'max_events': self.max_events,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed_batches': self.failed_batches,
+        }
+
+    def stop(self, timeout=5):
+        """
+        Ausstehende Events noch schreiben und Writer beenden.
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            logger.warning(f"PIR event writer did not finish within {timeout}s ({len(self._ring)} pending)")
+
+
+# Singleton Instance
+_writer_instance = None
+
+
+def get_pir_event_writer():
+    """Hole Singleton Instance des PIR Event Writers"""
+    global _writer_instance
+    if _writer_instance is None:
+        s = settings.BIRDY_SETTINGS
+        _writer_instance = PIREventWriter(
+            max_events=s.get('PIR_EVENT_BUFFER_SIZE', 1000),
+            batch_size=s.get('PIR_EVENT_BATCH_SIZE', 50),
+            flush_seconds=s.get('PIR_EVENT_FLUSH_SECONDS', 1.0),
+        )
+    return _writer_instance
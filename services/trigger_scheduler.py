@@ -0,0 +1,142 @@
+"""
+Trigger Scheduler - PIR-Trigger zusammenfassen statt während einer Aufnahme verwerfen
+Ein langlebiger Capture-Thread arbeitet die Trigger ab; Trigger während der Aufnahme
+verlängern diese, Trigger während der Klassifikation warten auf die nächste Aufnahme.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger('birdy')
+
+
+class TriggerScheduler:
+    """
+    Koaleszierende Trigger-Queue vor einem einzelnen Capture-Thread.
+
+    Je nach Phase des Capture-Threads wird ein Trigger:
+    - gestartet (idle): Capture-Thread beginnt sofort eine Aufnahme
+    - gemerged (recording): verlängert die laufende Aufnahme (last_trigger_at)
+    - eingereiht (processing): startet die nächste Aufnahme, sobald die Klassifikation
+      fertig ist; weitere Trigger in dieser Zeit werden mit dem wartenden zusammengefasst
+    - verworfen: wartender Trigger älter als max_age_seconds (Vogel vermutlich weg)
+      oder Scheduler bereits gestoppt
+    """
+
+    IDLE = 'idle'
+    RECORDING = 'recording'
+    PROCESSING = 'processing'
+
+    def __init__(self, capture, max_age_seconds=20, name="BirdDetection-Capture"):
+        """
+        Args:
+            capture: Callable capture(pir_event) – Aufnahme + Klassifikation eines Besuchs;
+                     ruft recording_finished() sobald die Aufnahme beendet ist
+            max_age_seconds: Wartende Trigger älter als das werden nicht mehr aufgenommen
+        """
+        self.capture = capture
+        self.max_age_seconds = max_age_seconds
+
+        self.phase = self.IDLE
+        self.last_trigger_at = 0.0  # time.time() des letzten Triggers (verlängert laufende Aufnahme)
+        self.counters = {
+            'received': 0,
+            'started': 0,
+            'merged': 0,
+            'queued': 0,
+            'dropped': 0,
+        }
+        self._pending = None        # (pir_event, received_at) – höchstens ein wartender Trigger
+        self._running = True
+        self._cond = threading.Condition()
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name=name)
+        self._thread.start()
+
+    def trigger(self, pir_event):
+        """
+        PIR-Trigger einspeisen (aus dem PIR-Monitoring-Thread, blockiert nie).
+
+        Args:
+            pir_event: PendingPIREvent oder None (Landing-Trigger), wird unverändert an capture() übergeben
+
+        Returns:
+            str: 'started', 'merged', 'queued' oder 'dropped'
+        """
+        now = time.time()
+        with self._cond:
+            self.counters['received'] += 1
+            self.last_trigger_at = now
+
+            if not self._running:
+                outcome = 'dropped'
+            elif self.phase == self.RECORDING or self._pending is not None:
+                outcome = 'merged'
+            else:
+                self._pending = (pir_event, now)
+                outcome = 'started' if self.phase == self.IDLE else 'queued'
+                self._cond.notify()
+
+            if outcome != 'started':
+                self.counters[outcome] += 1
+
+        logger.debug(f"Trigger {pir_event}: {outcome} (phase={self.phase})")
+        return outcome
+
+    def recording_finished(self):
+        """Aufnahme beendet – folgende Trigger werden für die nächste Aufnahme eingereiht"""
+        with self._cond:
+            if self.phase == self.RECORDING:
+                self.phase = self.PROCESSING
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self.phase = self.IDLE
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+
+                pir_event, received_at = self._pending
+                self._pending = None
+                age = time.time() - received_at
+                if age > self.max_age_seconds:
+                    self.counters['dropped'] += 1
+                    logger.info(f"Trigger {pir_event} dropped: waited {age:.1f}s > {self.max_age_seconds}s")
+                    continue
+
+                self.counters['started'] += 1
+                self.phase = self.RECORDING
+
+            try:
+                self.capture(pir_event)
+            except Exception as e:
+                logger.error(f"Capture for trigger {pir_event} failed: {e}", exc_info=True)
+
+    def status(self):
+        """Phase, wartender Trigger und Zähler (received/started/merged/queued/dropped)"""
+        with self._cond:
+            pending_age = round(time.time() - self._pending[1], 1) if self._pending else None
+            return {
+                'phase': self.phase,
+                'pending_age_seconds': pending_age,
+                **self.counters,
+            }
+
+    def stop(self, timeout=60):
+        """
+        Keine neuen Trigger mehr annehmen, laufende Aufnahme zu Ende führen.
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden
+        """
+        with self._cond:
+            self._running = False
+            if self._pending is not None:
+                self.counters['dropped'] += 1
+                self._pending = None
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Capture thread did not finish within {timeout}s")
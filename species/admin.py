@@ -17,7 +17,8 @@ class BirdDetectionAdmin(admin.ModelAdmin):
     list_filter = ['processed', 'timestamp', 'species']
     date_hierarchy = 'timestamp'
     search_fields = ['species__common_name_de', 'species__scientific_name']
-    readonly_fields = ['timestamp', 'confidence_display', 'top_predictions', 'processing_time_ms']
+    readonly_fields = ['timestamp', 'confidence_display', 'top_predictions', 'processing_time_ms', 'scoring_metadata',
+                       'estimated_mass_grams']
 
     def confidence_display(self, obj):
         return f"{obj.confidence:.2%}"
@@ -0,0 +1,96 @@
+"""
+Benchmark-Command: Vollbild-Klassifikation vs. Detector-Kaskade (Bbox-Crop)
+"""
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Vergleicht klassifizierte Frames und Laufzeit pro Besuch: Vollbild-Pfad vs. Kaskade'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'videos',
+            nargs='+',
+            type=str,
+            help='Aufgenommene Besuchs-Videos (MP4)'
+        )
+        parser.add_argument(
+            '--no-early-exit',
+            action='store_true',
+            help='Early Exit deaktivieren (alle Kandidaten-Frames scoren)'
+        )
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        from hardware.frame_stream import candidate_frame_rate, iter_video_frames
+        from ml_models.bird_classifier import get_classifier
+        from ml_models.bird_detector import get_bird_detector
+        from services.bird_detection import BirdDetectionService, EarlyExitPolicy
+
+        self.stdout.write(self.style.SUCCESS('=== Kaskaden Benchmark ===\n'))
+
+        classifier = get_classifier()
+        detector = get_bird_detector()
+        if not classifier.is_initialized or not detector.is_initialized:
+            self.stdout.write(self.style.ERROR('Classifier und Bird Detector müssen initialisiert sein'))
+            return
+
+        service = BirdDetectionService(classifier=classifier, bird_detector=detector)
+        resolution = settings.BIRDY_SETTINGS['CAMERA_RESOLUTION']
+        totals = {'full': [0, 0.0], 'cascade': [0, 0.0]}
+
+        for video in options['videos']:
+            video_path = Path(video)
+            duration = self._probe_duration(video_path)
+            _, fps, _ = candidate_frame_rate(duration)
+            self.stdout.write(f'{video_path.name} ({duration:.1f}s)')
+
+            for mode in ('full', 'cascade'):
+                if options['no_early_exit']:
+                    policy = EarlyExitPolicy(consecutive_frames=0)
+                else:
+                    policy = EarlyExitPolicy.from_settings()
+
+                start = time.perf_counter()
+                scored = service.score_frames(
+                    iter_video_frames(video_path, fps, resolution),
+                    bird_detector=detector,
+                    policy=policy,
+                    cascade=(mode == 'cascade'),
+                )
+                wall_ms = (time.perf_counter() - start) * 1000
+
+                totals[mode][0] += scored['frames_scored']
+                totals[mode][1] += wall_ms
+
+                result = scored['classification']
+                label = (
+                    f"{result['top_prediction']['label']} ({scored['best_confidence']:.1%})"
+                    if result else 'kein Vogel'
+                )
+                self.stdout.write(
+                    f'  {mode:<8} {scored["frames_scored"]:3d}/{scored["frames_total"]:3d} Frames klassifiziert, '
+                    f'{wall_ms:7.0f}ms, {scored["stop_reason"]:<16} → {label}'
+                )
+
+        n = len(options['videos'])
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=== Durchschnitt pro Besuch ==='))
+        for mode, (frames, wall_ms) in totals.items():
+            self.stdout.write(f'  {mode:<8} {frames / n:6.1f} Frames, {wall_ms / n:7.0f}ms')
+
+    def _probe_duration(self, video_path):
+        import subprocess
+
+        result = subprocess.run([
+            'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1', str(video_path)
+        ], capture_output=True, text=True)
+        try:
+            return float(result.stdout.strip())
+        except ValueError:
+            return 1.0
@@ -0,0 +1,103 @@
+"""
+Benchmark-Command für den Species Classifier (Einzel-Frames vs. Batch)
+"""
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Vergleicht Klassifikations-Zeit pro Frame: classify()-Schleife vs. classify_batch()'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--video',
+            type=str,
+            help='MP4-Video als Frame-Quelle (Frames wie im Detection-Workflow, 2fps)'
+        )
+        parser.add_argument(
+            '--images',
+            type=str,
+            help='Verzeichnis mit JPEGs als Frame-Quelle'
+        )
+        parser.add_argument(
+            '--frames',
+            type=int,
+            default=16,
+            help='Anzahl synthetischer Frames ohne --video/--images (default: 16)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Wiederholungen pro Modus, bester Lauf zählt (default: 3)'
+        )
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        from ml_models.bird_classifier import get_classifier
+
+        self.stdout.write(self.style.SUCCESS('=== Classifier Benchmark ===\n'))
+
+        classifier = get_classifier()
+        if not classifier.is_initialized:
+            self.stdout.write(self.style.ERROR('Classifier konnte nicht initialisiert werden'))
+            return
+
+        frames = self._load_frames(options)
+        if not frames:
+            self.stdout.write(self.style.ERROR('Keine Frames gefunden'))
+            return
+
+        batch_size = settings.BIRDY_SETTINGS.get('CLASSIFIER_BATCH_SIZE', 8)
+        self.stdout.write(f'Frames:       {len(frames)} ({frames[0].shape[1]}x{frames[0].shape[0]})')
+        self.stdout.write(f'Batch-Grösse: {batch_size}')
+        self.stdout.write('')
+
+        # Warmup (erste Inferenz / Tensor-Allokation nicht mitmessen)
+        classifier.classify(frames[0])
+        classifier.classify_batch(frames[:batch_size])
+
+        loop_ms = self._best_of(options['repeat'], lambda: [classifier.classify(f) for f in frames])
+        batch_ms = self._best_of(options['repeat'], lambda: classifier.classify_batch(frames))
+
+        self.stdout.write(self.style.SUCCESS('=== Ergebnis ==='))
+        self.stdout.write(f'  classify() Schleife: {loop_ms:8.1f}ms total, {loop_ms / len(frames):6.1f}ms/Frame')
+        self.stdout.write(f'  classify_batch():    {batch_ms:8.1f}ms total, {batch_ms / len(frames):6.1f}ms/Frame')
+        if batch_ms > 0:
+            self.stdout.write(f'  Speedup:             {loop_ms / batch_ms:.2f}x')
+        if not classifier.batch_supported:
+            self.stdout.write(self.style.WARNING('  Modell unterstützt keine Batch-Grösse > 1 (Fallback: 1 Frame pro invoke)'))
+
+    def _best_of(self, repeat, func):
+        best = None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _load_frames(self, options):
+        import numpy as np
+        from django.conf import settings
+        from PIL import Image
+
+        if options['video']:
+            from hardware.frame_stream import candidate_frame_rate, iter_video_frames
+
+            video_path = Path(options['video'])
+            resolution = settings.BIRDY_SETTINGS['CAMERA_RESOLUTION']
+            # Dauer unbekannt → 2fps wie im Workflow
+            _, fps, _ = candidate_frame_rate(1.0, n_frames=2)
+            return [frame.copy() for frame in iter_video_frames(video_path, fps, resolution)]
+
+        if options['images']:
+            paths = sorted(Path(options['images']).glob('*.jpg'))
+            return [np.array(Image.open(p).convert('RGB')) for p in paths]
+
+        width, height = settings.BIRDY_SETTINGS['CAMERA_RESOLUTION']
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(options['frames'])]
@@ -0,0 +1,106 @@
+"""
+Benchmark-Command für Interpreter-Layouts (Pool-Grösse × Threads pro Interpreter)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+DEFAULT_LAYOUTS = '1x1,1x2,1x4,2x1,2x2,4x1'
+
+
+class Command(BaseCommand):
+    help = 'Vergleicht Durchsatz und Latenz verschiedener Interpreter-Layouts (N Interpreter × T Threads)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            choices=['classifier', 'detector'],
+            default='classifier',
+            help='Zu messendes Modell (default: classifier)'
+        )
+        parser.add_argument(
+            '--layouts',
+            type=str,
+            default=DEFAULT_LAYOUTS,
+            help=f'Komma-getrennte Layouts POOLxTHREADS (default: {DEFAULT_LAYOUTS})'
+        )
+        parser.add_argument(
+            '--frames',
+            type=int,
+            default=32,
+            help='Anzahl synthetischer Inputs pro Lauf (default: 32)'
+        )
+        parser.add_argument(
+            '--no-xnnpack',
+            action='store_true',
+            help='XNNPACK Delegate deaktivieren'
+        )
+
+    def handle(self, *args, **options):
+        import numpy as np
+        from django.conf import settings
+
+        from ml_models.interpreter_pool import InterpreterPool
+
+        s = settings.BIRDY_SETTINGS
+        if options['model'] == 'classifier':
+            model_path = s['ML_MODEL_PATH']
+        else:
+            model_path = s.get('BIRD_DETECTOR_MODEL_PATH')
+
+        self.stdout.write(self.style.SUCCESS('=== Interpreter Pool Benchmark ===\n'))
+        self.stdout.write(f'Modell:  {model_path}')
+        self.stdout.write(f'Frames:  {options["frames"]} (synthetisch, Batch-Grösse 1)')
+        self.stdout.write(f'XNNPACK: {"aus" if options["no_xnnpack"] else "an"}')
+        self.stdout.write('')
+
+        rows = []
+        for layout in options['layouts'].split(','):
+            pool_size, num_threads = (int(x) for x in layout.lower().split('x'))
+
+            pool = InterpreterPool(
+                model_path,
+                size=pool_size,
+                num_threads=num_threads,
+                use_xnnpack=not options['no_xnnpack'],
+                name='benchmark',
+            )
+            detail = pool.slots[0].input_details[0]
+            rng = np.random.default_rng(0)
+            if detail['dtype'] == np.float32:
+                inputs = [rng.random(detail['shape'], dtype=np.float32) for _ in range(options['frames'])]
+            else:
+                inputs = [
+                    rng.integers(0, 256, detail['shape']).astype(detail['dtype'])
+                    for _ in range(options['frames'])
+                ]
+
+            def run(input_data, pool=pool):
+                start = time.perf_counter()
+                with pool.acquire() as slot:
+                    slot.interpreter.set_tensor(slot.input_details[0]['index'], input_data)
+                    slot.interpreter.invoke()
+                return (time.perf_counter() - start) * 1000
+
+            # Warmup (erste Inferenz pro Interpreter nicht mitmessen)
+            pool.map(run, inputs[:pool.size])
+
+            start = time.perf_counter()
+            latencies = pool.map(run, inputs)
+            total = time.perf_counter() - start
+            pool.close()
+
+            rows.append((layout, len(inputs) / total, float(np.median(latencies)), float(np.max(latencies))))
+
+        self.stdout.write(self.style.SUCCESS('=== Ergebnis ==='))
+        self.stdout.write(f'  {"Layout":<8} {"Frames/s":>9} {"Median ms":>10} {"Max ms":>8}')
+        for layout, fps, median_ms, max_ms in rows:
+            self.stdout.write(f'  {layout:<8} {fps:9.1f} {median_ms:10.1f} {max_ms:8.1f}')
+
+        best = max(rows, key=lambda r: r[1])
+        pool_size, num_threads = best[0].split('x')
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Bester Durchsatz: {best[0]} → ML_INTERPRETER_POOL_SIZE={pool_size}, '
+            f'ML_INTERPRETER_NUM_THREADS={num_threads}'
+        ))
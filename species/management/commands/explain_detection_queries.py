@@ -0,0 +1,130 @@
+"""
+Index-Regressionstest: EXPLAIN der heissen BirdDetection-Queries auf einer befüllten Tabelle
+Seedet (in einer zurückgerollten Transaktion) N Detections und prüft, dass die Queries
+über die partiellen local_date/-timestamp Indizes laufen statt per Seq Scan.
+"""
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN der heissen BirdDetection-Queries auf N geseedeten Zeilen, Fehler bei Seq Scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1_000_000,
+            help='Anzahl geseedeter Detections (default: 1000000)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3 * 365,
+            help='Zeitraum der Seed-Daten in Tagen (default: 1095)'
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Vollständige Pläne ausgeben'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Benötigt PostgreSQL (partielle Indizes, EXPLAIN FORMAT JSON)')
+
+        failures = []
+        with transaction.atomic():
+            species = self._seed(options['rows'], options['days'])
+            for name, queryset, expected_index in self._hot_queries(species):
+                plan = json.loads(queryset.explain(format='json', analyze=True))[0]['Plan']
+                nodes = list(self._walk(plan))
+                indexes = {node['Index Name'] for node in nodes if 'Index Name' in node}
+                seq_scans = [
+                    node for node in nodes
+                    if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') == self.table
+                ]
+                ok = expected_index in indexes and not seq_scans
+                if not ok:
+                    failures.append(name)
+
+                style = self.style.SUCCESS if ok else self.style.ERROR
+                self.stdout.write(style(
+                    f'  {"OK  " if ok else "FAIL"} {name:<22} {plan["Actual Total Time"]:8.2f} ms  '
+                    f'indexes={sorted(indexes) or "-"}{"  SEQ SCAN" if seq_scans else ""}'
+                ))
+                if options['verbose_plans'] or not ok:
+                    self.stdout.write(json.dumps(plan, indent=2))
+
+            # Seed-Daten nie behalten
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'Kein Index-Zugriff für: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('Alle Queries nutzen die erwarteten Indizes'))
+
+    def _seed(self, rows, days):
+        from django.conf import settings
+
+        from species.models import BirdDetection, BirdSpecies
+
+        self.table = BirdDetection._meta.db_table
+        species = [
+            BirdSpecies.objects.create(scientific_name=f'Explain seed {i}', common_name_de=f'Seed {i}')
+            for i in range(20)
+        ]
+        species_ids = [s.id for s in species]
+
+        self.stdout.write(f'Seeding {rows} Detections über {days} Tage ...')
+        with connection.cursor() as cursor:
+            # ~70% gültige Besuche, Rest unverarbeitet oder ohne Spezies (Background)
+            cursor.execute(
+                f"""
+                INSERT INTO {connection.ops.quote_name(self.table)}
+                    (timestamp, species_id, confidence, top_predictions, processed,
+                     is_new_visit, scoring_metadata, local_date, local_hour)
+                SELECT ts,
+                       CASE WHEN random() < 0.8 THEN (%s::int[])[1 + (g %% %s)] END,
+                       random(), '[]'::jsonb, random() < 0.9, random() < 0.6, '{{}}'::jsonb,
+                       (ts AT TIME ZONE %s)::date, EXTRACT(HOUR FROM ts AT TIME ZONE %s)
+                FROM (
+                    SELECT g, now() - (random() * %s) * interval '1 day' AS ts
+                    FROM generate_series(1, %s) AS g
+                ) seed
+                """,
+                [species_ids, len(species_ids), settings.TIME_ZONE, settings.TIME_ZONE, days, rows],
+            )
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(self.table)}')
+        return species
+
+    def _hot_queries(self, species):
+        """(Name, QuerySet, erwarteter Index) – dieselben Filter wie Dashboard, API und Statistik"""
+        from django.db.models import Avg, Count
+        from django.utils import timezone
+
+        from species.models import BirdDetection
+
+        today = timezone.localdate()
+        valid = BirdDetection.objects.filter(processed=True, species__isnull=False)
+        visits = BirdDetection.objects.filter(processed=True, is_new_visit=True)
+
+        return [
+            ('api today', valid.filter(local_date=today), 'birddet_valid_local_date_idx'),
+            ('summary today', valid.filter(local_date=today).values('id'), 'birddet_valid_local_date_idx'),
+            ('summary week', valid.filter(local_date__gte=today - timedelta(days=7)).values('id'),
+             'birddet_valid_local_date_idx'),
+            ('top species today', valid.filter(local_date=today).values('species').annotate(
+                visits=Count('id'), avg_conf=Avg('confidence')).order_by('-visits')[:5],
+             'birddet_valid_local_date_idx'),
+            ('recent gallery', valid.order_by('-timestamp')[:12], 'birddet_valid_recent_idx'),
+            ('update_for_date', visits.filter(local_date=today, species=species[0]).values('id'),
+             'birddet_visit_species_day_idx'),
+        ]
+
+    def _walk(self, node):
+        yield node
+        for child in node.get('Plans', []):
+            yield from self._walk(child)
@@ -0,0 +1,75 @@
+"""
+Statistiken (Tag/Monat/Jahr) für einen Datumsbereich mengenbasiert neu aufbauen
+z.B. nach Neu-Klassifikation oder – mit --reclassify-visits – nach Änderung von
+VISIT_CONTINUATION_WINDOW_SECONDS
+"""
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = (
+        'Baut Daily/Monthly/YearlyStatistics per GROUP BY + ON CONFLICT Upsert in einer Transaktion neu auf. '
+        'Zählt die gespeicherten is_new_visit Flags; nach Änderung von VISIT_CONTINUATION_WINDOW_SECONDS '
+        '--reclassify-visits verwenden'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            type=date.fromisoformat,
+            help='Erstes Datum YYYY-MM-DD (default: erste Detection)'
+        )
+        parser.add_argument(
+            '--end',
+            type=date.fromisoformat,
+            help='Letztes Datum YYYY-MM-DD (default: heute)'
+        )
+        parser.add_argument(
+            '--reclassify-visits',
+            action='store_true',
+            help='is_new_visit im Bereich vorher mit dem aktuellen VISIT_CONTINUATION_WINDOW_SECONDS neu ableiten'
+        )
+
+    def handle(self, *args, **options):
+        from django.db.models import Min
+        from django.utils import timezone
+
+        from species.models import BirdDetection
+        from species.statistics import rebuild_statistics, reclassify_visits
+
+        start = options['start']
+        end = options['end'] or timezone.localdate()
+        if start is None:
+            first = BirdDetection.objects.aggregate(first=Min('timestamp'))['first']
+            if first is None:
+                self.stdout.write(self.style.WARNING('Keine Detections vorhanden'))
+                return
+            start = timezone.localtime(first).date()
+        if start > end:
+            raise CommandError(f'--start {start} liegt nach --end {end}')
+
+        self.stdout.write(self.style.SUCCESS('=== Rebuild Statistics ===\n'))
+        self.stdout.write(f'Bereich: {start} bis {end} (Monate und Jahre jeweils vollständig)')
+
+        queries_before = len(connection.queries)
+        t0 = time.perf_counter()
+        with transaction.atomic():
+            reclassified = reclassify_visits(start, end) if options['reclassify_visits'] else None
+            result = rebuild_statistics(start, end)
+        elapsed = time.perf_counter() - t0
+
+        self.stdout.write('')
+        if reclassified is not None:
+            self.stdout.write(f'Besuche neu abgeleitet: {reclassified} Detection(s) geändert')
+        self.stdout.write(f'  {"Tabelle":<10} {"Upserted":>9} {"Deleted":>8}')
+        for table, counts in result.items():
+            self.stdout.write(f'  {table:<10} {counts["upserted"]:9d} {counts["deleted"]:8d}')
+        self.stdout.write('')
+        self.stdout.write(f'Dauer: {elapsed:.2f}s')
+        if connection.queries_logged:
+            self.stdout.write(f'Queries: {len(connection.queries) - queries_before}')
+        self.stdout.write(self.style.SUCCESS('Statistiken neu aufgebaut'))
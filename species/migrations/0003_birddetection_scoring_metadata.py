@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('species', '0002_birddetection_is_new_visit_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='birddetection',
+            name='scoring_metadata',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
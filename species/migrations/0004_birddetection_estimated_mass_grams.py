@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('species', '0003_birddetection_scoring_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='birddetection',
+            name='estimated_mass_grams',
+            field=models.FloatField(blank=True, help_text='Geschätzte Vogelmasse in Gramm', null=True),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.0.1 on 2026-10-17 15:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_local_time(apps, schema_editor):
+    """local_date/local_hour für bestehende Detections nachtragen"""
+    BirdDetection = apps.get_model('species', 'BirdDetection')
+
+    if schema_editor.connection.vendor == 'postgresql':
+        # Ein UPDATE statt Zeile für Zeile
+        table = schema_editor.quote_name(BirdDetection._meta.db_table)
+        schema_editor.execute(
+            f"UPDATE {table} SET "
+            f"local_date = (timestamp AT TIME ZONE %s)::date, "
+            f"local_hour = EXTRACT(HOUR FROM timestamp AT TIME ZONE %s) "
+            f"WHERE local_date IS NULL",
+            params=[settings.TIME_ZONE, settings.TIME_ZONE],
+        )
+        return
+
+    from django.utils import timezone
+
+    batch = []
+    for detection in BirdDetection.objects.filter(local_date__isnull=True).only('id', 'timestamp').iterator():
+        local = timezone.localtime(detection.timestamp)
+        detection.local_date = local.date()
+        detection.local_hour = local.hour
+        batch.append(detection)
+        if len(batch) >= 1000:
+            BirdDetection.objects.bulk_update(batch, ['local_date', 'local_hour'])
+            batch = []
+    if batch:
+        BirdDetection.objects.bulk_update(batch, ['local_date', 'local_hour'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('species', '0004_birddetection_estimated_mass_grams'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='birddetection',
+            name='local_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='birddetection',
+            name='local_hour',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_local_time, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='birddetection',
+            index=models.Index(
+                condition=models.Q(('processed', True), ('species__isnull', False)),
+                fields=['local_date', 'species'],
+                include=('is_new_visit', 'confidence'),
+                name='birddet_valid_local_date_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='birddetection',
+            index=models.Index(
+                condition=models.Q(('processed', True), ('species__isnull', False)),
+                fields=['-timestamp'],
+                name='birddet_valid_recent_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='birddetection',
+            index=models.Index(
+                condition=models.Q(('is_new_visit', True), ('processed', True)),
+                fields=['species', 'local_date'],
+                include=('confidence',),
+                name='birddet_visit_species_day_idx',
+            ),
+        ),
+    ]
@@ -2,7 +2,7 @@
 Species Models - Vogel-Erkennung und Statistiken
 """
 from django.db import models
-from django.db.models import Count
+from django.db.models import Count, Q
 from django.utils import timezone
 
 
@@ -51,6 +51,17 @@ class BirdDetection(models.Model):
     # Visit-Deduplication: True = neuer Besuch, False = Fortsetzung eines laufenden Besuchs
     is_new_visit = models.BooleanField(default=True)
 
+    # Frame-Scoring: dekodierte/klassifizierte/übersprungene Frames und Abbruchgrund (Early Exit)
+    scoring_metadata = models.JSONField(default=dict, blank=True)
+
+    # Geschätzte Vogelmasse aus dem Gewichtssprung (Plausibilitäts-Hinweis zur Art)
+    estimated_mass_grams = models.FloatField(null=True, blank=True, help_text="Geschätzte Vogelmasse in Gramm")
+
+    # Lokales Datum/Stunde (TIME_ZONE) des timestamp, beim Speichern gesetzt – indexierbar,
+    # im Gegensatz zu timestamp__date (Zeitzonen-Umrechnung pro Zeile)
+    local_date = models.DateField(null=True, blank=True, editable=False)
+    local_hour = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+
     class Meta:
         ordering = ['-timestamp']
         indexes = [
@@ -58,12 +69,44 @@ class BirdDetection(models.Model):
             models.Index(fields=['species', '-timestamp']),
             models.Index(fields=['confidence']),
             models.Index(fields=['is_new_visit', '-timestamp']),
+            # Partielle Indizes für "gültige Besuche" (processed, mit Spezies)
+            models.Index(
+                fields=['local_date', 'species'],
+                include=['is_new_visit', 'confidence'],
+                condition=Q(processed=True, species__isnull=False),
+                name='birddet_valid_local_date_idx',
+            ),
+            models.Index(
+                fields=['-timestamp'],
+                condition=Q(processed=True, species__isnull=False),
+                name='birddet_valid_recent_idx',
+            ),
+            # Statistik-Nachrechnung: neue Besuche pro Spezies und Tag
+            models.Index(
+                fields=['species', 'local_date'],
+                include=['confidence'],
+                condition=Q(processed=True, is_new_visit=True),
+                name='birddet_visit_species_day_idx',
+            ),
         ]
 
     def __str__(self):
         species_name = self.species.common_name_de if self.species else "Unbekannt"
         return f"{species_name} ({self.confidence:.2f}) @ {self.timestamp}"
 
+    def save(self, *args, **kwargs):
+        self.set_local_time()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'timestamp' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'local_date', 'local_hour'}
+        super().save(*args, **kwargs)
+
+    def set_local_time(self):
+        """local_date/local_hour aus timestamp ableiten (für bulk_create vorher selbst aufrufen)"""
+        local = timezone.localtime(self.timestamp)
+        self.local_date = local.date()
+        self.local_hour = local.hour
+
 
 class DailyStatistics(models.Model):
     """Tägliche Statistiken pro Spezies"""
@@ -85,15 +128,21 @@ class DailyStatistics(models.Model):
 
     @classmethod
     def update_for_date(cls, date, species):
-        """Aktualisiere Statistik für Datum und Spezies"""
+        """
+        Statistik für Datum und Spezies komplett neu berechnen
+
+        Laufende Zähler schreibt species.statistics.record_detection() fort;
+        das hier dient nur noch der Konsistenzprüfung.
+        """
         stats = BirdDetection.objects.filter(
-            timestamp__date=date,
+            local_date=date,
             species=species,
             processed=True,
             is_new_visit=True,
         ).aggregate(
             count=Count('id'),
-            avg_conf=models.Avg('confidence')
+            avg_conf=models.Avg('confidence'),
+            total_conf=models.Sum('confidence'),
         )
 
         obj, created = cls.objects.update_or_create(
@@ -101,6 +150,7 @@ class DailyStatistics(models.Model):
             species=species,
             defaults={
                 'visit_count': stats['count'] or 0,
+                'total_confidence': stats['total_conf'] or 0,
                 'avg_confidence': stats['avg_conf'] or 0,
             }
         )
@@ -130,8 +180,8 @@ class MonthlyStatistics(models.Model):
         """Aktualisiere Statistik für Monat und Spezies"""
         # Zähle nur echte neue Besuche im Monat
         stats = BirdDetection.objects.filter(
-            timestamp__year=year,
-            timestamp__month=month,
+            local_date__year=year,
+            local_date__month=month,
             species=species,
             processed=True,
             is_new_visit=True,
@@ -141,12 +191,12 @@ class MonthlyStatistics(models.Model):
 
         # Zähle unique Tage mit echten Besuchen
         unique_days = BirdDetection.objects.filter(
-            timestamp__year=year,
-            timestamp__month=month,
+            local_date__year=year,
+            local_date__month=month,
             species=species,
             processed=True,
             is_new_visit=True,
-        ).dates('timestamp', 'day').count()
+        ).dates('local_date', 'day').count()
 
         obj, created = cls.objects.update_or_create(
             year=year,
@@ -182,7 +232,7 @@ class YearlyStatistics(models.Model):
         """Aktualisiere Statistik für Jahr und Spezies"""
         # Zähle nur echte neue Besuche im Jahr
         stats = BirdDetection.objects.filter(
-            timestamp__year=year,
+            local_date__year=year,
             species=species,
             processed=True,
             is_new_visit=True,
@@ -192,11 +242,11 @@ class YearlyStatistics(models.Model):
 
         # Zähle unique Monate mit echten Besuchen
         unique_months = BirdDetection.objects.filter(
-            timestamp__year=year,
+            local_date__year=year,
             species=species,
             processed=True,
             is_new_visit=True,
-        ).dates('timestamp', 'month').count()
+        ).dates('local_date', 'month').count()
 
         obj, created = cls.objects.update_or_create(
             year=year,
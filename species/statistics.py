@@ -0,0 +1,320 @@
+"""
+Inkrementelle Statistiken - Tages-, Monats- und Jahreszähler pro Art
+Jede neue Detection erhöht die Zähler per F()-Update in derselben Transaktion wie
+das BirdDetection-Insert; Aggregationen über BirdDetection sind nur noch für die
+nächtliche Konsistenzprüfung nötig.
+"""
+import logging
+from datetime import date as date_cls
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, Sum, Window
+from django.db.models.functions import Lag, TruncMonth
+
+from .models import BirdDetection, DailyStatistics, MonthlyStatistics, YearlyStatistics
+
+logger = logging.getLogger('birdy')
+
+
+def counts_for_statistics(detection):
+    """Nur verarbeitete, neue Besuche mit Art zählen (wie update_for_date/month/year)"""
+    return detection.processed and detection.is_new_visit and detection.species_id is not None
+
+
+def record_detection(detection):
+    """
+    Zähler für eine neue Detection erhöhen.
+
+    Muss in der Transaktion des BirdDetection-Inserts laufen (siehe create_detection()).
+    Die Zeilen werden per select_for_update gesperrt: so ist eindeutig, ob der Besuch
+    der erste des Tages (unique_days) bzw. des Monats (unique_months) ist.
+
+    Args:
+        detection: Gespeicherte BirdDetection
+    """
+    if not counts_for_statistics(detection):
+        return
+
+    # Tage/Monate in lokaler Zeit (local_date wird beim Speichern gesetzt)
+    local = detection.local_date
+    species_id = detection.species_id
+    confidence = detection.confidence
+
+    daily = _locked_row(DailyStatistics, date=local, species_id=species_id)
+    first_of_day = daily.visit_count == 0
+    DailyStatistics.objects.filter(pk=daily.pk).update(
+        visit_count=F('visit_count') + 1,
+        total_confidence=F('total_confidence') + confidence,
+        # Rechte Seite sieht die alten Werte → neuer Durchschnitt in einem UPDATE
+        avg_confidence=(F('total_confidence') + confidence) / (F('visit_count') + 1),
+    )
+
+    monthly = _locked_row(MonthlyStatistics, year=local.year, month=local.month, species_id=species_id)
+    first_of_month = monthly.visit_count == 0
+    MonthlyStatistics.objects.filter(pk=monthly.pk).update(
+        visit_count=F('visit_count') + 1,
+        unique_days=F('unique_days') + (1 if first_of_day else 0),
+    )
+
+    yearly = _locked_row(YearlyStatistics, year=local.year, species_id=species_id)
+    YearlyStatistics.objects.filter(pk=yearly.pk).update(
+        visit_count=F('visit_count') + 1,
+        unique_months=F('unique_months') + (1 if first_of_month else 0),
+    )
+
+
+def _locked_row(model, **lookup):
+    """Zählerzeile holen oder anlegen und für den Rest der Transaktion sperren"""
+    row, created = model.objects.get_or_create(**lookup)
+    if created:
+        return row
+    return model.objects.select_for_update().get(pk=row.pk)
+
+
+def create_detection(**fields):
+    """
+    BirdDetection anlegen und Statistiken in derselben Transaktion fortschreiben
+
+    Args:
+        **fields: Felder für BirdDetection.objects.create()
+
+    Returns:
+        BirdDetection
+    """
+    with transaction.atomic():
+        detection = BirdDetection.objects.create(**fields)
+        record_detection(detection)
+    return detection
+
+
+def check_consistency(date, species_list, fix=True):
+    """
+    Zähler gegen die Detections nachrechnen (nächtliche Konsistenzprüfung).
+
+    Nutzt die bestehenden update_for_date/update_for_month/update_for_year
+    Aggregationen und meldet jede Abweichung zu den inkrementellen Zählern.
+    Geprüft werden nur Arten mit Zählerzeile oder Besuchen im Zeitraum; Zeilen,
+    die auf 0 Besuche nachgerechnet werden, werden gelöscht statt angelegt.
+
+    Args:
+        date: Lokales Datum, dessen Tag, Monat und Jahr geprüft werden
+        species_list: Zu prüfende Arten
+        fix: Bei Abweichung den nachgerechneten Wert übernehmen (sonst nichts schreiben)
+
+    Returns:
+        int: Anzahl abweichender Zählerzeilen
+    """
+    visits = BirdDetection.objects.filter(processed=True, is_new_visit=True)
+    mismatches = 0
+    checks = (
+        (DailyStatistics, {'date': date}, ('visit_count', 'avg_confidence'),
+         visits.filter(local_date=date),
+         lambda species: DailyStatistics.update_for_date(date, species)),
+        (MonthlyStatistics, {'year': date.year, 'month': date.month}, ('visit_count', 'unique_days'),
+         visits.filter(local_date__year=date.year, local_date__month=date.month),
+         lambda species: MonthlyStatistics.update_for_month(date.year, date.month, species)),
+        (YearlyStatistics, {'year': date.year}, ('visit_count', 'unique_months'),
+         visits.filter(local_date__year=date.year),
+         lambda species: YearlyStatistics.update_for_year(date.year, species)),
+    )
+
+    for species in species_list:
+        for model, lookup, fields, detections, recompute in checks:
+            before = model.objects.filter(species=species, **lookup).values(*fields).first()
+            if before is None and not detections.filter(species=species).exists():
+                continue  # Kein Besuch, keine Zeile – nichts anzulegen
+
+            with transaction.atomic():
+                after = recompute(species)
+                expected = {field: getattr(after, field) for field in fields}
+                if not after.visit_count:
+                    after.delete()
+                if before is None:
+                    before = {field: 0 for field in fields}
+
+                if _differs(before, expected):
+                    mismatches += 1
+                    logger.warning(
+                        f"Statistics drift {model.__name__} {lookup} {species.scientific_name}: "
+                        f"counter={before}, recomputed={expected}"
+                    )
+                if not fix:
+                    transaction.set_rollback(True)
+
+    return mismatches
+
+
+def _differs(counter, recomputed):
+    for field, value in recomputed.items():
+        if isinstance(value, float):
+            if abs((counter[field] or 0) - value) > 1e-6:
+                return True
+        elif counter[field] != value:
+            return True
+    return False
+
+
+def reclassify_visits(start, end, window_seconds=None):
+    """
+    is_new_visit für einen Datumsbereich mit dem aktuellen Besuchsfenster neu ableiten.
+
+    Wie _determine_is_new_visit() im Detection Service: eine Detection ist Fortsetzung,
+    wenn dieselbe Art weniger als window_seconds vorher erkannt wurde. Der Vorgänger
+    kommt per LAG(timestamp) OVER (PARTITION BY species ORDER BY timestamp) aus der DB;
+    nur geänderte Flags werden per bulk_update geschrieben. Danach rebuild_statistics()
+    für denselben Bereich aufrufen.
+
+    Args:
+        start: Erstes lokales Datum (inklusive)
+        end: Letztes lokales Datum (inklusive)
+        window_seconds: Besuchsfenster (default: VISIT_CONTINUATION_WINDOW_SECONDS)
+
+    Returns:
+        int: Anzahl geänderter Detections
+    """
+    if window_seconds is None:
+        window_seconds = settings.BIRDY_SETTINGS.get('VISIT_CONTINUATION_WINDOW_SECONDS', 300)
+    window = timedelta(seconds=window_seconds)
+    # Vorgänger der ersten Detections im Bereich mitlesen
+    lookback = start - timedelta(days=window.days + 1)
+
+    rows = (
+        BirdDetection.objects
+        .filter(processed=True, species__isnull=False, local_date__gte=lookback, local_date__lte=end)
+        .annotate(previous=Window(Lag('timestamp'), partition_by=[F('species_id')], order_by=F('timestamp').asc()))
+        .values_list('id', 'local_date', 'timestamp', 'previous', 'is_new_visit')
+    )
+
+    changed = []
+    for pk, local_date, timestamp, previous, is_new_visit in rows.iterator(chunk_size=2000):
+        if local_date < start:
+            continue
+        expected = previous is None or timestamp - previous >= window
+        if expected != is_new_visit:
+            changed.append(BirdDetection(id=pk, is_new_visit=expected))
+
+    BirdDetection.objects.bulk_update(changed, ['is_new_visit'], batch_size=1000)
+    return len(changed)
+
+
+def rebuild_statistics(start, end):
+    """
+    Tages-, Monats- und Jahresstatistik für einen Datumsbereich mengenbasiert neu aufbauen.
+
+    Statt update_for_* pro Art und Tag (tausende Queries) zwei GROUP BY Scans über
+    BirdDetection – nach local_date bzw. dessen Monat – und pro Tabelle ein Bulk-Upsert
+    (INSERT ... ON CONFLICT DO UPDATE). Zeilen im Bereich ohne Besuche werden gelöscht.
+    Monate und Jahre werden immer vollständig nachgerechnet; läuft alles in einer Transaktion.
+    Gezählt werden die gespeicherten is_new_visit Flags – nach einer Änderung von
+    VISIT_CONTINUATION_WINDOW_SECONDS vorher reclassify_visits() aufrufen.
+
+    Args:
+        start: Erstes lokales Datum (inklusive)
+        end: Letztes lokales Datum (inklusive)
+
+    Returns:
+        dict: Pro Tabelle {'upserted': n, 'deleted': n}
+    """
+    visits = BirdDetection.objects.filter(processed=True, is_new_visit=True, species__isnull=False)
+    month_start = start.replace(day=1)
+    month_end = _next_month(end.replace(day=1))
+    year_start = date_cls(start.year, 1, 1)
+    year_end = date_cls(end.year + 1, 1, 1)
+
+    with transaction.atomic():
+        # Scan 1: pro lokalem Tag und Art – ergibt Tages- und Monatszeilen
+        days = list(
+            visits.filter(local_date__gte=month_start, local_date__lt=month_end)
+            .values('species_id', day=F('local_date'))
+            .annotate(visits=Count('id'), total_conf=Sum('confidence'), avg_conf=Avg('confidence'))
+            .order_by()
+        )
+        daily_rows = [
+            DailyStatistics(
+                date=row['day'], species_id=row['species_id'], visit_count=row['visits'],
+                total_confidence=row['total_conf'], avg_confidence=row['avg_conf'],
+            )
+            for row in days if start <= row['day'] <= end
+        ]
+
+        monthly = {}
+        for row in days:
+            key = (row['day'].year, row['day'].month, row['species_id'])
+            visit_count, unique_days = monthly.get(key, (0, 0))
+            monthly[key] = (visit_count + row['visits'], unique_days + 1)
+        monthly_rows = [
+            MonthlyStatistics(year=year, month=month, species_id=species_id,
+                              visit_count=visit_count, unique_days=unique_days)
+            for (year, month, species_id), (visit_count, unique_days) in monthly.items()
+        ]
+
+        # Scan 2: pro lokalem Monat und Art über die ganzen Jahre – ergibt Jahreszeilen
+        months = (
+            visits.filter(local_date__gte=year_start, local_date__lt=year_end)
+            .annotate(month=TruncMonth('local_date'))
+            .values('month', 'species_id')
+            .annotate(visits=Count('id'))
+            .order_by()
+        )
+        yearly = {}
+        for row in months:
+            key = (row['month'].year, row['species_id'])
+            visit_count, unique_months = yearly.get(key, (0, 0))
+            yearly[key] = (visit_count + row['visits'], unique_months + 1)
+        yearly_rows = [
+            YearlyStatistics(year=year, species_id=species_id,
+                             visit_count=visit_count, unique_months=unique_months)
+            for (year, species_id), (visit_count, unique_months) in yearly.items()
+        ]
+
+        return {
+            'daily': _replace_rows(
+                DailyStatistics, daily_rows, ('date', 'species_id'),
+                ('visit_count', 'total_confidence', 'avg_confidence'),
+                {'date__gte': start, 'date__lte': end},
+            ),
+            'monthly': _replace_rows(
+                MonthlyStatistics, monthly_rows, ('year', 'month', 'species_id'),
+                ('visit_count', 'unique_days'),
+                {'year__gte': month_start.year, 'year__lte': end.year},
+                in_range=lambda year, month: month_start <= date_cls(year, month, 1) < month_end,
+            ),
+            'yearly': _replace_rows(
+                YearlyStatistics, yearly_rows, ('year', 'species_id'),
+                ('visit_count', 'unique_months'),
+                {'year__gte': start.year, 'year__lte': end.year},
+            ),
+        }
+
+
+def _replace_rows(model, rows, key_fields, update_fields, range_lookup, in_range=None, batch_size=1000):
+    """
+    Zeilen per ON CONFLICT upserten und Zeilen im Bereich ohne Ergebnis löschen
+
+    Args:
+        in_range: Optionaler Filter auf die Schlüssel (ohne species_id) der Zeilen aus range_lookup
+    """
+    model.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=[field.removesuffix('_id') for field in key_fields],
+        update_fields=list(update_fields),
+    )
+
+    keep = {tuple(getattr(row, field) for field in key_fields) for row in rows}
+    stale = [
+        values[0]
+        for values in model.objects.filter(**range_lookup).values_list('pk', *key_fields)
+        if values[1:] not in keep and (in_range is None or in_range(*values[1:-1]))
+    ]
+    if stale:
+        model.objects.filter(pk__in=stale).delete()
+
+    return {'upserted': len(rows), 'deleted': len(stale)}
+
+
+def _next_month(first_of_month):
+    return (first_of_month + timedelta(days=32)).replace(day=1)
@@ -5,6 +5,7 @@ import logging
 from datetime import timedelta
 
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 
 logger = logging.getLogger('birdy')
@@ -13,52 +14,31 @@ logger = logging.getLogger('birdy')
 @shared_task
 def update_statistics_task():
     """
-    Aktualisiere Monthly und Yearly Statistiken.
-    Läuft täglich um Mitternacht.
+    Konsistenzprüfung der inkrementellen Statistiken (siehe species.statistics).
+    Läuft täglich um Mitternacht und rechnet Tag, Monat und Jahr von gestern nach.
     """
+    if not settings.BIRDY_SETTINGS.get('STATISTICS_CONSISTENCY_CHECK', True):
+        return
+
     try:
-        from species.models import BirdSpecies, MonthlyStatistics, YearlyStatistics
+        from species.models import BirdSpecies
+        from species.statistics import check_consistency
 
-        now = timezone.now()
-        yesterday = now - timedelta(days=1)
+        yesterday = timezone.localdate() - timedelta(days=1)
 
         # Alle Spezies mit Detections
         species_list = BirdSpecies.objects.filter(
             birddetection__processed=True
         ).distinct()
 
-        logger.info(f"Updating statistics for {species_list.count()} species")
-
-        for species in species_list:
-            # Update Monthly für aktuellen Monat
-            MonthlyStatistics.update_for_month(
-                year=now.year,
-                month=now.month,
-                species=species
-            )
-
-            # Wenn gestern ein anderer Monat war, update auch den
-            if yesterday.month != now.month:
-                MonthlyStatistics.update_for_month(
-                    year=yesterday.year,
-                    month=yesterday.month,
-                    species=species
-                )
-
-            # Update Yearly für aktuelles Jahr
-            YearlyStatistics.update_for_year(
-                year=now.year,
-                species=species
-            )
+        logger.info(f"Checking statistics for {yesterday} ({species_list.count()} species)")
 
-            # Wenn gestern ein anderes Jahr war, update auch das
-            if yesterday.year != now.year:
-                YearlyStatistics.update_for_year(
-                    year=yesterday.year,
-                    species=species
-                )
+        mismatches = check_consistency(yesterday, species_list)
 
-        logger.info("Statistics update completed")
+        if mismatches:
+            logger.warning(f"Statistics check: {mismatches} counter row(s) corrected")
+        else:
+            logger.info("Statistics check completed, counters consistent")
 
     except Exception as e:
-        logger.error(f"Error updating statistics: {e}")
+        logger.error(f"Error checking statistics: {e}")
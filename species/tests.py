@@ -1,2 +1,19 @@
+"""
+Tests für die Detection-Queries (EXPLAIN-Checks laufen nur gegen PostgreSQL)
+"""
+import unittest
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'EXPLAIN-Checks benötigen PostgreSQL')
+class ExplainDetectionQueriesTests(TestCase):
+
+    def test_hot_queries_use_indexes(self):
+        # CommandError wenn eine Query nicht den erwarteten Index nutzt
+        out = StringIO()
+        call_command('explain_detection_queries', rows=100_000, stdout=out)
+        self.assertIn('Alle Queries nutzen die erwarteten Indizes', out.getvalue())